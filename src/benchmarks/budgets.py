@@ -0,0 +1,54 @@
+import json
+from collections import namedtuple
+
+
+class Budget(namedtuple("Budget", ["queries", "seconds", "memory_kb"])):
+    """
+    Maximum number of queries, wall time and peak of memory allocated by Python of a request to an endpoint
+    """
+
+    def exceeded(self, measurement):
+        """
+        :param measurement: Measurement of the endpoint
+        :return: List of descriptions of the limits of the budget exceeded by the measurement
+        """
+        return [f"{field} {round(getattr(measurement, field), 3)} > {limit}" for field, limit in self._asdict().items()
+                if limit is not None and getattr(measurement, field) > limit]
+
+
+# Budgets of the endpoints with the default volumes of the benchmarks data
+DEFAULT_BUDGETS = {
+    "record_list": Budget(queries=25, seconds=1.0, memory_kb=16 * 1024),
+    "record_list_keyset": Budget(queries=25, seconds=1.0, memory_kb=16 * 1024),
+    "record_search": Budget(queries=30, seconds=1.0, memory_kb=16 * 1024),
+    "record_map": Budget(queries=15, seconds=1.5, memory_kb=24 * 1024),
+    "record_detail": Budget(queries=60, seconds=1.0, memory_kb=16 * 1024),
+    "record_create": Budget(queries=150, seconds=2.0, memory_kb=24 * 1024),
+    "group_indicators": Budget(queries=10, seconds=1.0, memory_kb=8 * 1024),
+    "ambit_indicators": Budget(queries=15, seconds=1.5, memory_kb=8 * 1024),
+    "group_month_indicators": Budget(queries=20, seconds=2.0, memory_kb=8 * 1024),
+    "ambit_month_indicators": Budget(queries=30, seconds=3.0, memory_kb=8 * 1024),
+    "record_traceability": Budget(queries=5, seconds=1.0, memory_kb=16 * 1024),
+    "public_element_detail_search": Budget(queries=10, seconds=1.0, memory_kb=16 * 1024),
+    "record_xlsx_export": Budget(queries=30, seconds=20.0, memory_kb=128 * 1024),
+    "state_machine_page": Budget(queries=0, seconds=0.1, memory_kb=4 * 1024),
+    "render_iris_1": Budget(queries=0, seconds=0.1, memory_kb=1024),
+    # Reference of the previous renderer, only reported
+    "legacy_render_iris_1": Budget(queries=None, seconds=None, memory_kb=None),
+}
+
+
+def load_budgets(budgets_path=None):
+    """
+    :param budgets_path: Path of a JSON file with the budgets that replace the default ones, by endpoint. Every
+    budget can set only some of its limits, for example {"record_list": {"seconds": 0.5}}, and a null limit is not
+    checked.
+    :return: Dict of budgets by endpoint
+    """
+    budgets = dict(DEFAULT_BUDGETS)
+    if not budgets_path:
+        return budgets
+    with open(budgets_path) as budgets_file:
+        for endpoint, limits in json.load(budgets_file).items():
+            budgets[endpoint] = budgets.get(endpoint, Budget(None, None, None))._replace(**limits)
+    return budgets
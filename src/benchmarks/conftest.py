@@ -0,0 +1,64 @@
+import pytest
+from django.core.management import call_command
+
+from benchmarks.budgets import load_budgets
+from benchmarks.harness import Benchmark, BenchmarkClient
+from benchmarks.seed import BenchmarkData
+
+
+def pytest_configure(config):
+    config.benchmark = Benchmark(load_budgets(config.getoption("benchmark_budgets")),
+                                 rounds=config.getoption("benchmark_rounds"))
+
+
+def pytest_collection_modifyitems(config, items):
+    """
+    The benchmarks seed tens of thousands of records, so they are only run when they are asked for, and alone.
+    """
+    if config.getoption("benchmark"):
+        other_items = [item.nodeid for item in items if "benchmark" not in item.keywords]
+        if other_items:
+            raise pytest.UsageError(f"The benchmarks commit their data, so they can't be run with other tests: "
+                                    f"{', '.join(other_items[:5])}")
+        return
+    skip_benchmark = pytest.mark.skip(reason="The benchmarks are only run with the --benchmark option")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip_benchmark)
+
+
+def pytest_terminal_summary(terminalreporter):
+    benchmark = terminalreporter.config.benchmark
+    if not benchmark.measurements:
+        return
+    terminalreporter.write_sep("-", "benchmarks")
+    for line in benchmark.report():
+        terminalreporter.write_line(line)
+    json_path = terminalreporter.config.getoption("benchmark_json")
+    if json_path:
+        benchmark.dump(json_path)
+        terminalreporter.write_line(f"Measurements saved on {json_path}")
+
+
+@pytest.fixture(scope="session")
+def benchmark_data(request, django_db_setup, django_db_blocker):
+    """
+    Data of the benchmarks, seeded once for the session outside the transactions of the tests. The data is committed,
+    so the database is flushed at the end of the session, like the transactional tests do, to not leave it to the
+    next runs that reuse the database.
+    """
+    with django_db_blocker.unblock():
+        data = BenchmarkData.get(request.config.getoption("benchmark_records"))
+    yield data
+    with django_db_blocker.unblock():
+        call_command("flush", interactive=False, verbosity=0)
+
+
+@pytest.fixture
+def benchmark(request):
+    return request.config.benchmark
+
+
+@pytest.fixture
+def benchmark_client(benchmark_data):
+    return BenchmarkClient(benchmark_data.user.pk)
@@ -0,0 +1,100 @@
+import json
+import tracemalloc
+from collections import namedtuple
+from time import perf_counter
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+class Measurement(namedtuple("Measurement", ["endpoint", "status_code", "queries", "seconds", "memory_kb"])):
+    """
+    Queries, best wall time of the rounds and peak of memory allocated by Python of a request to an endpoint
+    """
+
+    HEADER = ("endpoint", "status", "queries", "seconds", "memory (KB)")
+
+    def row(self):
+        return self.endpoint, self.status_code, self.queries, f"{self.seconds:.3f}", self.memory_kb
+
+
+class Benchmark:
+    """
+    Measures the requests to the endpoints and checks them against their budgets.
+
+    Every request is done once to warm up the caches, then it is timed for the given rounds and finally it's done
+    again tracing the memory, as tracing slows down the request.
+    """
+
+    def __init__(self, budgets, rounds=3) -> None:
+        self.budgets = budgets
+        self.rounds = rounds
+        self.measurements = []
+        super().__init__()
+
+    def __call__(self, endpoint, request, expected_status=None):
+        """
+        :param endpoint: Name of the endpoint, that has to have a budget
+        :param request: Callable that does the request and returns the response
+        :param expected_status: Status code of the response, None when the callable is not a request
+        :return: Measurement of the request
+        """
+        response = request()
+        status_code = getattr(response, "status_code", None)
+        assert status_code == expected_status, getattr(response, "data", None)
+
+        seconds = []
+        for _ in range(self.rounds):
+            with CaptureQueriesContext(connection) as queries:
+                start = perf_counter()
+                request()
+                seconds.append(perf_counter() - start)
+
+        tracemalloc.start()
+        try:
+            request()
+            _, memory_peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        measurement = Measurement(endpoint, status_code, len(queries), min(seconds), memory_peak // 1024)
+        self.measurements.append(measurement)
+        exceeded = self.budgets[endpoint].exceeded(measurement)
+        assert not exceeded, f"{endpoint} exceeds its budget: {', '.join(exceeded)}"
+        return measurement
+
+    def report(self):
+        """
+        :return: Lines of the table of the measurements
+        """
+        rows = [Measurement.HEADER] + [measurement.row() for measurement in self.measurements]
+        widths = [max(len(str(row[column])) for row in rows) for column in range(len(Measurement.HEADER))]
+        return ["  ".join(str(value).ljust(width) for value, width in zip(row, widths)).rstrip() for row in rows]
+
+    def dump(self, json_path):
+        with open(json_path, "w") as json_file:
+            json.dump([measurement._asdict() for measurement in self.measurements], json_file, indent=2)
+
+
+class BenchmarkClient(APIClient):
+    """
+    API client authenticated as the benchmarks user. The user is read on every request, like the authentication
+    does on a real one, so the permissions and the group of the user are not kept between requests. Streamed
+    responses are read, so the time to send them is measured too.
+    """
+
+    def __init__(self, user_pk, **defaults) -> None:
+        self.user_pk = user_pk
+        super().__init__(**defaults)
+
+    def request(self, **kwargs):
+        user = User.objects.get(pk=self.user_pk)
+        setattr(user, "imi_data", {"user": user.username, "dptcuser": user.username})
+        self.force_authenticate(user=user)
+        response = super().request(**kwargs)
+        if response.streaming:
+            b"".join(response.streaming_content)
+            response.close()
+        return response
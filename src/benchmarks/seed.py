@@ -0,0 +1,227 @@
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.utils import timezone
+from model_mommy import mommy
+
+from communications.tests.utils import load_missing_data
+from iris_masters.models import Application, District, Process, Reason, RecordState, RecordType
+from iris_masters.permissions import ADMIN, MASTERS_EXCEL
+from iris_masters.tests.utils import load_missing_data_districts, load_missing_data_process
+from profiles.models import Group, GroupsUserGroup, UserGroup
+from record_cards.models import (Comment, RecordCard, RecordCardReasignation, RecordCardStateHistory, Ubication,
+                                 WorkflowComment)
+from record_cards.permissions import CREATE, RECARD_CHARTS, RECARD_SEARCH_NOFILTERS, UPDATE, VALIDATE
+from record_cards.tests.utils import CreateRecordCardMixin
+from themes.models import ApplicationElementDetail, ElementDetail
+
+BENCHMARK_USER_ID = "BENCHMARK"
+BENCHMARK_USERNAME = "benchmark"
+RECORDS_PREFIX = "BM"
+
+BENCHMARK_PERMISSIONS = [ADMIN, MASTERS_EXCEL, CREATE, UPDATE, VALIDATE, RECARD_CHARTS, RECARD_SEARCH_NOFILTERS]
+# States of the records, that follow the steps of their process
+RECORD_STATES = [RecordState.PENDING_VALIDATE, RecordState.IN_PLANING, RecordState.IN_RESOLUTION,
+                 RecordState.PENDING_ANSWER, RecordState.CLOSED, RecordState.CANCELLED]
+
+
+class BenchmarkData(CreateRecordCardMixin):
+    """
+    Database of the benchmarks, with the volumes of a production installation: a tree of groups, a thematic tree
+    with its details published on the ATE and tens of thousands of records spread over the groups, themes, states
+    and the last year. One of the records has a long traceability.
+
+    The data is committed, so it is seeded once for the whole session.
+    """
+
+    # Children of every group, by level of the tree
+    GROUPS_TREE = (6, 5, 4)
+    AREAS_NUMBER = 12
+    ELEMENTS_BY_AREA = 6
+    DETAILS_BY_ELEMENT = 5
+    UBICATIONS_NUMBER = 500
+    TRACES_NUMBER = 200
+    BATCH_SIZE = 2000
+
+    def __init__(self, records_number) -> None:
+        self.records_number = records_number
+        self.user = None
+        self.root_group = None
+        self.groups = []
+        self.element_details = []
+        self.record_card = None
+        super().__init__()
+
+    @classmethod
+    def get(cls, records_number):
+        """
+        :return: BenchmarkData of the database, that is seeded if it has not been done before
+        """
+        data = cls(records_number)
+        if RecordCard.objects.filter(normalized_record_id=data.get_normalized_record_id(0)).exists():
+            data.load()
+        else:
+            with transaction.atomic():
+                data.seed()
+        return data
+
+    def load(self):
+        self.user = User.objects.get(username=BENCHMARK_USERNAME)
+        self.root_group = self.user.usergroup.group
+        self.groups = list(self.root_group.get_descendants(include_self=True))
+        self.record_card = RecordCard.objects.get(normalized_record_id=self.get_normalized_record_id(0))
+        self.element_details = list(ElementDetail.objects.filter(user_id=BENCHMARK_USER_ID).order_by("pk"))
+
+    def seed(self):
+        load_missing_data()
+        load_missing_data_process()
+        load_missing_data_districts()
+        self.seed_applications()
+        self.seed_groups()
+        self.seed_user()
+        self.seed_themes()
+        self.seed_records()
+        self.seed_traceability()
+
+    @staticmethod
+    def seed_applications():
+        """
+        The applications are created by the data checks, that are not run on the tests database
+        """
+        for pk, description, description_hash in ((Application.IRIS_PK, "IRIS", Application.IRIS_HASH),
+                                                  (Application.WEB_PK, "WEB", Application.WEB_HASH),
+                                                  (Application.ATE_PK, "ATE", Application.ATE_HASH)):
+            application, _ = Application.objects.get_or_create(pk=pk, defaults={"description": description})
+            if application.description_hash != description_hash:
+                application.description_hash = description_hash
+                application.save()
+
+    def seed_groups(self):
+        self.root_group = self.create_group(None, "0")
+        self.groups = [self.root_group]
+        level_groups = [self.root_group]
+        for children_number in self.GROUPS_TREE:
+            level_groups = [self.create_group(parent, f"{parent.profile_ctrl_user_id}{position}")
+                            for parent in level_groups for position in range(children_number)]
+            self.groups.extend(level_groups)
+
+    @staticmethod
+    def create_group(parent, code):
+        group = Group.objects.create(user_id=BENCHMARK_USER_ID, parent=parent, description=f"Benchmark {code}",
+                                     profile_ctrl_user_id=f"{RECORDS_PREFIX}{code}", is_ambit=len(code) < 3)
+        group.group_plate = group.calculate_group_plate()
+        group.save()
+        return group
+
+    def seed_user(self):
+        self.user = User.objects.create(username=BENCHMARK_USERNAME)
+        user_group = UserGroup.objects.create(user=self.user, group=self.root_group)
+        GroupsUserGroup.objects.create(user_group=user_group, group=self.root_group)
+        self.set_group_permissions(BENCHMARK_USER_ID, self.root_group, BENCHMARK_PERMISSIONS)
+
+    def seed_themes(self):
+        record_type = mommy.make(RecordType, user_id=BENCHMARK_USER_ID)
+        for _ in range(self.AREAS_NUMBER):
+            area = self.create_area(user_id=BENCHMARK_USER_ID)
+            for _ in range(self.ELEMENTS_BY_AREA):
+                element = self.create_element(user_id=BENCHMARK_USER_ID, area=area)
+                for _ in range(self.DETAILS_BY_ELEMENT):
+                    position = len(self.element_details)
+                    description = f"Benchmark detail {position}"
+                    self.element_details.append(self.create_element_detail(
+                        user_id=BENCHMARK_USER_ID, element=element, record_type_id=record_type.pk,
+                        description=description, short_description=description, detail_code=f"{position:06d}"))
+        ate = Application.objects.get(description_hash=Application.ATE_HASH)
+        ApplicationElementDetail.objects.bulk_create([
+            ApplicationElementDetail(user_id=BENCHMARK_USER_ID, application=ate, detail=element_detail)
+            for element_detail in self.element_details])
+
+    def seed_records(self):
+        """
+        The first record is created with all its related objects and the others are copies of it, created in batches,
+        with their dates spread over the last year.
+        """
+        self.record_card = self.create_record_card(
+            user_id=BENCHMARK_USER_ID, element_detail=self.element_details[0], responsible_profile=self.root_group,
+            record_state_id=RecordState.PENDING_VALIDATE, process_pk=Process.PLANING_RESOLUTION_RESPONSE,
+            create_worflow=True, create_record_card_response=True,
+            normalized_record_id=self.get_normalized_record_id(0))
+        ubications = self.seed_ubications()
+        values = {field.attname: getattr(self.record_card, field.attname)
+                  for field in RecordCard._meta.concrete_fields if not field.primary_key}
+        records = []
+        for position in range(1, self.records_number):
+            records.append(self.copy_record_card(values, position, ubications))
+            if len(records) == self.BATCH_SIZE:
+                RecordCard.objects.bulk_create(records)
+                records = []
+        RecordCard.objects.bulk_create(records)
+        self.spread_records_dates()
+
+    def seed_ubications(self):
+        districts = list(District.objects.values_list("pk", flat=True))
+        ubications = mommy.prepare(Ubication, user_id=BENCHMARK_USER_ID, _quantity=self.UBICATIONS_NUMBER)
+        for position, ubication in enumerate(ubications):
+            ubication.district_id = districts[position % len(districts)]
+            ubication.latitude = str(41.35 + position % 100 / 1000)
+            ubication.longitude = str(2.10 + position // 100 / 100)
+            ubication.coordinate_x = 427000.0 + position
+            ubication.coordinate_y = 4581000.0 + position
+        return Ubication.objects.bulk_create(ubications)
+
+    def copy_record_card(self, values, position, ubications):
+        """
+        :return: Unsaved RecordCard with the values of the first record, assigned to other group, theme and ubication
+        """
+        return RecordCard(**{
+            **values,
+            "workflow_id": None,
+            "normalized_record_id": self.get_normalized_record_id(position),
+            "responsible_profile_id": self.groups[position % len(self.groups)].pk,
+            "element_detail_id": self.element_details[position % len(self.element_details)].pk,
+            "record_state_id": RECORD_STATES[position % len(RECORD_STATES)],
+            "ubication_id": ubications[position % len(ubications)].pk,
+            "urgent": position % 10 == 0,
+        })
+
+    def spread_records_dates(self):
+        table = RecordCard._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                UPDATE {table}
+                SET created_at = %(now)s - (id %% 730) * interval '12 hours',
+                    ans_limit_date = %(now)s + (id %% 40 - 10) * interval '1 day',
+                    ans_limit_nearexpire = %(now)s + (id %% 40 - 12) * interval '1 day'
+                WHERE normalized_record_id LIKE %(prefix)s
+            """, {"now": timezone.now(), "prefix": f"{RECORDS_PREFIX}%"})
+
+    def seed_traceability(self):
+        record_card = self.record_card
+        groups = self.groups[:3]
+        RecordCardStateHistory.objects.bulk_create([
+            RecordCardStateHistory(record_card=record_card, user_id=BENCHMARK_USER_ID, group=groups[index % 3],
+                                   previous_state_id=RecordState.PENDING_VALIDATE,
+                                   next_state_id=RecordState.IN_PLANING, automatic=bool(index % 2))
+            for index in range(self.TRACES_NUMBER)])
+        Comment.objects.bulk_create([
+            Comment(record_card=record_card, user_id=BENCHMARK_USER_ID, group=groups[index % 3],
+                    reason_id=Reason.RECORDCARD_BLOCK_CHANGE, comment=f"Comment {index}")
+            for index in range(self.TRACES_NUMBER)])
+        WorkflowComment.objects.bulk_create([
+            WorkflowComment(workflow=record_card.workflow, user_id=BENCHMARK_USER_ID, group=groups[index % 3],
+                            task=WorkflowComment.PLAN, comment=f"Workflow comment {index}")
+            for index in range(self.TRACES_NUMBER)])
+        RecordCardReasignation.objects.bulk_create([
+            RecordCardReasignation(record_card=record_card, user_id=BENCHMARK_USER_ID, group=groups[index % 3],
+                                   previous_responsible_profile=groups[index % 2], next_responsible_profile=groups[2],
+                                   reason_id=Reason.CITIZEN_RESPONSE, comment=f"Reasignation {index}")
+            for index in range(self.TRACES_NUMBER)])
+
+    def get_create_data(self):
+        """
+        :return: Data to create a record with the group of the benchmarks user, with its masters created
+        """
+        return self.get_record_card_data(group=self.root_group, user_id=BENCHMARK_USER_ID)
+
+    @staticmethod
+    def get_normalized_record_id(position):
+        return f"{RECORDS_PREFIX}{position:08d}"
@@ -0,0 +1,85 @@
+import pytest
+from django.utils import timezone
+from rest_framework.status import HTTP_200_OK, HTTP_201_CREATED
+
+from excel_export.mixins import ExcelExportListMixin
+from iris_masters.models import Application, RecordState
+from main.urls import OPEN_API_BASE_PATH, PUBLIC_API_BASE_PATH
+from record_cards.record_actions.state_machine import RecordCardStateMachine
+
+RECORDS_PATH = f"/{OPEN_API_BASE_PATH}record_cards/record_cards/"
+PUBLIC_DETAILS_PATH = f"/{PUBLIC_API_BASE_PATH}details"
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+class TestHotEndpoints:
+    """
+    Benchmarks of the hot endpoints, run with: pytest benchmarks --benchmark
+    """
+
+    def test_record_list(self, benchmark, benchmark_client):
+        benchmark("record_list", lambda: benchmark_client.get(RECORDS_PATH), HTTP_200_OK)
+
+    def test_record_list_keyset(self, benchmark, benchmark_client):
+        benchmark("record_list_keyset", lambda: benchmark_client.get(RECORDS_PATH, {"cursor": "", "count": ""}),
+                  HTTP_200_OK)
+
+    def test_record_search(self, benchmark, benchmark_client, benchmark_data):
+        params = {
+            "state": [RecordState.PENDING_VALIDATE, RecordState.IN_RESOLUTION],
+            "area": benchmark_data.element_details[0].element.area_id,
+        }
+        benchmark("record_search", lambda: benchmark_client.get(RECORDS_PATH, params), HTTP_200_OK)
+
+    def test_record_map(self, benchmark, benchmark_client):
+        benchmark("record_map", lambda: benchmark_client.get(RECORDS_PATH, {"map": ""}), HTTP_200_OK)
+
+    def test_record_detail(self, benchmark, benchmark_client, benchmark_data):
+        path = f"{RECORDS_PATH}{benchmark_data.record_card.normalized_record_id}/"
+        benchmark("record_detail", lambda: benchmark_client.get(path), HTTP_200_OK)
+
+    def test_record_create(self, benchmark, benchmark_client, benchmark_data):
+        data = benchmark_data.get_create_data()
+        benchmark("record_create", lambda: benchmark_client.post(RECORDS_PATH, data, format="json"),
+                  HTTP_201_CREATED)
+
+    def test_group_indicators(self, benchmark, benchmark_client):
+        benchmark("group_indicators", lambda: benchmark_client.get(f"{RECORDS_PATH}summary/"), HTTP_200_OK)
+
+    def test_ambit_indicators(self, benchmark, benchmark_client, benchmark_data):
+        path = f"{RECORDS_PATH}summary/ambit/{benchmark_data.root_group.pk}/"
+        benchmark("ambit_indicators", lambda: benchmark_client.get(path), HTTP_200_OK)
+
+    def test_group_month_indicators(self, benchmark, benchmark_client):
+        today = timezone.now().date()
+        path = f"{RECORDS_PATH}month-summary/{today.year}/{today.month}/"
+        benchmark("group_month_indicators", lambda: benchmark_client.get(path), HTTP_200_OK)
+
+    def test_ambit_month_indicators(self, benchmark, benchmark_client):
+        today = timezone.now().date()
+        path = f"{RECORDS_PATH}month-summary/ambit/{today.year}/{today.month}/"
+        benchmark("ambit_month_indicators", lambda: benchmark_client.get(path), HTTP_200_OK)
+
+    def test_record_traceability(self, benchmark, benchmark_client, benchmark_data):
+        path = f"{RECORDS_PATH}{benchmark_data.record_card.pk}/traceability/"
+        benchmark("record_traceability", lambda: benchmark_client.get(path), HTTP_200_OK)
+
+    def test_public_element_detail_search(self, benchmark, benchmark_client):
+        benchmark("public_element_detail_search",
+                  lambda: benchmark_client.get(PUBLIC_DETAILS_PATH, {"search": "Benchmark detail 1"},
+                                               HTTP_APPLICATION_HASH=Application.ATE_HASH), HTTP_200_OK)
+
+    def test_record_xlsx_export(self, benchmark, benchmark_client):
+        benchmark("record_xlsx_export",
+                  lambda: benchmark_client.get(RECORDS_PATH, HTTP_ACCEPT=ExcelExportListMixin.EXCEL_MIME_TYPE),
+                  HTTP_200_OK)
+
+    def test_state_machine_page(self, benchmark, benchmark_data):
+        page = [benchmark_data.record_card] * 30
+
+        def page_transitions():
+            return [(RecordCardStateMachine(record_card).get_transitions(),
+                     RecordCardStateMachine(record_card).get_current_step()) for record_card in page]
+
+        benchmark("state_machine_page", page_transitions)
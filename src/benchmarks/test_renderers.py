@@ -0,0 +1,31 @@
+import pytest
+
+from iris_templates.renderer import render_iris_1
+from iris_templates.tests.test_renderers import legacy_render_iris_1
+
+# Template of a long answer with dozens of IRIS1 variables, and its context
+RENDER_CONTEXT = {f"variable_{index}": f"value {index}" for index in range(100)}
+RENDER_TEMPLATE = "<p>" + "</p><p>".join(f"Text with variable_{index} and other words"
+                                         for index in range(0, 100, 2)) + "</p>"
+RENDERS_NUMBER = 50
+
+
+@pytest.mark.benchmark
+class TestRenderers:
+    """
+    Micro-benchmarks of the template renderers, with the previous IRIS1 renderer measured as reference. Every
+    measurement renders the template many times, as a single render is too fast to be timed.
+    """
+
+    @staticmethod
+    def renders(render):
+        def render_template():
+            for _ in range(RENDERS_NUMBER):
+                render(RENDER_TEMPLATE, RENDER_CONTEXT)
+        return render_template
+
+    def test_render_iris_1(self, benchmark):
+        benchmark("render_iris_1", self.renders(render_iris_1))
+
+    def test_legacy_render_iris_1(self, benchmark):
+        benchmark("legacy_render_iris_1", self.renders(legacy_render_iris_1))
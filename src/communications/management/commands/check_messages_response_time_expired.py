@@ -1,11 +1,13 @@
 from django.core.management.base import BaseCommand
 
 from communications.models import Message, Conversation
+from record_cards.models import RecordCard
 
 
 class Command(BaseCommand):
     """
-    Command to clean ApplicationElementDetail values tu allow uniquetogether constraint
+    Command to set the response time expired alarm on the record cards with applicant messages not answered in time.
+    The record cards are found and updated with a fixed number of queries, whatever the number of messages.
     """
 
     help = "Check Messages response time expired"
@@ -13,16 +15,14 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         self.stdout.write('Start checking if response time of messages has expired')
 
-        messages_no_answered = Message.objects.filter(is_answered=False, conversation__type=Conversation.APPLICANT,
-                                                      conversation__record_card__response_time_expired=False,
-                                                      ).select_related('conversation', 'conversation__record_card')
+        expired_messages = Message.objects.response_time_expired().filter(conversation__type=Conversation.APPLICANT)
+        record_cards = list(RecordCard.objects.filter(
+            response_time_expired=False, pk__in=expired_messages.values("conversation__record_card_id")
+        ).values_list("pk", "normalized_record_id"))
+        if not record_cards:
+            return
 
-        for message in messages_no_answered:
-            if message.response_time_expired:
-                self.stdout.write('Response time of message {} has expired'.format(message.__str__()))
-                record_card = message.conversation.record_card
-                record_card.response_time_expired = True
-                record_card.alarm = True
-                record_card.save(update_fields=["response_time_expired", "alarm"])
-                self.stdout.write('Record Card {} set response time expired alarm'.format(
-                    record_card.normalized_record_id))
+        RecordCard.objects.filter(pk__in=[pk for pk, _ in record_cards]).update(response_time_expired=True,
+                                                                                alarm=True)
+        for _, normalized_record_id in record_cards:
+            self.stdout.write('Record Card {} set response time expired alarm'.format(normalized_record_id))
@@ -1,4 +1,12 @@
+from datetime import timedelta
+
+from django.db import connections
 from django.db.models import QuerySet
+from django.utils import timezone
+
+from custom_safedelete.managers import CustomSafeDeleteManager
+from custom_safedelete.queryset import CustomSafeDeleteQueryset
+from iris_masters.models import Parameter
 
 
 class ConversationManager(QuerySet):
@@ -24,3 +32,58 @@ class ConversationManager(QuerySet):
         if record_card_id:
             qs.filter(record_card_id=record_card_id,)
         return qs.update(is_opened=False)
+
+
+class ConversationUnreadMessagesGroupQuerySet(CustomSafeDeleteQueryset):
+
+    def increment_unread_messages(self, conversation, group_ids):
+        """
+        Add an unread message to the counters of the groups in a single statement. The groups without a counter get a
+        new one, and the ones that already have it are incremented on the database, so concurrent messages can't lose
+        any increment nor create duplicated counters.
+        :param conversation: Conversation of the new message
+        :param group_ids: Ids of the groups that have to read the message
+        :return:
+        """
+        group_ids = sorted(set(group_ids))
+        if not group_ids:
+            return
+        connection = connections[self.db]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (created_at, conversation_id, group_id, unread_messages) "
+                f"SELECT %s, %s, group_id, 1 FROM unnest(%s) AS group_id "
+                f"ON CONFLICT (conversation_id, group_id) WHERE deleted IS NULL "
+                f"DO UPDATE SET unread_messages = {table}.unread_messages + 1",
+                [timezone.now(), conversation.pk, group_ids])
+
+    def unread_messages_by_conversation(self, conversations, group):
+        """
+        :param conversations: Conversations or their ids
+        :param group: Group to known the unread messages
+        :return: Dict with the unread messages of the group by conversation id, without the read conversations
+        """
+        return dict(self.filter(conversation__in=conversations, group=group).values_list(
+            "conversation_id", "unread_messages"))
+
+
+class ConversationUnreadMessagesGroupManager(CustomSafeDeleteManager):
+    _queryset_class = ConversationUnreadMessagesGroupQuerySet
+
+    def increment_unread_messages(self, conversation, group_ids):
+        return self.get_queryset().increment_unread_messages(conversation, group_ids)
+
+    def unread_messages_by_conversation(self, conversations, group):
+        return self.get_queryset().unread_messages_by_conversation(conversations, group)
+
+
+class MessageQuerySet(QuerySet):
+
+    def response_time_expired(self):
+        """
+        Filter the messages that have not been answered before the response deadline, as Message.response_time_expired
+        :return: Filtered queryset
+        """
+        limit_answer_days = int(Parameter.get_parameter_by_key("DIES_RESPOSTA_CI", 7))
+        return self.filter(is_answered=False, created_at__lt=timezone.now() - timedelta(days=limit_answer_days))
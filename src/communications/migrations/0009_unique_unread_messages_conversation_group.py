@@ -0,0 +1,35 @@
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+from django.utils import timezone
+
+
+def merge_duplicated_unread_messages(apps, schema_editor):
+    """
+    Concurrent messages could create more than one counter for a group of a conversation. The first counter keeps the
+    unread messages of all of them and the others are deleted, so they can be unique.
+    """
+    ConversationUnreadMessagesGroup = apps.get_model("communications", "ConversationUnreadMessagesGroup")
+    unread_groups = ConversationUnreadMessagesGroup.objects.filter(deleted__isnull=True)
+    duplicated = unread_groups.values("conversation_id", "group_id").annotate(
+        counters=Count("id"), first_id=Min("id"), unread=Sum("unread_messages")).filter(counters__gt=1)
+    for counter in duplicated:
+        unread_groups.filter(pk=counter["first_id"]).update(unread_messages=counter["unread"])
+        unread_groups.filter(conversation_id=counter["conversation_id"], group_id=counter["group_id"]).exclude(
+            pk=counter["first_id"]).update(deleted=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communications', '0008_auto_20220201_1020'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicated_unread_messages, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='conversationunreadmessagesgroup',
+            constraint=models.UniqueConstraint(condition=models.Q(deleted__isnull=True),
+                                               fields=('conversation', 'group'),
+                                               name='unique_unread_messages_conversation_group'),
+        ),
+    ]
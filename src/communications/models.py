@@ -6,7 +6,7 @@ from django.db import models
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
-from communications.managers import ConversationManager
+from communications.managers import ConversationManager, ConversationUnreadMessagesGroupManager, MessageQuerySet
 from custom_safedelete.models import CustomSafeDeleteModel
 from iris_masters.models import UserTrack, RecordState, Parameter
 from profiles.models import Group
@@ -49,14 +49,11 @@ class Conversation(UserTrack):
         """
         Get the number of unread messages of conversation from a group
         :param group: Group to known the unread messages
-        :return: If we have registers return unread_messages registered on the db, else return the number of messages
+        :return: If we have registers return unread_messages registered on the db, else return 0
         """
-        try:
-            return ConversationUnreadMessagesGroup.objects.get(conversation=self, group=group).unread_messages
-        except ConversationUnreadMessagesGroup.DoesNotExist:
-            # If group hasn't any ConversationUnreadMessagesGroup from this conversations means that the group
-            # has read the messages
-            return 0
+        # If group hasn't any ConversationUnreadMessagesGroup from this conversations means that the group
+        # has read the messages
+        return ConversationUnreadMessagesGroup.objects.unread_messages_by_conversation([self], group).get(self.pk, 0)
 
     def update_unread_messages(self, message_group):
         """
@@ -72,12 +69,7 @@ class Conversation(UserTrack):
             groups_messages_ids = Conversation.objects.internal_conversation_groups(
                 self, groups_messages_ids, message_group)
 
-        for groups_messages_id in groups_messages_ids:
-            unread, created = ConversationUnreadMessagesGroup.objects.get_or_create(
-                conversation=self, group_id=groups_messages_id, defaults={"unread_messages": 1})
-            if not created:
-                unread.unread_messages += 1
-                unread.save()
+        ConversationUnreadMessagesGroup.objects.increment_unread_messages(self, groups_messages_ids)
 
     def reset_unread_messages_bygroup(self, group):
         """
@@ -100,17 +92,26 @@ class ConversationGroup(UserTrack):
 
 
 class ConversationUnreadMessagesGroup(CustomSafeDeleteModel):
+    objects = ConversationUnreadMessagesGroupManager()
 
     created_at = models.DateTimeField(verbose_name=_("Creation date"), auto_now_add=True)
     conversation = models.ForeignKey(Conversation, verbose_name=_("Conversation"), on_delete=models.PROTECT)
     group = models.ForeignKey(Group, verbose_name=_("Group"), on_delete=models.PROTECT)
     unread_messages = models.IntegerField(default=0)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["conversation", "group"], condition=models.Q(deleted__isnull=True),
+                                    name="unique_unread_messages_conversation_group"),
+        ]
+
     def __str__(self):
         return "{} - {} - {}".format(self.conversation.__str__(), self.group.description, self.unread_messages)
 
 
 class Message(UserTrack):
+    objects = MessageQuerySet.as_manager()
+
     conversation = models.ForeignKey(Conversation, verbose_name=_("Conversation"), on_delete=models.PROTECT)
     group = models.ForeignKey(Group, verbose_name=_("Group"), on_delete=models.PROTECT)
     record_state = models.ForeignKey(RecordState, on_delete=models.PROTECT,
@@ -1,3 +1,4 @@
+from django.db.models import Manager
 from django.urls import reverse_lazy
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
@@ -28,6 +29,19 @@ class ConversationGroupSerializer(ModelSerializer):
         fields = ("group", "description")
 
 
+class ConversationListSerializer(GetGroupFromRequestMixin, serializers.ListSerializer):
+    """
+    Read the unread messages of the whole list of conversations at once, with a single query
+    """
+
+    def to_representation(self, data):
+        conversations = list(data.all() if isinstance(data, Manager) else data)
+        group = self.get_group_from_request(self.context.get("request"))
+        self.context["unread_messages"] = ConversationUnreadMessagesGroup.objects.unread_messages_by_conversation(
+            conversations, group)
+        return super().to_representation(conversations)
+
+
 class ConversationSerializer(GetGroupFromRequestMixin, ModelSerializer):
     groups_involved = ManyToManyExtendedSerializer(source="conversationgroup_set", required=False,
                                                    **{"many_to_many_serializer": ConversationGroupSerializer,
@@ -41,8 +55,12 @@ class ConversationSerializer(GetGroupFromRequestMixin, ModelSerializer):
         fields = ("id", "user_id", "created_at", "type", "is_opened", "groups_involved", "external_email",
                   "unread_messages", "creation_group", "require_answer")
         read_only_fields = fields
+        list_serializer_class = ConversationListSerializer
 
     def get_unread_messages(self, obj):
+        unread_messages = self.context.get("unread_messages")
+        if unread_messages is not None:
+            return unread_messages.get(obj.pk, 0)
         group = self.get_group_from_request(self.context.get("request"))
         return obj.unread_messages_by_group(group)
 
@@ -0,0 +1,82 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from model_mommy import mommy
+
+from communications.models import Conversation, Message
+from iris_masters.models import Parameter, RecordState
+from record_cards.models import RecordCard
+from record_cards.tests.utils import CreateRecordCardMixin
+from communications.tests.utils import load_missing_data
+
+
+@pytest.mark.django_db
+class TestCheckMessagesResponseTimeExpired(CreateRecordCardMixin):
+
+    def given_messages(self, number):
+        """
+        Every group of records has one of each kind of conversation and message
+        :return: Ids of the records that have to be set as expired, the ones not expired yet with an applicant message
+        not answered for more than the 7 days to answer
+        """
+        load_missing_data()
+        expired_ids = []
+        for _ in range(number):
+            for conversation_type in (Conversation.APPLICANT, Conversation.INTERNAL, Conversation.EXTERNAL):
+                for is_answered in (True, False):
+                    for days in (1, 10):
+                        for response_time_expired in (True, False):
+                            record_card_id = self.given_message(conversation_type, is_answered, days,
+                                                                response_time_expired)
+                            if conversation_type == Conversation.APPLICANT and not is_answered and days == 10 \
+                                    and not response_time_expired:
+                                expired_ids.append(record_card_id)
+        return expired_ids
+
+    def given_message(self, conversation_type, is_answered, days, response_time_expired):
+        record_card = self.create_record_card()
+        RecordCard.objects.filter(pk=record_card.pk).update(response_time_expired=response_time_expired)
+        conversation = mommy.make(Conversation, user_id="2222", record_card=record_card, type=conversation_type)
+        message = Message.objects.create(conversation=conversation, group=record_card.responsible_profile,
+                                         record_state_id=RecordState.PENDING_VALIDATE, text="text",
+                                         is_answered=is_answered)
+        Message.objects.filter(pk=message.pk).update(created_at=timezone.now() - timedelta(days=days))
+        return record_card.pk
+
+    @staticmethod
+    def record_alarms():
+        return list(RecordCard.objects.order_by("pk").values_list("pk", "response_time_expired", "alarm"))
+
+    def test_expired_records(self):
+        expired_ids = self.given_messages(2)
+        assert len(expired_ids) == 2
+        initial_alarms = self.record_alarms()
+        call_command("check_messages_response_time_expired", stdout=StringIO())
+        assert self.record_alarms() == [
+            (pk, True, True) if pk in expired_ids else (pk, response_time_expired, alarm)
+            for pk, response_time_expired, alarm in initial_alarms]
+
+    def test_constant_queries(self):
+        self.given_messages(1)
+        Parameter.get_parameter_by_key("DIES_RESPOSTA_CI")
+        with CaptureQueriesContext(connection) as queries:
+            call_command("check_messages_response_time_expired", stdout=StringIO())
+        queries_number = len(queries)
+
+        self.given_messages(3)
+        Parameter.get_parameter_by_key("DIES_RESPOSTA_CI")
+        with CaptureQueriesContext(connection) as queries:
+            call_command("check_messages_response_time_expired", stdout=StringIO())
+        assert len(queries) == queries_number
+
+    def test_no_expired_messages(self):
+        load_missing_data()
+        self.given_message(Conversation.APPLICANT, False, 1, False)
+        initial_alarms = self.record_alarms()
+        call_command("check_messages_response_time_expired", stdout=StringIO())
+        assert self.record_alarms() == initial_alarms
@@ -1,8 +1,12 @@
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
+from threading import Barrier
 from mock import patch, Mock
 from model_mommy import mommy
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from communications.models import Conversation, ConversationUnreadMessagesGroup, Message
@@ -66,6 +70,100 @@ class TestConversation(CreateRecordCardMixin):
                 conversation=conversation,
                 group=group).unread_messages == expected_group_unread
 
+    def given_external_conversation(self, groups_number):
+        """
+        :return: Conversation where every group has written two messages, the responsible profile and the groups
+        """
+        load_missing_data()
+        record_card = self.create_record_card()
+        conversation = mommy.make(Conversation, user_id="2222", record_card=record_card, type=Conversation.EXTERNAL)
+        groups = [mommy.make(Group, user_id="222", profile_ctrl_user_id="2222") for _ in range(groups_number)]
+        for group in groups + groups:
+            mommy.make(Message, user_id="2222", conversation=conversation, group=group,
+                       record_state_id=RecordState.PENDING_VALIDATE)
+        return conversation, record_card.responsible_profile, groups
+
+    @pytest.mark.parametrize("groups_number", (1, 5, 20))
+    def test_update_unread_messages_queries(self, groups_number):
+        conversation, message_group, groups = self.given_external_conversation(groups_number)
+        ConversationUnreadMessagesGroup.objects.create(conversation=conversation, group=groups[0], unread_messages=3)
+        with CaptureQueriesContext(connection) as queries:
+            conversation.update_unread_messages(message_group)
+        assert len(queries) == 2
+        unread_messages = ConversationUnreadMessagesGroup.objects.filter(conversation=conversation)
+        assert dict(unread_messages.values_list("group_id", "unread_messages")) == {
+            group.pk: 4 if index == 0 else 1 for index, group in enumerate(groups)}
+
+    def test_interleaved_updates(self):
+        """
+        Other messages can update the counters between the read of the groups and the update of a message
+        """
+        conversation, message_group, groups = self.given_external_conversation(2)
+        conversation.type = Conversation.INTERNAL
+        group_ids = [group.pk for group in groups]
+        ConversationUnreadMessagesGroup.objects.create(conversation=conversation, group=groups[0], unread_messages=1)
+
+        def concurrent_message(*args, **kwargs):
+            ConversationUnreadMessagesGroup.objects.increment_unread_messages(conversation, group_ids)
+            return group_ids
+
+        with patch("communications.managers.ConversationManager.internal_conversation_groups",
+                   Mock(side_effect=concurrent_message)):
+            for _ in range(3):
+                conversation.update_unread_messages(message_group)
+        unread_messages = ConversationUnreadMessagesGroup.objects.filter(conversation=conversation)
+        assert dict(unread_messages.values_list("group_id", "unread_messages")) == {groups[0].pk: 7, groups[1].pk: 6}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_concurrent_updates(self):
+        """
+        Messages written at the same time by different requests, every one with its own connection to the database
+        """
+        conversation, message_group, groups = self.given_external_conversation(3)
+        threads_number, updates_number = 4, 10
+        barrier = Barrier(threads_number)
+
+        def write_messages():
+            try:
+                barrier.wait()
+                for _ in range(updates_number):
+                    conversation.update_unread_messages(message_group)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=threads_number) as executor:
+            for future in [executor.submit(write_messages) for _ in range(threads_number)]:
+                future.result()
+
+        unread_messages = ConversationUnreadMessagesGroup.all_objects.filter(conversation=conversation)
+        assert sorted(unread_messages.values_list("group_id", "unread_messages")) == [
+            (group.pk, threads_number * updates_number) for group in sorted(groups, key=lambda group: group.pk)]
+
+    def test_update_unread_messages_after_read(self):
+        conversation, message_group, groups = self.given_external_conversation(1)
+        conversation.update_unread_messages(message_group)
+        conversation.update_unread_messages(message_group)
+        conversation.reset_unread_messages_bygroup(groups[0])
+        conversation.update_unread_messages(message_group)
+        assert conversation.unread_messages_by_group(groups[0]) == 1
+        assert list(ConversationUnreadMessagesGroup.all_objects.filter(conversation=conversation).order_by(
+            "pk").values_list("unread_messages", flat=True)) == [2, 1]
+
+    def test_unread_messages_by_conversation(self):
+        load_missing_data()
+        record_card = self.create_record_card()
+        group = record_card.responsible_profile
+        conversations = [mommy.make(Conversation, user_id="2222", record_card=record_card) for _ in range(4)]
+        for unread_messages, conversation in enumerate(conversations[1:], start=1):
+            ConversationUnreadMessagesGroup.objects.create(conversation=conversation, group=group,
+                                                           unread_messages=unread_messages)
+        conversations[3].reset_unread_messages_bygroup(group)
+        with CaptureQueriesContext(connection) as queries:
+            unread_messages = ConversationUnreadMessagesGroup.objects.unread_messages_by_conversation(
+                conversations, group)
+        assert len(queries) == 1
+        assert unread_messages == {conversations[1].pk: 1, conversations[2].pk: 2}
+
     @pytest.mark.parametrize("unread_messages", (0, 1, 5))
     def test_reset_unread_messages_bygroup(self, unread_messages):
         load_missing_data()
@@ -30,6 +30,19 @@ class TestConversationSerializer(CreateRecordCardMixin, FieldsTestSerializerMixi
         return mommy.make(Conversation, user_id="2222", record_card=self.create_record_card(),
                           creation_group=mommy.make(Group, user_id="2222", profile_ctrl_user_id="ssssssss"))
 
+    def test_list_unread_messages(self):
+        load_missing_data()
+        group, request = self.set_group_request()
+        record_card = self.create_record_card()
+        conversations = [mommy.make(Conversation, user_id="2222", record_card=record_card) for _ in range(3)]
+        ConversationUnreadMessagesGroup.objects.increment_unread_messages(conversations[0], [group.pk])
+        ConversationUnreadMessagesGroup.objects.increment_unread_messages(conversations[0], [group.pk])
+        ConversationUnreadMessagesGroup.objects.increment_unread_messages(conversations[2], [group.pk])
+        with patch("communications.models.Conversation.unread_messages_by_group") as unread_messages_by_group:
+            data = ConversationSerializer(conversations, many=True, context={"request": request}).data
+        unread_messages_by_group.assert_not_called()
+        assert [conversation["unread_messages"] for conversation in data] == [2, 0, 1]
+
 
 @pytest.mark.django_db
 class TestConversationCreationSerializer(CreateRecordCardMixin, SetPermissionMixin, SetGroupRequestMixin):
@@ -1,6 +1,42 @@
 import pytest
 
 
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmark", "benchmarks of the hot endpoints")
+    group.addoption("--benchmark", action="store_true", default=False,
+                    help="Run the benchmarks of the hot endpoints, that are skipped by default.")
+    group.addoption("--benchmark-records", type=int, default=20000,
+                    help="Number of records seeded for the benchmarks.")
+    group.addoption("--benchmark-rounds", type=int, default=3,
+                    help="Number of timed requests of every benchmark, the best time is reported.")
+    group.addoption("--benchmark-budgets", default=None,
+                    help="JSON file with the budgets of the endpoints that replace the default ones.")
+    group.addoption("--benchmark-json", default=None, help="JSON file where the measurements are saved.")
+
+
+@pytest.fixture(autouse=True)
+def clear_versioned_caches():
+    """
+    Test transactions are rolled back without invalidating the versioned caches, so every test starts with all of
+    them empty.
+    """
+    from main.caches import VersionedCache
+    VersionedCache.invalidate_all()
+
+
+@pytest.fixture(scope="session")
+def django_db_setup(django_db_setup, django_db_blocker):
+    """
+    The tests database is created without migrations, so the applicant search function and indexes, that are created
+    by a migration, are added here.
+    """
+    from django.db import connection
+    from record_cards.applicant_search import CREATE_APPLICANT_SEARCH_SQL
+    with django_db_blocker.unblock(), connection.cursor() as cursor:
+        for statement in CREATE_APPLICANT_SEARCH_SQL:
+            cursor.execute(statement)
+
+
 @pytest.fixture(scope="session")
 def base64_image():
     return "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAIAAACQd1PeAAAADElEQVR4nGPwzO0EAAJCAUB17jgyAAAAAElFTkSuQmCC"
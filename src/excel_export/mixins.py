@@ -1,5 +1,8 @@
 from collections import OrderedDict
+from tempfile import TemporaryFile
 
+from django.db.models import QuerySet, prefetch_related_objects
+from django.http import FileResponse
 from drf_renderer_xlsx.mixins import XLSXFileMixin
 from rest_framework.mixins import ListModelMixin
 from rest_framework.renderers import JSONRenderer, BrowsableAPIRenderer
@@ -39,6 +42,7 @@ class ExcelExportListMixin(ColumnNamesMixin, XLSXFileMixin, ExcelBaseStyles, Lis
         NESTED_BASE_KEY: [],
     }
     export_serializer = None
+    export_chunk_size = 500
 
     @property
     def is_export(self):
@@ -55,13 +59,49 @@ class ExcelExportListMixin(ColumnNamesMixin, XLSXFileMixin, ExcelBaseStyles, Lis
         queryset = self.filter_queryset(self.get_queryset())[:reg_limit]
         serializer = self.get_serializer(queryset, many=True)
 
-        data_response = []
-
-        for obj in serializer.data:
-            data_response.append(OrderedDict((field, obj.get(field))
-                                             for field in self.nested_excel_fields[self.NESTED_BASE_KEY]))
-
-        return Response(data_response)
+        rows = (OrderedDict((field, obj.get(field)) for field in self.nested_excel_fields[self.NESTED_BASE_KEY])
+                for obj in self.serialize_export_rows(serializer, queryset))
+        return self.export_response(rows)
+
+    def serialize_export_rows(self, serializer, queryset):
+        """
+        Serialize the export rows in chunks, so only a chunk of objects is kept in memory at once.
+        The queryset iterator ignores prefetch_related, so the lookups are prefetched for every chunk.
+
+        :param serializer: List serializer of the export
+        :param queryset: Queryset to export
+        :return: Generator of the serialized rows
+        """
+        if isinstance(queryset, QuerySet):
+            prefetch_lookups = queryset._prefetch_related_lookups
+            objects = queryset.iterator(chunk_size=self.export_chunk_size)
+        else:
+            prefetch_lookups = ()
+            objects = iter(queryset)
+
+        while True:
+            chunk = [obj for _, obj in zip(range(self.export_chunk_size), objects)]
+            if not chunk:
+                return
+            if prefetch_lookups:
+                prefetch_related_objects(chunk, *prefetch_lookups)
+            yield from serializer.to_representation(chunk)
+
+    def export_response(self, rows):
+        """
+        Write the rows on a temporary file instead of building the workbook in memory and stream it to the client
+
+        :param rows: Iterable of export rows
+        :return: File response with the workbook
+        """
+        renderer = self.request.accepted_renderer
+        output = TemporaryFile()
+        renderer.write_workbook(rows, self.get_renderer_context(), output)
+        output.seek(0)
+        response = FileResponse(output, content_type=renderer.media_type)
+        # Required by XLSXFileMixin.finalize_response to set the filename
+        response.accepted_renderer = renderer
+        return response
 
     def get_serializer(self, *args, **kwargs):
         serializer_instance = super().get_serializer(*args, **kwargs)
@@ -1,13 +1,15 @@
 from datetime import date
+from io import BytesIO
+from itertools import chain
 
 from django.utils.translation import gettext
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import PatternFill
 from openpyxl.styles.numbers import FORMAT_DATE_DDMMYY
 from openpyxl.drawing.image import Image
 from openpyxl.utils import get_column_letter
 from openpyxl.utils.exceptions import IllegalCharacterError
-from openpyxl.writer.excel import save_virtual_workbook
 
 from drf_renderer_xlsx.renderers import XLSXRenderer, get_attribute, get_style_from_dict
 
@@ -15,14 +17,17 @@ from drf_renderer_xlsx.renderers import XLSXRenderer, get_attribute, get_style_f
 class CustomXLSXRenderer(XLSXRenderer):
     """
     Custom Renderer for Excel spreadsheet open data format (xlsx) for override the format_number of date cells, to be
-    written on the excel file as dates cells
+    written on the excel file as dates cells.
+
+    The workbook is built in write-only mode, so the rows are written to disk as they come instead of being kept in
+    memory. It allows to render an iterator of rows with write_workbook.
     """
 
     media_type = "application/xlsx"
     format = "xlsx"
     row_color = "row_color"
 
-    def render(self, data, accepted_media_type=None, renderer_context=None):  # noqa C901
+    def render(self, data, accepted_media_type=None, renderer_context=None):
         """
         Render `data` into XLSX workbook, returning a workbook.
         """
@@ -32,10 +37,21 @@ class CustomXLSXRenderer(XLSXRenderer):
         if data is None:
             return bytes()
 
-        wb = Workbook()
-        ws = wb.active
-
         results = data["results"] if "results" in data else data
+        output = BytesIO()
+        self.write_workbook(results, renderer_context, output)
+        return output.getvalue()
+
+    def write_workbook(self, rows, renderer_context, output):
+        """
+        Write the rows into a XLSX workbook
+
+        :param rows: Iterable of rows dicts, it is consumed only once
+        :param renderer_context: Renderer context with the view that defines the header, column header and body
+        :param output: Filename or file-like object where the workbook is saved
+        """
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
 
         # Take header and column_header params from view
         header, header_title = self.get_header(ws, renderer_context)
@@ -46,36 +62,35 @@ class CustomXLSXRenderer(XLSXRenderer):
             column_header.get("style"), "column_header_style"
         )
 
-        column_count = 0
-        row_count = 1
-        if header:
-            row_count += 1
-        # Make column headers
-        column_titles = column_header.get("titles", [])
-
         # If we have results, pull the columns names from the keys of the first row
-        if len(results):
-            column_names_first_row = self._flatten(results[0])
-            for column_name in column_names_first_row.keys():
-                if column_name == self.row_color:
-                    continue
-                column_count += 1
-                column_name_display = self.select_column_name(column_name, column_count, column_titles)
-                ws.cell(row=row_count, column=column_count, value=column_name_display).style = column_header_style
-            ws.row_dimensions[row_count].height = column_header.get("height", 45)
+        rows = iter(rows)
+        first_row = next(rows, None)
+        column_names = []
+        if first_row is not None:
+            column_names = [column_name for column_name in self._flatten(first_row).keys()
+                            if column_name != self.row_color]
+            rows = chain([first_row], rows)
+        column_count = len(column_names)
+
+        # Styles of rows and columns must be set before writing any cell on write only mode
+        self.set_column_width(ws, column_header, column_count)
+        body = get_attribute(renderer_context["view"], "body", {})
+        ws.sheet_format.defaultRowHeight = body.get("height", 40)
+        ws.sheet_format.customHeight = True
 
         # Set the header row
         self.set_header_row(ws, header, column_count, header_title, header_style)
 
-        # Set column width
-        self.set_column_width(ws, column_header, column_count)
+        # Make column headers
+        if column_names:
+            ws.row_dimensions[2 if header else 1].height = column_header.get("height", 45)
+            self.set_columns_names(ws, column_names, column_header.get("titles", []), column_header_style)
 
         # Make body
-        body = get_attribute(renderer_context["view"], "body", {})
         body_style = get_style_from_dict(body.get("style"), "body_style")
-        self.fill_body(ws, results, body, body_style, row_count)
+        self.fill_body(ws, rows, body_style)
 
-        return save_virtual_workbook(wb)
+        wb.save(output)
 
     def get_header(self, ws, renderer_context):
         # Take header and column_header params from view
@@ -91,26 +106,22 @@ class CustomXLSXRenderer(XLSXRenderer):
     def select_column_name(self, column_name, column_count, column_titles):
         return gettext(column_name) if column_count > len(column_titles) else column_titles[column_count - 1]
 
-    def set_columns_names(self, ws, column_names_first_row, column_count, column_titles, column_header_style,
-                          row_count):
-        for column_name in column_names_first_row.keys():
-            if column_name == self.row_color:
-                continue
-            column_count += 1
-            column_name_display = self.select_column_name(column_name, column_count, column_titles)
-            ws.cell(row=row_count, column=column_count, value=column_name_display).style = column_header_style
+    def set_columns_names(self, ws, column_names, column_titles, column_header_style):
+        ws.append([
+            self.styled_cell(ws, self.select_column_name(column_name, column_count, column_titles),
+                             column_header_style)
+            for column_count, column_name in enumerate(column_names, 1)
+        ])
 
-    @staticmethod
-    def set_header_row(ws, header, column_count, header_title, header_style):
+    def set_header_row(self, ws, header, column_count, header_title, header_style):
         if header:
             last_col_letter = "G"
             if column_count:
                 last_col_letter = get_column_letter(column_count)
-            ws.merge_cells("A1:{}1".format(last_col_letter))
+            ws.merged_cells.add("A1:{}1".format(last_col_letter))
 
-            cell = ws.cell(row=1, column=1, value=header_title)
-            cell.style = header_style
             ws.row_dimensions[1].height = header.get("height", 45)
+            ws.append([self.styled_cell(ws, header_title, header_style)])
 
     @staticmethod
     def set_column_width(ws, column_header, column_count):
@@ -124,33 +135,28 @@ class CustomXLSXRenderer(XLSXRenderer):
                 col_letter = get_column_letter(ws_column)
                 ws.column_dimensions[col_letter].width = column_width
 
-    def fill_body(self, ws, results, body, body_style, row_count):
-        for row in results:
-            column_count = 0
-            row_count += 1
-            flatten_row = self._flatten(row)
-            for column_name, value in flatten_row.items():
+    @staticmethod
+    def styled_cell(ws, value, style):
+        try:
+            cell = WriteOnlyCell(ws, value=value)
+        except IllegalCharacterError:
+            value = value.replace("\r", " ").replace("\n", " ").replace("\v", "")
+            cell = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        return cell
+
+    def fill_body(self, ws, rows, body_style):
+        for row in rows:
+            fill = PatternFill(fill_type="solid", start_color=row[self.row_color]) if self.row_color in row else None
+            cells = []
+            for column_name, value in self._flatten(row).items():
                 if column_name == self.row_color:
                     continue
-                column_count += 1
-                try:
-                    cell = ws.cell(row=row_count, column=column_count, value=value)
-                except IllegalCharacterError:
-                    value = value.replace("\r", " ").replace("\n", " ").replace("\v", "")
-                    cell = ws.cell(row=row_count, column=column_count, value=value)
-                cell.style = body_style
+                cell = self.styled_cell(ws, value, body_style)
                 # Override numberformat of date cells
                 if isinstance(value, date):
                     cell.number_format = FORMAT_DATE_DDMMYY
-            ws.row_dimensions[row_count].height = body.get("height", 40)
-
-            self.fill_row_background(ws, row, column_count, row_count)
-
-    def fill_row_background(self, ws, row, column_count, row_count):
-        if self.row_color in row:
-            last_letter = get_column_letter(column_count)
-            cell_range = ws["A{}".format(row_count): "{}{}".format(last_letter, row_count)]
-            fill = PatternFill(fill_type="solid", start_color=row[self.row_color])
-            for r in cell_range:
-                for c in r:
-                    c.fill = fill
+                if fill:
+                    cell.fill = fill
+                cells.append(cell)
+            ws.append(cells)
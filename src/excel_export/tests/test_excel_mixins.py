@@ -1,7 +1,12 @@
+from io import BytesIO
+from types import SimpleNamespace
+
 import pytest
 from django.contrib.auth.models import User
+from django.http import FileResponse
 from django.test import RequestFactory
 from django.utils.functional import cached_property
+from openpyxl import load_workbook
 
 from rest_framework import serializers
 from rest_framework.generics import ListAPIView
@@ -25,6 +30,14 @@ class DummyAPIView(ExcelExportListMixin, ListAPIView):
     queryset = []
 
 
+class DummyObjectsAPIView(DummyAPIView):
+    export_chunk_size = 3
+
+    def get_queryset(self):
+        return [SimpleNamespace(field="field{}".format(index), second_field="second", third_field="third")
+                for index in range(10)]
+
+
 @pytest.mark.django_db
 class TestExcelExportListMixin(SetUserGroupMixin):
 
@@ -39,3 +52,16 @@ class TestExcelExportListMixin(SetUserGroupMixin):
         request.user = self.user
         response = DummyAPIView.as_view()(request)
         assert type(response.accepted_renderer) == CustomXLSXRenderer
+
+    def test_excel_export_streaming(self):
+        request = RequestFactory().get("/")
+        request.META["HTTP_ACCEPT"] = "application/xlsx"
+        self.set_usergroup()
+        request.user = self.user
+        response = DummyObjectsAPIView.as_view()(request)
+        assert isinstance(response, FileResponse)
+        assert response["content-disposition"] == "attachment; filename=list-export.xlsx"
+        ws = load_workbook(BytesIO(b"".join(response.streaming_content))).active
+        rows = [[cell.value for cell in row] for row in ws.iter_rows()]
+        assert len(rows) == 11
+        assert rows[1:3] == [["field0", "second"], ["field1", "second"]]
@@ -0,0 +1,60 @@
+import tracemalloc
+from datetime import date
+from io import BytesIO
+from tempfile import TemporaryFile
+
+import pytest
+from openpyxl import load_workbook
+
+from excel_export.renderers import CustomXLSXRenderer
+from excel_export.styles import ExcelBaseStyles
+
+
+class DummyExcelView(ExcelBaseStyles):
+    header = {"header_title": "Report title", "tab_title": "Report"}
+
+    def get_column_header(self):
+        column_header = super().get_column_header()
+        column_header["titles"] = ["Identifier", "Date"]
+        return column_header
+
+
+def export_rows(rows_number):
+    for row_number in range(rows_number):
+        row = {"identifier": "record\v {}".format(row_number), "date": date(2020, 1, 1), "count": row_number}
+        if row_number % 2:
+            row["row_color"] = "FF0000"
+        yield row
+
+
+class TestCustomXLSXRenderer:
+
+    def test_render(self):
+        workbook = CustomXLSXRenderer().render(list(export_rows(3)), renderer_context={"view": DummyExcelView()})
+        ws = load_workbook(BytesIO(workbook)).active
+
+        assert ws.title == "Report"
+        assert [str(cell_range) for cell_range in ws.merged_cells.ranges] == ["A1:C1"]
+        rows = [[cell.value for cell in row] for row in ws.iter_rows()]
+        assert rows[0] == ["Report title", None, None]
+        assert rows[1] == ["Identifier", "Date", "count"]
+        assert [row[0] for row in rows[2:]] == ["record 0", "record 1", "record 2"]
+        assert ws["B3"].number_format == "dd/mm/yy"
+        assert ws["A4"].fill.start_color.rgb == "00FF0000"
+
+    def test_render_no_results(self):
+        workbook = CustomXLSXRenderer().render([], renderer_context={"view": DummyExcelView()})
+        assert load_workbook(BytesIO(workbook)).active.title == "Report"
+
+    @staticmethod
+    def write_workbook_memory_peak(rows_number):
+        tracemalloc.start()
+        with TemporaryFile() as output:
+            CustomXLSXRenderer().write_workbook(export_rows(rows_number), {"view": DummyExcelView()}, output)
+        _, memory_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return memory_peak
+
+    @pytest.mark.parametrize("rows_number", (10000, 50000))
+    def test_write_workbook_constant_memory(self, rows_number):
+        assert self.write_workbook_memory_peak(rows_number) < self.write_workbook_memory_peak(1000) * 1.5
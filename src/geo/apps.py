@@ -1,5 +1,11 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class GeoConfig(AppConfig):
     name = 'geo'
+
+    def ready(self):
+        # Data migrations write bounds through historical models, that don't invalidate the cache
+        from geo.caches import bounds_cache
+        post_migrate.connect(bounds_cache.invalidate, sender=self, weak=False)
@@ -0,0 +1,100 @@
+from django.contrib.gis.geos import GEOSGeometry, Point
+
+from main.caches import VersionedCache
+
+
+class PreparedBound:
+    """
+    Bound polygon prepared for fast and repeated point containment checks
+    """
+
+    def __init__(self, value, wkb, srid) -> None:
+        self.value = value
+        geometry = GEOSGeometry(wkb, srid=srid)
+        self.xmin, self.ymin, self.xmax, self.ymax = geometry.extent
+        self.prepared = geometry.prepared
+
+    def contains(self, point) -> bool:
+        # The envelope check discards most of the bounds without calling GEOS
+        if not (self.xmin <= point.x <= self.xmax and self.ymin <= point.y <= self.ymax):
+            return False
+        return self.prepared.contains(point)
+
+
+class BoundsIndex:
+    """
+    In memory spatial index of the DistrictBorder and AreaBounds polygons
+    """
+
+    def __init__(self, data) -> None:
+        self.srid = data["srid"]
+        self.districts = [PreparedBound(district_id, wkb, self.srid) for district_id, wkb in data["districts"]]
+        self.categories = {
+            codename: [PreparedBound(bound_codename, wkb, self.srid) for bound_codename, wkb in bounds]
+            for codename, bounds in data["categories"].items()
+        }
+        self.ubication_fields = data["ubication_fields"]
+
+    def get_point_areas(self, etrs_x, etrs_y) -> dict:
+        """
+        Resolve all the areas that contain a point, with the same semantics as BoundQuerySet.contains_point.
+
+        :param etrs_x: ETRS89 x coordinate
+        :param etrs_y: ETRS89 y coordinate
+        :return: Dict with the district ids containing the point, and the codenames of the bounds of every
+                 AreaCategory (by its codename) containing the point
+        """
+        areas = {"districts": [], "categories": {codename: [] for codename in self.categories}}
+        if not (etrs_x and etrs_y):
+            return areas
+
+        point = Point(float(etrs_x), float(etrs_y), srid=self.srid)
+        areas["districts"] = [bound.value for bound in self.districts if bound.contains(point)]
+        for codename, bounds in self.categories.items():
+            areas["categories"][codename] = [bound.value for bound in bounds if bound.contains(point)]
+        return areas
+
+
+class BoundsCache(VersionedCache):
+    """
+    Cache of the geographic bounds. The polygons are shared as WKB and every process builds its own BoundsIndex from
+    them, because the prepared geometries can't be pickled.
+    """
+    cache_key = "geo:bounds"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._index = None
+        self._index_data = None
+
+    def load_data(self):
+        from django.conf import settings
+        from geo.models import AreaBounds, AreaCategory, DistrictBorder
+
+        categories = {category.codename: [] for category in AreaCategory.objects.only("codename")}
+        for category_codename, codename, mpoly in AreaBounds.objects.values_list(
+                "category__codename", "codename", "mpoly").order_by("pk"):
+            categories[category_codename].append((codename, bytes(mpoly.wkb)))
+
+        return {
+            "srid": settings.GEO_SRID,
+            "districts": [(district_id, bytes(mpoly.wkb)) for district_id, mpoly in
+                          DistrictBorder.objects.values_list("district_id", "mpoly").order_by("pk")],
+            "categories": categories,
+            "ubication_fields": dict(AreaCategory.objects.which_update_records().values_list(
+                "codename", "ubication_field")),
+        }
+
+    def get_index(self) -> BoundsIndex:
+        data = self.get_data()
+        with self._lock:
+            if self._index is None or self._index_data is not data:
+                self._index = BoundsIndex(data)
+                self._index_data = data
+            return self._index
+
+    def get_point_areas(self, etrs_x, etrs_y) -> dict:
+        return self.get_index().get_point_areas(etrs_x, etrs_y)
+
+
+bounds_cache = BoundsCache()
@@ -1,57 +1,63 @@
-from geo.models import DistrictBorder, AreaCategory, AreaBounds
+from geo.caches import bounds_cache
+from geo.models import AreaCategory
+from iris_masters.models import District
 from record_cards.record_actions.geocode import BaseGeocoder
 
 
 class GisGeocoder(BaseGeocoder):
+    """
+    Geocoder that resolves the areas of the ubication with the in memory index of the bounds cache, which gives the
+    same results as BoundQuerySet.contains_point without querying the database for every bound.
+    """
+
     def update_ubication(self, commit=True):
         """
         Tries to set the district and other geoinformation for the record.
         """
-        self.ubication.district = self.find_district()
-        category_fields = self.update_category_fields()
+        areas = self.get_point_areas()
+        district_id = self.find_district(areas)
+        if self.ubication.district_id != district_id:
+            self.ubication.district = District.objects.get(pk=district_id) if district_id else None
+        category_fields = self.update_category_fields(areas)
         if commit:
             self.ubication.save(update_fields=['district', 'xetrs89a', 'yetrs89a'] + category_fields)
 
+    def get_point_areas(self) -> dict:
+        return bounds_cache.get_point_areas(self.ubication.xetrs89a, self.ubication.yetrs89a)
+
     def get_polygon_code(self, polygon, address=None) -> str:
         """
         Returns the code for an AreaCategory polygon.
         """
-        cat = AreaCategory.objects.get(codename=polygon)
-        bound = self.find_bounds(cat)
-        return bound
+        areas = self.get_point_areas()
+        if polygon not in areas["categories"]:
+            raise AreaCategory.DoesNotExist(f"AreaCategory {polygon} does not exist")
+        return self.find_bounds(polygon, areas)
 
-    def update_category_fields(self) -> list:
+    def update_category_fields(self, areas) -> list:
         """
         Updates ubication fields related to spatial polygons stored in AreaBounds and by AreaCategory. Each ubication
         field can be set by an AreaCategory. For example, for filling statistical_sector we need to check the AreaBounds
         belonging to an AreaCategory with ubication_field = 'statistical_sector'.
         """
         updated_fields = []
-        for cat in AreaCategory.objects.which_update_records():
-            value = self.find_bounds(cat)
-            updated_fields.append(cat.ubication_field)
-            setattr(self.ubication, cat.ubication_field, value)
+        for category_codename, ubication_field in bounds_cache.get_index().ubication_fields.items():
+            value = self.find_bounds(category_codename, areas)
+            updated_fields.append(ubication_field)
+            setattr(self.ubication, ubication_field, value)
         return updated_fields
 
-    def find_district(self):
-        try:
-            district_bound = DistrictBorder.objects.contains_point(
-                self.ubication.xetrs89a, self.ubication.yetrs89a
-            ).get()
-            return district_bound.district
-        except DistrictBorder.DoesNotExist:
-            pass
-        except DistrictBorder.MultipleObjectsReturned:
-            self.logger.exception()
+    def find_district(self, areas):
+        districts = areas["districts"]
+        if len(districts) > 1:
             self.logger.error(f"GEOCODE | INVALID BOUNDS | Districts are intersecting")
+        elif districts:
+            return districts[0]
 
-    def find_bounds(self, cat: AreaCategory):
-        try:
-            bound = cat.bounds.contains_point(self.ubication.xetrs89a, self.ubication.yetrs89a).get()
-            return bound.codename
-        except AreaBounds.DoesNotExist:
-            pass
-        except AreaBounds.MultipleObjectsReturned:
-            self.logger.exception()
-            self.logger.error(f"GEOCODE | INVALID BOUNDS | {cat.codename} bounds are intersecting")
+    def find_bounds(self, category_codename, areas):
+        bounds = areas["categories"].get(category_codename, [])
+        if len(bounds) > 1:
+            self.logger.error(f"GEOCODE | INVALID BOUNDS | {category_codename} bounds are intersecting")
+        elif bounds:
+            return bounds[0]
         return ''
@@ -1,14 +1,21 @@
 from django.db.models import QuerySet
 
+from geo.caches import bounds_cache
+from main.caches import VersionedCacheQuerySetMixin
 
-class BoundQuerySet(QuerySet):
+
+class BoundsCacheQuerySet(VersionedCacheQuerySetMixin, QuerySet):
+    versioned_cache = bounds_cache
+
+
+class BoundQuerySet(BoundsCacheQuerySet):
     def contains_point(self, etrs_x, etrs_y):
         if etrs_x and etrs_y:
             return self.filter(mpoly__contains=f'POINT({etrs_x} {etrs_y})')
         return self.none()
 
 
-class AreaCategoryQuerySet(QuerySet):
+class AreaCategoryQuerySet(BoundsCacheQuerySet):
     def which_update_records(self):
         """
         Returns all the categories set for updating record card fields.
@@ -2,12 +2,28 @@ from django.contrib.gis.db import models
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 
+from geo.caches import bounds_cache
 from geo.managers import BoundQuerySet, AreaCategoryQuerySet
 from iris_masters.models import District
 from themes.models import Zone
 
 
-class DistrictBorder(models.Model):
+class BoundsCacheMixin:
+    """
+    Invalidates the bounds cache when the instance changes
+    """
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        bounds_cache.invalidate_on_commit()
+
+    def delete(self, *args, **kwargs):
+        deleted = super().delete(*args, **kwargs)
+        bounds_cache.invalidate_on_commit()
+        return deleted
+
+
+class DistrictBorder(BoundsCacheMixin, models.Model):
     """
     Maps the geographic bounds of the districts or sections in which the city/political area is divided.
     """
@@ -21,7 +37,7 @@ class DistrictBorder(models.Model):
         return self.name
 
 
-class AreaCategory(Zone):
+class AreaCategory(BoundsCacheMixin, Zone):
     """
     We can classify records in several types of areas. Each theme has to configure them.
     """
@@ -36,7 +52,7 @@ class AreaCategory(Zone):
     objects = AreaCategoryQuerySet.as_manager()
 
 
-class AreaBounds(models.Model):
+class AreaBounds(BoundsCacheMixin, models.Model):
     name = models.CharField(max_length=50)
     category = models.ForeignKey(AreaCategory, related_name='bounds', on_delete=models.PROTECT)
     codename = models.CharField(max_length=3)
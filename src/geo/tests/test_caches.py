@@ -0,0 +1,126 @@
+import random
+
+import pytest
+from django.conf import settings
+from django.contrib.gis.geos import MultiPolygon, Polygon
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from model_mommy import mommy
+
+from geo.caches import bounds_cache
+from geo.geocode import GisGeocoder
+from geo.models import AreaBounds, AreaCategory, DistrictBorder
+from iris_masters.models import District
+from record_cards.models import Ubication
+
+ORIGIN_X, ORIGIN_Y = 430000, 4580000
+SIDE = 1000
+
+
+def square(x, y, side):
+    return Polygon(((x, y), (x + side, y), (x + side, y + side), (x, y + side), (x, y)))
+
+
+def mpoly(*polygons):
+    return MultiPolygon(*polygons, srid=settings.GEO_SRID)
+
+
+@pytest.mark.django_db
+class TestBoundsCache:
+
+    @staticmethod
+    def given_bounds():
+        # Districts on a grid of 3x3 squares
+        for index in range(9):
+            district, _ = District.objects.get_or_create(pk=index + 1, defaults={"name": f"District {index}"})
+            mommy.make(DistrictBorder, name=f"District {index}", district=district,
+                       mpoly=mpoly(square(ORIGIN_X + SIDE * (index % 3), ORIGIN_Y + SIDE * (index // 3), SIDE)))
+
+        # Sectors with triangles, holes and multiple polygons crossing the district borders
+        sectors = mommy.make(AreaCategory, codename="SEC", description="Sectors", ubication_field="statistical_sector")
+        x, y, side = ORIGIN_X, ORIGIN_Y, SIDE * 3
+        mommy.make(AreaBounds, category=sectors, codename="S1",
+                   mpoly=mpoly(Polygon(((x, y), (x + side, y), (x, y + side), (x, y)))))
+        mommy.make(AreaBounds, category=sectors, codename="S2",
+                   mpoly=mpoly(Polygon(((x + side, y), (x + side, y + side), (x, y + side), (x + side, y)))))
+        parks = mommy.make(AreaCategory, codename="PRK", description="Parks")
+        mommy.make(AreaBounds, category=parks, codename="P1", mpoly=mpoly(
+            Polygon(square(x, y, side)[0], square(x + 500, y + 500, 2000)[0]),
+            square(x + 1000, y + 1000, 1000)))
+        mommy.make(AreaCategory, codename="EMP", description="Empty")
+
+    @staticmethod
+    def fixture_points():
+        rnd = random.Random(10)
+        points = [(ORIGIN_X + rnd.uniform(-500, 3500), ORIGIN_Y + rnd.uniform(-500, 3500)) for _ in range(200)]
+        # Points on the borders and corners of the polygons
+        points += [(ORIGIN_X + SIDE, ORIGIN_Y + 500), (ORIGIN_X + SIDE, ORIGIN_Y + SIDE), (ORIGIN_X, ORIGIN_Y),
+                   (ORIGIN_X + 1500, ORIGIN_Y + 1500), (ORIGIN_X + 500, ORIGIN_Y + 500)]
+        return points
+
+    @staticmethod
+    def db_point_areas(etrs_x, etrs_y):
+        return {
+            "districts": list(DistrictBorder.objects.contains_point(etrs_x, etrs_y).values_list(
+                "district_id", flat=True)),
+            "categories": {
+                category.codename: list(category.bounds.contains_point(etrs_x, etrs_y).order_by("pk").values_list(
+                    "codename", flat=True))
+                for category in AreaCategory.objects.all()
+            }
+        }
+
+    def test_same_areas_as_database(self):
+        self.given_bounds()
+        for etrs_x, etrs_y in self.fixture_points():
+            assert bounds_cache.get_point_areas(etrs_x, etrs_y) == self.db_point_areas(etrs_x, etrs_y)
+
+    def test_without_coordinates(self):
+        self.given_bounds()
+        assert bounds_cache.get_point_areas(None, None) == self.db_point_areas(None, None)
+
+    def test_no_queries_once_loaded(self):
+        self.given_bounds()
+        bounds_cache.get_point_areas(ORIGIN_X, ORIGIN_Y)
+        with CaptureQueriesContext(connection) as queries:
+            for etrs_x, etrs_y in self.fixture_points():
+                bounds_cache.get_point_areas(etrs_x, etrs_y)
+        assert len(queries) == 0
+
+    def test_save_invalidates(self):
+        self.given_bounds()
+        assert bounds_cache.get_point_areas(ORIGIN_X - 500, ORIGIN_Y - 500)["districts"] == []
+        border = DistrictBorder.objects.get(district_id=1)
+        border.mpoly = mpoly(square(ORIGIN_X - SIDE, ORIGIN_Y - SIDE, SIDE))
+        border.save()
+        assert bounds_cache.get_point_areas(ORIGIN_X - 500, ORIGIN_Y - 500)["districts"] == [1]
+
+    def test_bulk_delete_invalidates(self):
+        self.given_bounds()
+        assert bounds_cache.get_point_areas(ORIGIN_X + 100, ORIGIN_Y + 100)["categories"]["SEC"] == ["S1"]
+        AreaBounds.objects.filter(codename="S1").delete()
+        assert bounds_cache.get_point_areas(ORIGIN_X + 100, ORIGIN_Y + 100)["categories"]["SEC"] == []
+
+
+@pytest.mark.django_db
+class TestGisGeocoderBounds:
+
+    def test_update_ubication(self):
+        TestBoundsCache.given_bounds()
+        ubication = mommy.make(Ubication, user_id="TEST", district_id=None, xetrs89a=ORIGIN_X + 2500,
+                               yetrs89a=ORIGIN_Y + 100)
+        GisGeocoder(ubication=ubication).update_ubication()
+        ubication.refresh_from_db()
+        assert ubication.district_id == 3
+        assert ubication.statistical_sector == "S1"
+
+    def test_get_polygon_code(self):
+        TestBoundsCache.given_bounds()
+        ubication = mommy.make(Ubication, user_id="TEST", district_id=None, xetrs89a=ORIGIN_X + 2500,
+                               yetrs89a=ORIGIN_Y + 2500)
+        geocoder = GisGeocoder(ubication=ubication)
+        assert geocoder.get_polygon_code("SEC") == "S2"
+        assert geocoder.get_polygon_code("PRK") == ""
+        assert geocoder.get_polygon_code("EMP") == ""
+        with pytest.raises(AreaCategory.DoesNotExist):
+            geocoder.get_polygon_code("UNKNOWN")
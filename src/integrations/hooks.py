@@ -98,8 +98,8 @@ def opendata_getvalues():
         year = year - 1
     path = 'iris/OpenData_Trimestre_' + str(trimester) + '_' + str(year) + '.csv'
     od = OpenDataQuerySets(year=year, trimester=trimester)
-    ft(od, call=False).file_writer(path, 'file_open_data', ',', add_headers=True, lineterminator=True,
-                                   encoding='utf-8', xml=False)
+    ft(od, call=False).file_writer_partition(path, 'file_open_data', ',', add_headers=True, lineterminator=True,
+                                             encoding='utf-8', xml=False)
 
 
 def opendata_validate(year=2020, trimester=1):
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from integrations.services.gcod.cache import geocode_cache
+
+
+class Command(BaseCommand):
+    """
+    Command to drop the cached responses of the geocoder services
+    """
+
+    help = "Drop the cached responses of the geocoder services"
+
+    def handle(self, *args, **options):
+        geocode_cache.invalidate()
+        self.stdout.write('GEOCODE | Cache invalidated')
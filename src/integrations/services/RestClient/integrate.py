@@ -1,7 +1,63 @@
 import requests
 import abc
 import logging
+import os
+import threading
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+_sessions = {}
+_sessions_pid = None
+_sessions_lock = threading.Lock()
+
+
+def get_session(service_name):
+    """
+    Get the shared session of a service, so the connections with the service are kept alive and reused.
+    The sessions are created again on forked processes (celery and gunicorn workers) to not share their sockets.
+
+    :param service_name: Name of the integration service
+    :return: requests Session with a pooled adapter that retries the idempotent requests
+    """
+    global _sessions_pid
+    with _sessions_lock:
+        if _sessions_pid != os.getpid():
+            _sessions.clear()
+            _sessions_pid = os.getpid()
+        if service_name not in _sessions:
+            _sessions[service_name] = build_session()
+        return _sessions[service_name]
+
+
+def build_session():
+    # Connection errors are always retried, read errors and error statuses only for idempotent methods
+    retries = Retry(total=settings.INTEGRATIONS_RETRIES, backoff_factor=settings.INTEGRATIONS_RETRY_BACKOFF,
+                    status_forcelist=(502, 503, 504), raise_on_status=False)
+    adapter = HTTPAdapter(pool_maxsize=settings.INTEGRATIONS_POOL_SIZE, max_retries=retries)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def close_sessions():
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def get_timeout(service_name, timeout=None):
+    """
+    :param service_name: Name of the integration service
+    :param timeout: Timeout of the request, if it has to override the configured one
+    :return: Tuple with the connect and the read timeouts of the service
+    """
+    if timeout is not None:
+        return timeout
+    return (settings.INTEGRATIONS_CONNECT_TIMEOUT,
+            settings.INTEGRATIONS_READ_TIMEOUTS.get(service_name, settings.INTEGRATIONS_READ_TIMEOUT))
 
 
 class BaseRestClient(metaclass=abc.ABCMeta):
@@ -30,25 +86,32 @@ class ApiConnectClient(BaseRestClient):
             self.headers = settings.AC_HEADERS
         self.logger = logger or logging.getLogger(__name__)
 
-    def get_ac(self, extension='', params={}):
-        return requests.get(self.url_ac + extension, verify=False, headers=self.headers, params=params, auth=self.auth)
+    @property
+    def session(self):
+        return get_session(self.service_name)
 
-    def get(self, extension='', params={}):
+    def get_ac(self, extension='', params={}, timeout=None):
+        return self.session.get(self.url_ac + extension, verify=False, headers=self.headers, params=params,
+                                auth=self.auth, timeout=get_timeout(self.service_name, timeout))
+
+    def get(self, extension='', params={}, timeout=None):
+        timeout = get_timeout(self.service_name, timeout)
         try:
-            data = requests.get(self.url_ac + extension, verify=False, headers=self.headers, params=params,
-                                auth=self.auth).json()
+            data = self.session.get(self.url_ac + extension, verify=False, headers=self.headers, params=params,
+                                    auth=self.auth, timeout=timeout).json()
             self.logger.info('connected with api connect')
         except Exception:
             headers = {}
-            data = requests.get(self.url_pa + extension, verify=False, headers=headers, params=params,
-                                auth=self.auth).json()
+            data = self.session.get(self.url_pa + extension, verify=False, headers=headers, params=params,
+                                    auth=self.auth, timeout=timeout).json()
             self.logger.info('connected with public api')
         return data
 
     def post(self, extension='', json={}, files={}, params=None, data=None, timeout=None):
 
-        data = requests.post(self.url_ac + extension, verify=False, headers=self.headers, json=json, files=files,
-                             params=params, data=data, auth=self.auth, timeout=timeout)
+        data = self.session.post(self.url_ac + extension, verify=False, headers=self.headers, json=json, files=files,
+                                 params=params, data=data, auth=self.auth,
+                                 timeout=get_timeout(self.service_name, timeout))
         self.logger.info('connected with api connect')
         return data
 
@@ -68,12 +131,18 @@ class ApiClient:
 
         self.logger = logger or logging.getLogger(__name__)
 
-    def get(self, json={}, params={}):
-        data = requests.get(self.url, verify=False, headers=self.headers, params=params, json=json).json()
+    @property
+    def session(self):
+        return get_session(self.service_name)
+
+    def get(self, json={}, params={}, timeout=None):
+        data = self.session.get(self.url, verify=False, headers=self.headers, params=params, json=json,
+                                timeout=get_timeout(self.service_name, timeout)).json()
         self.logger.info('connected with extern integration %s , %s', (self.service_name, data))
         return data
 
-    def post(self, json={}, params={}):
-        data = requests.post(self.url, verify=False, headers=self.headers, params=params, json=json)
+    def post(self, json={}, params={}, timeout=None):
+        data = self.session.post(self.url, verify=False, headers=self.headers, params=params, json=json,
+                                 timeout=get_timeout(self.service_name, timeout))
         self.logger.info('connected with extern integration %s , %s', (self.service_name, data))
         return data
@@ -1,6 +1,11 @@
 from datetime import datetime
-from django.db.models import Q, Subquery
-from record_cards.models import RecordCard, Request, RecordCardResponse
+from itertools import islice
+from types import SimpleNamespace
+
+import pytz
+from django.db.models import OuterRef, Q, Subquery
+from django.utils.timezone import localtime, make_aware
+from record_cards.models import RecordCard, Request
 from themes.models import ElementDetail
 from integrations.models import OpenDataModel
 import logging
@@ -8,10 +13,31 @@ import copy
 from django.db.models import Max
 import csv
 
+OPEN_DATA_TIMEZONE = pytz.timezone('Europe/Madrid')
+
 
 class OpenDataQuerySets:
 
-    records_limit = 100
+    page_size = 1000
+    open_data_applicant_types = [0, 1, 2]
+    ubication_fields = ('district_id', 'district__name', 'neighborhood_id', 'neighborhood', 'research_zone',
+                        'via_type', 'street', 'street2', 'xetrs89a', 'yetrs89a', 'longitude', 'latitude')
+    support_dictionary = {'CORREU GENCAT': 'CORREU ELECTRÒNIC',
+                          'FULL DE QUEIXA GUUR': 'FULLS QUEIXES I SUGGERIMENTS',
+                          'FULLS QUEIXA BSM': 'FULLS QUEIXES I SUGGERIMENTS',
+                          'FULLS QUEIXA BÚSTIES IMH': 'FULLS QUEIXES I SUGGERIMENTS',
+                          'FULLS QUEIXA OMIC': 'FULLS QUEIXES I SUGGERIMENTS',
+                          'INSTÀNCIA AMB SIGNATURES': 'INSTÀNCIA',
+                          'INSTÀNCIA NO VINCULADA': 'INSTÀNCIA',
+                          'RECLAMACIÓ INTERNA': {
+                              'CORREU GENCAT': 'CORREU ELECTRÒNIC',
+                              'FULL DE QUEIXA GUUR': 'FULLS QUEIXES I SUGGERIMENTS',
+                              'FULLS QUEIXA BSM': 'FULLS QUEIXES I SUGGERIMENTS',
+                              'FULLS QUEIXA BÚSTIES IMH': 'FULLS QUEIXES I SUGGERIMENTS',
+                              'FULLS QUEIXA OMIC': 'FULLS QUEIXES I SUGGERIMENTS',
+                              'INSTÀNCIA AMB SIGNATURES': 'INSTÀNCIA',
+                              'INSTÀNCIA NO VINCULADA': 'INSTÀNCIA'
+                          }}
 
     def __init__(self, year=2020, trimester=1, batch_file=None, offset=False, create=False, to_validate=False):
         self.offset = offset
@@ -55,6 +81,16 @@ class OpenDataQuerySets:
         else:
             return getattr(self, function)()
 
+    def select_pages(self, function):
+        """
+        :return: Iterator over all the pages of the function, or None if the function has to be called page by page
+        """
+        if function == 'partitioning':
+            return self.partitioning_pages()
+        if function == 'file_open_data':
+            return self.file_open_data_pages()
+        return None
+
     def file_open_data(self, record_cards):
         """
         file data queryset for OpenData
@@ -67,80 +103,115 @@ class OpenDataQuerySets:
         CR LF ->>> lineterminator = '\n'->>writer = False
         def file_writer(self, file_name, queryset_func, delimiter='|', quotechar='',
         quoting=csv.QUOTE_NONE, encoding='cp1252', add_headers=True):
+
+        The rows of all the records of the trimester are streamed by file_open_data_pages, through select_pages.
+
+        :param record_cards: Record cards to export
+        :return: List of open data rows
         """
         self.logger.info('Starting opendata queryset')
-        support_dictionary = {'CORREU GENCAT': 'CORREU ELECTRÒNIC',
-                              'FULL DE QUEIXA GUUR': 'FULLS QUEIXES I SUGGERIMENTS',
-                              'FULLS QUEIXA BSM': 'FULLS QUEIXES I SUGGERIMENTS',
-                              'FULLS QUEIXA BÚSTIES IMH': 'FULLS QUEIXES I SUGGERIMENTS',
-                              'FULLS QUEIXA OMIC': 'FULLS QUEIXES I SUGGERIMENTS',
-                              'INSTÀNCIA AMB SIGNATURES': 'INSTÀNCIA',
-                              'INSTÀNCIA NO VINCULADA': 'INSTÀNCIA',
-                              'RECLAMACIÓ INTERNA': {
-                                  'CORREU GENCAT': 'CORREU ELECTRÒNIC',
-                                  'FULL DE QUEIXA GUUR': 'FULLS QUEIXES I SUGGERIMENTS',
-                                  'FULLS QUEIXA BSM': 'FULLS QUEIXES I SUGGERIMENTS',
-                                  'FULLS QUEIXA BÚSTIES IMH': 'FULLS QUEIXES I SUGGERIMENTS',
-                                  'FULLS QUEIXA OMIC': 'FULLS QUEIXES I SUGGERIMENTS',
-                                  'INSTÀNCIA AMB SIGNATURES': 'INSTÀNCIA',
-                                  'INSTÀNCIA NO VINCULADA': 'INSTÀNCIA'
-                              }}
-        result_array = []
-        for record_card in record_cards:
-            original_record_cards = RecordCard.objects.filter(
-                Q(request_id=record_card.request_id) & ~Q(applicant_type_id=23) & Q(id__lte=record_card.id))
-            id_list = [x['id'] for x in original_record_cards.values('id')]
-            max_id = max(id_list) if id_list else 0
-            original_record_card = original_record_cards.get(id=max_id)
-            detail = record_card.element_detail
-            record_type = record_card.record_type
-            element = detail.element
-            area = element.area
-            ubication = record_card.ubication
-            record_card_response = RecordCardResponse.objects.filter(record_card_id=record_card.id)
-            response_channel = record_card_response.get(record_card_id=record_card.id).response_channel \
-                if record_card_response else None
-            last_support = record_card.support
-            original_support = original_record_card.support
-            support = last_support.description
-            support = self.calculate_support(last_support, original_support, support, support_dictionary)
-            result_dict = {
-                '"FITXA_ID"': record_card.normalized_record_id,
-                '"TIPUS"': '"' + record_type.description + '"',
-                '"AREA"': '"' + area.description.replace(',', ' ') + '"',
-                '"ELEMENT"': '"' + element.description.replace(',', ' ') + '"',
-                '"DETALL"': '"' + detail.description.replace(',', ' ') + '"',
-                '"DIA_DATA_ALTA"': str(
-                    '0' + str(original_record_card.created_at.day))[-2:] if original_record_card.created_at else '',
-                '"MES_DATA_ALTA"': str(
-                    '0' + str(original_record_card.created_at.month))[-2:] if original_record_card.created_at else '',
-                '"ANY_DATA_ALTA"': original_record_card.created_at.year,
-                '"DIA_DATA_TANCAMENT"': str(
-                    '0' + str(record_card.closing_date.day))[-2:] if record_card.closing_date else '',
-                '"MES_DATA_TANCAMENT"': str(
-                    '0' + str(record_card.closing_date.month))[-2:] if record_card.closing_date else '',
-                '"ANY_DATA_TANCAMENT"': record_card.closing_date.year,
-                '"DATA_TANCAMENT"': record_card.closing_date}
-
-            result_dict = self.get_ubication(detail.allows_open_data_location,
-                                             detail.allows_open_data_sensible_location, ubication, result_dict)
+        records = RecordCard.objects.filter(pk__in=[record_card.pk for record_card in record_cards])
+        return [self.pop_closing_date(row) for row in self.open_data_rows(self.open_data_values(records))]
+
+    def file_open_data_pages(self):
+        """
+        Streams the open data rows of the trimester from a single query, iterated by chunks
+        :return: Generator of pages of rows
+        """
+        records = self.open_data_values(self.open_data_records()).iterator(chunk_size=self.page_size)
+        return self.rows_pages(self.pop_closing_date(row) for row in self.open_data_rows(records))
 
+    @staticmethod
+    def pop_closing_date(row):
+        """
+        :return: Open data row without the closing date, that is only used to sort the rows
+        """
+        row.pop('"DATA_TANCAMENT"')
+        return row
+
+    def open_data_records(self):
+        """
+        :return: Queryset of the record cards to publish as open data for the trimester
+        """
+        return RecordCard.objects.filter(
+            Q(element_detail__allows_open_data=True) &
+            Q(request__applicant_type_id__in=self.open_data_applicant_types) &
+            Q(record_state_id__in=[4, 7]) &
+            (Q(applicant_type_id__in=self.open_data_applicant_types) | Q(applicant_type_id=23)) &
+            (~Q(support_id__in=[14, 20]) | (Q(support_id__in=[14, 20]) &
+                                            Q(applicant_type_id__in=self.open_data_applicant_types))) &
+            ~Q(support_id=8) &
+            Q(created_at__gt=self.local_limit_date(self.limit_creating_at_date)) &
+            Q(closing_date__gt=self.local_limit_date(self.oldest_date_limit)) &
+            Q(closing_date__lt=self.local_limit_date(self.newest_date_limit))
+        )
+
+    @staticmethod
+    def local_limit_date(limit_date):
+        return make_aware(datetime.strptime(limit_date, '%d/%m/%y %H:%M:%S'), OPEN_DATA_TIMEZONE)
+
+    def open_data_values(self, records):
+        """
+        :param records: RecordCard queryset
+        :return: Values queryset, ordered by id, with every column needed to build the open data rows. The creation
+                 date and support are the ones of the original record of the request.
+        """
+        original_records = RecordCard.objects.filter(
+            Q(request_id=OuterRef('request_id')) & ~Q(applicant_type_id=23) & Q(id__lte=OuterRef('pk'))
+        ).order_by('-id')
+        return records.annotate(
+            original_created_at=Subquery(original_records.values('created_at')[:1]),
+            original_support=Subquery(original_records.values('support__description')[:1]),
+        ).values(
+            'normalized_record_id', 'created_at', 'closing_date', 'record_type__description',
+            'element_detail__element__area__description', 'element_detail__element__description',
+            'element_detail__description', 'element_detail__allows_open_data_location',
+            'element_detail__allows_open_data_sensible_location', 'support__description',
+            'recordcardresponse__response_channel__name', 'original_created_at', 'original_support',
+            'ubication_id', *[f'ubication__{field}' for field in self.ubication_fields]
+        ).order_by('pk')
+
+    def open_data_rows(self, records):
+        """
+        :param records: Iterable of open data values
+        :return: Generator of open data rows
+        """
+        for record in records:
+            created_at = record['original_created_at'] or record['created_at']
+            closing_date = localtime(record['closing_date'], OPEN_DATA_TIMEZONE).replace(tzinfo=None)
+            result_dict = {
+                '"FITXA_ID"': record['normalized_record_id'],
+                '"TIPUS"': '"' + record['record_type__description'] + '"',
+                '"AREA"': '"' + record['element_detail__element__area__description'].replace(',', ' ') + '"',
+                '"ELEMENT"': '"' + record['element_detail__element__description'].replace(',', ' ') + '"',
+                '"DETALL"': '"' + record['element_detail__description'].replace(',', ' ') + '"',
+                '"DIA_DATA_ALTA"': str('0' + str(created_at.day))[-2:],
+                '"MES_DATA_ALTA"': str('0' + str(created_at.month))[-2:],
+                '"ANY_DATA_ALTA"': created_at.year,
+                '"DIA_DATA_TANCAMENT"': str('0' + str(closing_date.day))[-2:],
+                '"MES_DATA_TANCAMENT"': str('0' + str(closing_date.month))[-2:],
+                '"ANY_DATA_TANCAMENT"': closing_date.year,
+                '"DATA_TANCAMENT"': closing_date}
+
+            ubication = None
+            if record['ubication_id']:
+                ubication = SimpleNamespace(**{field: record[f'ubication__{field}'] for field in self.ubication_fields})
+                ubication.district = ubication.district__name
+            result_dict = self.get_ubication(record['element_detail__allows_open_data_location'],
+                                             record['element_detail__allows_open_data_sensible_location'],
+                                             ubication, result_dict)
+
+            support = self.calculate_support(record['support__description'],
+                                             record['original_support'] or record['support__description'])
             result_dict['"SUPORT"'] = '"' + support + '"'
-            response_channel_description = self.calculate_response_channel_desc(response_channel)
+            response_channel_description = record['recordcardresponse__response_channel__name'] or ''
             result_dict['"CANALS_RESPOSTA"'] = self.calculate_response_channel(response_channel_description)
-            result_array.append(result_dict)
-        return result_array
-
-    def calculate_response_channel_desc(self, response_channel):
-        response_channel_description = response_channel.name if response_channel else ''
-        return response_channel_description
+            yield result_dict
 
-    def calculate_support(self, last_support, original_support, support, support_dictionary):
-        if 'RECLAMACIÓ INTERNA' == last_support.description:
-            support = support_dictionary.get('RECLAMACIÓ INTERNA').get(original_support.description, support)
-        else:
-            support = support_dictionary.get(last_support.description, support)
-        return support
+    def calculate_support(self, last_support, original_support):
+        if 'RECLAMACIÓ INTERNA' == last_support:
+            return self.support_dictionary.get('RECLAMACIÓ INTERNA').get(original_support, last_support)
+        return self.support_dictionary.get(last_support, last_support)
 
     def calculate_response_channel(self, response_channel_description):
         if response_channel_description == 'CAP':
@@ -495,18 +566,37 @@ class OpenDataQuerySets:
         return result_array
 
     def partitioning(self, page):
-        result_array = []
-        Alias1 = self.query_count(page)
-        result = len(Alias1)
-        if result == 0:
-            return result_array
-        result_array_count = self.file_open_data(Alias1)
-        result_array += result_array_count
+        records = self.open_data_values(self.open_data_records())[page * self.page_size:(page + 1) * self.page_size]
+        return self.partition_page(list(self.open_data_rows(records)), page)
+
+    def partitioning_pages(self):
+        """
+        Streams the pages of partitioning from a single query, iterated by chunks
+        :return: Generator of pages
+        """
+        records = self.open_data_values(self.open_data_records()).iterator(chunk_size=self.page_size)
+        for page, result_array in enumerate(self.rows_pages(self.open_data_rows(records))):
+            yield self.partition_page(result_array, page)
+
+    def rows_pages(self, rows):
+        """
+        :return: Generator of the pages of page_size rows of an iterable of rows
+        """
+        page = list(islice(rows, self.page_size))
+        while page:
+            yield page
+            page = list(islice(rows, self.page_size))
+
+    def partition_page(self, result_array, page):
+        """
+        Sorts a page of open data rows by closing date and stores them for validating when it's required
+        """
+        if not result_array:
+            return []
         result_array = sorted(result_array, key=lambda x: x['"DATA_TANCAMENT"'])
         final_array = []
         for x in result_array:
-            x.pop('"DATA_TANCAMENT"')
-            final_array.append(x)
+            final_array.append(self.pop_closing_date(x))
         last_month = datetime.strptime(self.newest_date_limit, '%d/%m/%y %H:%M:%S').month
         first_month = datetime.strptime(self.oldest_date_limit, '%d/%m/%y %H:%M:%S').month
         if self.to_validate is True and \
@@ -537,33 +627,3 @@ class OpenDataQuerySets:
              (Q(closing_date__lte=datetime.strptime(self.newest_date_limit, '%d/%m/%y %H:%M:%S'))))
         )
         return record_cards.count()
-
-    def query_count(self, page):
-        def_page = str(page * 1000).replace(';', '')
-        created_at_gte = str(datetime.strptime(self.limit_creating_at_date, '%d/%m/%y %H:%M:%S')).replace(';', '')
-        closing_date_gte = str(datetime.strptime(self.oldest_date_limit, '%d/%m/%y %H:%M:%S')).replace(';', '')
-        closing_date_lte = str(datetime.strptime(self.newest_date_limit, '%d/%m/%y %H:%M:%S')).replace(';', '')
-        params = [created_at_gte, closing_date_gte, closing_date_lte, def_page]
-        query = """select f1.created_at at time zone 'Europe/Madrid' as created_at,
-            f1.closing_date at time zone 'Europe/Madrid' as closing_date,
-            f1.* from record_cards_recordcard f1
-            inner join themes_elementdetail f2 on f2.id=f1.element_detail_id
-            inner join themes_element f3 on f3.id=f2.element_id
-            inner join themes_area f4 on f4.id=f3.area_id
-            left join record_cards_ubication f5 on f5.id=f1.ubication_id
-            left join record_cards_recordcardresponse f6 on f6.record_card_id=f1.id
-            inner join record_cards_request f7 on f7.id=f1.request_id
-            left join record_cards_applicant f8 on f8.id=f7.applicant_id
-            where f2.allows_open_data=True
-              and f7.applicant_type_id in (0, 1, 2)
-              and (f1.record_state_id in (4, 7))
-              and (f1.applicant_type_id in (0, 1, 2) or f1.applicant_type_id=23)
-              and (f1.support_id not in (14, 20) or (f1.support_id in (14, 20) and f1.applicant_type_id in (0, 1, 2)))
-              and f1.support_id not in (8)
-              and f1.created_at at time zone 'Europe/Madrid' > %s
-              and f1.closing_date at time zone 'Europe/Madrid' > %s
-              and f1.closing_date at time zone 'Europe/Madrid' < %s
-              order by f1.id
-                limit 1000 offset %s
-            """
-        return RecordCard.objects.raw(query, params)
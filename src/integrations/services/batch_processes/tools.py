@@ -106,12 +106,10 @@ class FilesTools:
     def partition_without_xml(self, file_name, queryset_func, encoding,
                               lineterminator, delimiter, quotechar,
                               quoting, escapechar, move_to_sftp, add_headers):
-        page = 0
         real_file_name = file_name.split('/')[-1]
         temp_file_name = '/tmp/' + real_file_name
         with open(temp_file_name, 'w', encoding=encoding) as csv_file:
-                data = self.queryset.select_function(queryset_func, page)
-                while data:
+                for page, data in enumerate(self.get_pages(queryset_func)):
                     self.logger.info(page)
                     if lineterminator:
                         wr = csv.writer(csv_file, delimiter=delimiter, quotechar=quotechar,
@@ -126,13 +124,27 @@ class FilesTools:
                         result_data = self.result_data_transform(sub_data)
                         wr.writerow(result_data)
                     add_headers = False
-                    page += 1
-                    data = self.queryset.select_function(queryset_func, page)
                 self.write_to_minio(csv_file, temp_file_name, file_name)
                 if move_to_sftp:
                     carpet = file_name.split('/')[0]
                     self.move_to_sftp(temp_file_name, self.sftp_dest_path, real_file_name, carpet)
 
+    def get_pages(self, queryset_func):
+        """
+        Iterates over the pages of data of a queryset function. The queryset class can stream all the pages with
+        select_pages, otherwise the function is called page by page until it returns no data.
+        """
+        pages = self.queryset.select_pages(queryset_func) if hasattr(self.queryset, 'select_pages') else None
+        if pages is not None:
+            yield from pages
+            return
+        page = 0
+        data = self.queryset.select_function(queryset_func, page)
+        while data:
+            yield data
+            page += 1
+            data = self.queryset.select_function(queryset_func, page)
+
     def bi_partition_without_xml(self, file_name, queryset_func, encoding,
                                  lineterminator, delimiter, quotechar,
                                  quoting, escapechar, move_to_sftp, add_headers, first_case,
@@ -0,0 +1,63 @@
+import hashlib
+import json
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def normalize_address_param(value):
+    """
+    :return: Param value without case and spacing differences, so the same address always gets the same key
+    """
+    if isinstance(value, str):
+        return " ".join(value.split()).upper()
+    return value
+
+
+class GeocodeCache:
+    """
+    Cache of the geocoder services responses, shared through the django cache and bounded by GEOCODE_CACHE_TIMEOUT.
+
+    The keys include a version stamp, so invalidate drops every cached response at once.
+    """
+    cache_key = "gcod"
+
+    @property
+    def version_key(self):
+        return f"{self.cache_key}:version"
+
+    def get_version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            cache.add(self.version_key, uuid.uuid4().hex, timeout=None)
+            version = cache.get(self.version_key)
+        return version
+
+    def get_key(self, extension, params):
+        normalized_params = {param: normalize_address_param(value) for param, value in params.items()}
+        params_hash = hashlib.md5(json.dumps(normalized_params, sort_keys=True, default=str).encode()).hexdigest()
+        return f"{self.cache_key}:{self.get_version()}:{extension}:{params_hash}"
+
+    def get_or_call(self, extension, params, call):
+        """
+        :param extension: Service extension, to keep apart the responses of the different services
+        :param params: Params of the request, they are normalized to build the cache key
+        :param call: Callable that makes the external requests when the response is not cached
+        :return: Cached response or the result of call. Only the successful responses are cached.
+        """
+        if not settings.GEOCODE_CACHE_TIMEOUT:
+            return call()
+        key = self.get_key(extension, params)
+        data = cache.get(key)
+        if data is None:
+            data = call()
+            if isinstance(data, dict) and data.get("ReturnCode") == 1:
+                cache.set(key, data, timeout=settings.GEOCODE_CACHE_TIMEOUT)
+        return data
+
+    def invalidate(self):
+        cache.set(self.version_key, uuid.uuid4().hex, timeout=None)
+
+
+geocode_cache = GeocodeCache()
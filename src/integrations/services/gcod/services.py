@@ -1,5 +1,6 @@
 from integrations.services.gcod.config import service_name, Streets, Districts, Type_Streets, Neighborhood, \
     Neighborhood_District, Validate_Adress_var, Validate_Adress_cod, get_dades_xy
+from integrations.services.gcod.cache import geocode_cache
 from ..RestClient.integrate import ApiConnectClient
 import logging
 
@@ -52,7 +53,6 @@ class GcodServices(ApiConnectClient):
 
     def adress_validation_variable(self, street_variable, numIni, numFin='', lletraIni='', tipusVia='', tipusNum='',
                                    tipusSeq='', exacta='', nullCoord='S', maxRegs=100):
-        data = ApiConnectClient(self.service_name, logger=self.logger)
         params = {'variant': street_variable,
                   'numIni': numIni.strip(),
                   'numFin': numFin.strip(),
@@ -65,6 +65,11 @@ class GcodServices(ApiConnectClient):
                   'maxRegs': maxRegs,
                   }
         self.logger.info(params)
+        return geocode_cache.get_or_call(Validate_Adress_var, params,
+                                         lambda: self.request_adress_validation_variable(params))
+
+    def request_adress_validation_variable(self, params):
+        data = ApiConnectClient(self.service_name, logger=self.logger)
         data = data.get(extension=Validate_Adress_var, params=params)
         self.logger.info(data)
         if data['ReturnCode'] == 1:
@@ -99,12 +104,13 @@ class GcodServices(ApiConnectClient):
         return data
 
     def get_dades_xy(self, zona, x, y):
-        data = ApiConnectClient(self.service_name, logger=self.logger)
-        return data.get(extension=get_dades_xy, params={
+        params = {
             'tipus': zona,
             'coordenadaX': x,
             'coordenadaY': y
-        })
+        }
+        return geocode_cache.get_or_call(get_dades_xy, params, lambda: ApiConnectClient(
+            self.service_name, logger=self.logger).get(extension=get_dades_xy, params=params))
 
     def get_offset_xy(self, address_code, num, distance):
         data = ApiConnectClient(self.service_name, logger=self.logger)
@@ -125,6 +131,22 @@ class GcodServices(ApiConnectClient):
             return {}
         return data.json()
 
+    def get_dades_xy_lots(self, zona, positions):
+        """
+        Resolve the data of a zone for a lot of positions with a single request. The lots endpoint answers the
+        GetDadesXy result of every position in the same order as they are sent.
+
+        :param zona: Zone description, as for get_dades_xy
+        :param positions: List of (x, y) coordinates of the validated addresses
+        :return: List with the result of every position, or an empty list if the lot can't be resolved
+        """
+        data = self.get_position_xy_lots([{'tipus': zona, 'coordenadaX': x, 'coordenadaY': y} for x, y in positions])
+        results = data.get('data') or []
+        if len(results) != len(positions):
+            self.logger.info(f'GEOCODE | LOTS | {len(results)} results for {len(positions)} positions')
+            return []
+        return results
+
     def get_street_data(self, codi):
         params = {"codi": codi}
         data = ApiConnectClient('Georest', logger=self.logger)
@@ -0,0 +1,86 @@
+from collections import Counter
+
+import pytest
+from mock import patch
+from model_mommy import mommy
+
+from integrations.services.gcod.cache import geocode_cache
+from integrations.services.gcod.config import Neighborhood, Validate_Adress_var, get_dades_xy
+from record_cards.models import Ubication
+from record_cards.record_actions.geocode import AddressNotFoundException, RecordCardUbicationGeocoder
+
+
+class StubGeocodClient:
+    """
+    Local stub of the geocoder services, counting the requests by extension
+    """
+    calls = Counter()
+
+    def __init__(self, service_name, logger=None):
+        pass
+
+    def get(self, extension, params=None):
+        self.calls[extension.split("/")[0] if extension.startswith(Neighborhood) else extension] += 1
+        if extension == Validate_Adress_var:
+            if params["variant"] == "UNKNOWN":
+                return {"ReturnCode": 0, "Count": 0, "Data": []}
+            return {"ReturnCode": 1, "Count": 1, "Data": [{
+                "CODI": "123", "XNUM_POST": "30000000", "YNUM_POST": "80000000", "CODI_INE": "1", "SOLAR": "2",
+                "SECC_CENS": "3", "DISTRICTE": "01", "DIST_POST": "08001", "CODI_PARC": "4", "CODI_ILLA": "5",
+                "BARRI": "01"}]}
+        if extension.startswith(Neighborhood):
+            return {"ReturnCode": 1, "Count": 1, "Data": [{"DESCRIPCION": "el Raval"}]}
+        if extension == get_dades_xy:
+            return {"ReturnCode": 1, "Count": 1, "Data": [{"CODIGO": "Z1"}]}
+
+
+@pytest.fixture
+def stub_geocoder(settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    settings.GEOCODER_SERVICES_CLASS = "integrations.services.gcod.services.GcodServices"
+    settings.POLYGON_GEO_BCN = True
+    StubGeocodClient.calls.clear()
+    with patch("integrations.services.gcod.services.ApiConnectClient", StubGeocodClient):
+        yield StubGeocodClient.calls
+
+
+@pytest.mark.django_db
+class TestGeocodeCache:
+    addresses = [("Carrer Major", "10"), (" carrer  major ", "10 "), ("Carrer Major", "12"), ("Gran Via", "1"),
+                 ("GRAN VIA", "1"), ("Carrer Major", "10")]
+
+    @staticmethod
+    def geocode(street, number):
+        ubication = mommy.make(Ubication, user_id="test", street=street, street2=number, letter="")
+        geocoder = RecordCardUbicationGeocoder(ubication=ubication)
+        address = geocoder.get_address_info()
+        return geocoder.get_polygon_code("ZONA", address)
+
+    def test_one_upstream_call_per_address(self, stub_geocoder):
+        for street, number in self.addresses:
+            assert self.geocode(street, number) == "Z1"
+        # Major 10, Major 12 and Gran Via 1
+        assert stub_geocoder[Validate_Adress_var] == 3
+        assert stub_geocoder[Neighborhood] == 3
+        assert stub_geocoder[get_dades_xy] == 1
+
+    def test_invalidate(self, stub_geocoder):
+        self.geocode("Carrer Major", "10")
+        self.geocode("Carrer Major", "10")
+        geocode_cache.invalidate()
+        self.geocode("Carrer Major", "10")
+        assert stub_geocoder[Validate_Adress_var] == 2
+        assert stub_geocoder[get_dades_xy] == 2
+
+    def test_not_found_not_cached(self, stub_geocoder):
+        for _ in range(2):
+            ubication = mommy.make(Ubication, user_id="test", street="UNKNOWN", street2="1", letter="")
+            with pytest.raises(AddressNotFoundException):
+                RecordCardUbicationGeocoder(ubication=ubication).get_address_info()
+        assert stub_geocoder[Validate_Adress_var] == 2
+
+    def test_disabled(self, stub_geocoder, settings):
+        settings.GEOCODE_CACHE_TIMEOUT = 0
+        self.geocode("Carrer Major", "10")
+        self.geocode("Carrer Major", "10")
+        assert stub_geocoder[Validate_Adress_var] == 2
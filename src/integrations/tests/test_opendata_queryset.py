@@ -0,0 +1,221 @@
+from datetime import datetime
+
+import pytest
+import pytz
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.db.models import Q
+from django.test.utils import CaptureQueriesContext
+from model_mommy import mommy
+
+from communications.tests.utils import load_missing_data
+from integrations.services.batch_processes.opendata.queryset import OpenDataQuerySets
+from integrations.services.batch_processes.tools import FilesTools
+from iris_masters.models import ApplicantType, District, RecordState, ResponseChannel, Support
+from record_cards.models import RecordCard, RecordCardResponse, Request, Ubication
+from record_cards.tests.utils import CreateRecordCardMixin
+
+
+class LegacyOpenDataQuerySets(OpenDataQuerySets):
+    """
+    Previous implementation of the open data partitioning, with a query for every page of records and several
+    queries for every record
+    """
+
+    def select_pages(self, function):
+        return None
+
+    def partitioning(self, page):
+        records = self.query_count(page)
+        if len(records) == 0:
+            return []
+        return self.partition_page(self.legacy_file_open_data(records), page)
+
+    def legacy_file_open_data(self, record_cards):
+        result_array = []
+        for record_card in record_cards:
+            original_record_cards = RecordCard.objects.filter(
+                Q(request_id=record_card.request_id) & ~Q(applicant_type_id=23) & Q(id__lte=record_card.id))
+            id_list = [x['id'] for x in original_record_cards.values('id')]
+            max_id = max(id_list) if id_list else 0
+            original_record_card = original_record_cards.get(id=max_id)
+            detail = record_card.element_detail
+            record_type = record_card.record_type
+            element = detail.element
+            area = element.area
+            ubication = record_card.ubication
+            record_card_response = RecordCardResponse.objects.filter(record_card_id=record_card.id)
+            response_channel = record_card_response.get(record_card_id=record_card.id).response_channel \
+                if record_card_response else None
+            support = self.calculate_support(record_card.support.description, original_record_card.support.description)
+            result_dict = {
+                '"FITXA_ID"': record_card.normalized_record_id,
+                '"TIPUS"': '"' + record_type.description + '"',
+                '"AREA"': '"' + area.description.replace(',', ' ') + '"',
+                '"ELEMENT"': '"' + element.description.replace(',', ' ') + '"',
+                '"DETALL"': '"' + detail.description.replace(',', ' ') + '"',
+                '"DIA_DATA_ALTA"': str(
+                    '0' + str(original_record_card.created_at.day))[-2:] if original_record_card.created_at else '',
+                '"MES_DATA_ALTA"': str(
+                    '0' + str(original_record_card.created_at.month))[-2:] if original_record_card.created_at else '',
+                '"ANY_DATA_ALTA"': original_record_card.created_at.year,
+                '"DIA_DATA_TANCAMENT"': str(
+                    '0' + str(record_card.closing_date.day))[-2:] if record_card.closing_date else '',
+                '"MES_DATA_TANCAMENT"': str(
+                    '0' + str(record_card.closing_date.month))[-2:] if record_card.closing_date else '',
+                '"ANY_DATA_TANCAMENT"': record_card.closing_date.year,
+                '"DATA_TANCAMENT"': record_card.closing_date}
+            result_dict = self.get_ubication(detail.allows_open_data_location,
+                                             detail.allows_open_data_sensible_location, ubication, result_dict)
+            result_dict['"SUPORT"'] = '"' + support + '"'
+            response_channel_description = response_channel.name if response_channel else ''
+            result_dict['"CANALS_RESPOSTA"'] = self.calculate_response_channel(response_channel_description)
+            result_array.append(result_dict)
+        return result_array
+
+    def query_count(self, page):
+        created_at_gte = str(datetime.strptime(self.limit_creating_at_date, '%d/%m/%y %H:%M:%S'))
+        closing_date_gte = str(datetime.strptime(self.oldest_date_limit, '%d/%m/%y %H:%M:%S'))
+        closing_date_lte = str(datetime.strptime(self.newest_date_limit, '%d/%m/%y %H:%M:%S'))
+        params = [created_at_gte, closing_date_gte, closing_date_lte, self.page_size, page * self.page_size]
+        query = """select f1.created_at at time zone 'Europe/Madrid' as created_at,
+            f1.closing_date at time zone 'Europe/Madrid' as closing_date,
+            f1.* from record_cards_recordcard f1
+            inner join themes_elementdetail f2 on f2.id=f1.element_detail_id
+            inner join themes_element f3 on f3.id=f2.element_id
+            inner join themes_area f4 on f4.id=f3.area_id
+            left join record_cards_ubication f5 on f5.id=f1.ubication_id
+            left join record_cards_recordcardresponse f6 on f6.record_card_id=f1.id
+            inner join record_cards_request f7 on f7.id=f1.request_id
+            left join record_cards_applicant f8 on f8.id=f7.applicant_id
+            where f2.allows_open_data=True
+              and f7.applicant_type_id in (0, 1, 2)
+              and (f1.record_state_id in (4, 7))
+              and (f1.applicant_type_id in (0, 1, 2) or f1.applicant_type_id=23)
+              and (f1.support_id not in (14, 20) or (f1.support_id in (14, 20) and f1.applicant_type_id in (0, 1, 2)))
+              and f1.support_id not in (8)
+              and f1.created_at at time zone 'Europe/Madrid' > %s
+              and f1.closing_date at time zone 'Europe/Madrid' > %s
+              and f1.closing_date at time zone 'Europe/Madrid' < %s
+              order by f1.id
+                limit %s offset %s
+            """
+        return RecordCard.objects.raw(query, params)
+
+
+def utc(*args):
+    return pytz.utc.localize(datetime(*args))
+
+
+@pytest.mark.django_db
+class TestOpenDataQuerySets(CreateRecordCardMixin):
+    page_size = 3
+
+    @staticmethod
+    def applicant_type(pk):
+        return ApplicantType.all_objects.filter(pk=pk).first() or mommy.make(ApplicantType, pk=pk, user_id="test")
+
+    @staticmethod
+    def support(description):
+        # Explicit pk to avoid the supports excluded from open data
+        return Support.all_objects.filter(description=description).first() or mommy.make(
+            Support, pk=1000 + Support.all_objects.count(), user_id="test", description=description)
+
+    def create_open_data_record(self, created_at, closing_date, request=None, applicant_type_id=0,
+                                record_state_id=RecordState.CLOSED, support_description="TELÈFON", ubication=None,
+                                location=False, sensible_location=False, response_channel=None):
+        element_detail = self.create_element_detail()
+        element_detail.allows_open_data = True
+        element_detail.allows_open_data_location = location
+        element_detail.allows_open_data_sensible_location = sensible_location
+        element_detail.save()
+        record_card = self.create_record_card(element_detail=element_detail, ubication=ubication,
+                                              applicant_type=self.applicant_type(0))
+        RecordCard.objects.filter(pk=record_card.pk).update(
+            created_at=created_at, closing_date=closing_date, record_state_id=record_state_id,
+            support=self.support(support_description),
+            applicant_type=self.applicant_type(applicant_type_id), request=request or record_card.request)
+        if response_channel:
+            mommy.make(RecordCardResponse, user_id="test", record_card=record_card, response_channel=response_channel)
+        return RecordCard.objects.get(pk=record_card.pk)
+
+    def given_open_data_records(self):
+        load_missing_data()
+        district, _ = District.objects.get_or_create(pk=1, defaults={"name": "Ciutat Vella"})
+        response_channel = ResponseChannel.objects.get(pk=1)
+        no_response = mommy.make(ResponseChannel, pk=100, user_id="test", name="CAP")
+        ubication = mommy.make(Ubication, user_id="test", district=district, neighborhood="Gòtic, el",
+                               neighborhood_id="2", research_zone="7", via_type="Carrer",
+                               street="CARRER DE LA IV MARINA", street2="12", xetrs89a=431000.5, yetrs89a=4581000.4,
+                               latitude="41.38", longitude="2.17")
+
+        # Closed at the first day of the trimester at Madrid time, but not at UTC
+        self.create_open_data_record(utc(2019, 12, 31, 23, 30), utc(2019, 12, 31, 23, 30), ubication=ubication,
+                                     location=True, response_channel=response_channel)
+        self.create_open_data_record(utc(2020, 1, 2, 10), utc(2020, 3, 1, 10), ubication=ubication,
+                                     sensible_location=True, support_description="CORREU GENCAT")
+        self.create_open_data_record(utc(2020, 1, 3, 10), utc(2020, 1, 5, 10), response_channel=no_response,
+                                     support_description="FULLS QUEIXA OMIC")
+        original = self.create_open_data_record(utc(2020, 1, 4, 10), utc(2020, 2, 5, 10),
+                                                support_description="INSTÀNCIA NO VINCULADA")
+        self.create_open_data_record(utc(2020, 1, 6, 10), utc(2020, 3, 5, 10), request=original.request,
+                                     applicant_type_id=23, support_description="RECLAMACIÓ INTERNA")
+        self.create_open_data_record(utc(2020, 1, 7, 10), utc(2020, 1, 9, 10), ubication=ubication, location=True,
+                                     record_state_id=7)
+        self.create_open_data_record(utc(2020, 1, 8, 10), utc(2020, 2, 9, 10),
+                                     support_description="RECLAMACIÓ INTERNA")
+
+        # Records out of the open data report
+        self.create_open_data_record(utc(2020, 1, 2, 10), utc(2020, 3, 31, 22, 30))
+        self.create_open_data_record(utc(2018, 1, 2, 10), utc(2020, 1, 10, 10))
+        self.create_open_data_record(utc(2020, 1, 2, 10), utc(2020, 1, 10, 10), record_state_id=RecordState.CANCELLED)
+        self.create_open_data_record(utc(2020, 1, 2, 10), utc(2020, 1, 10, 10), applicant_type_id=3)
+        Request.objects.filter(pk=self.create_open_data_record(
+            utc(2020, 1, 2, 10), utc(2020, 1, 10, 10)).request_id).update(applicant_type=self.applicant_type(3))
+
+    def write_report(self, queryset_class, file_name):
+        queryset = queryset_class(year=2020, trimester=1, to_validate=False, create=False)
+        queryset.page_size = self.page_size
+        FilesTools(queryset, call=False).file_writer_partition(file_name, "partitioning", ",", add_headers=True,
+                                                               lineterminator=True, encoding="utf-8", xml=False)
+        with default_storage.open(file_name) as report:
+            return report.read()
+
+    def test_same_report_as_legacy(self):
+        self.given_open_data_records()
+        report = self.write_report(OpenDataQuerySets, "opendata_views/OpenData_test.csv")
+        assert report == self.write_report(LegacyOpenDataQuerySets, "opendata_views/OpenData_test_legacy.csv")
+        assert len(report.splitlines()) == 8
+
+    def test_same_pages_as_legacy(self):
+        self.given_open_data_records()
+        queryset = OpenDataQuerySets(year=2020, trimester=1)
+        queryset.page_size = self.page_size
+        legacy_queryset = LegacyOpenDataQuerySets(year=2020, trimester=1)
+        legacy_queryset.page_size = self.page_size
+        for page in range(4):
+            assert queryset.partitioning(page) == legacy_queryset.partitioning(page)
+
+    def test_stream_pages_in_one_query(self):
+        self.given_open_data_records()
+        queryset = OpenDataQuerySets(year=2020, trimester=1)
+        queryset.page_size = self.page_size
+        with CaptureQueriesContext(connection) as queries:
+            pages = list(queryset.partitioning_pages())
+        assert [len(page) for page in pages] == [3, 3, 1]
+        assert len(queries) == 1
+
+    def test_file_open_data_pages(self):
+        self.given_open_data_records()
+        queryset = OpenDataQuerySets(year=2020, trimester=1)
+        queryset.page_size = self.page_size
+        with CaptureQueriesContext(connection) as queries:
+            pages = list(queryset.select_pages("file_open_data"))
+        assert [len(page) for page in pages] == [3, 3, 1]
+        assert len(queries) == 1
+        rows = [row for page in pages for row in page]
+        assert [row['"FITXA_ID"'] for row in rows] == list(queryset.open_data_records().order_by("pk").values_list(
+            "normalized_record_id", flat=True))
+        partitioning_rows = [row for page in queryset.partitioning_pages() for row in page]
+        assert sorted(rows, key=lambda row: row['"FITXA_ID"']) == sorted(partitioning_rows,
+                                                                         key=lambda row: row['"FITXA_ID"'])
@@ -0,0 +1,112 @@
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from integrations.services.RestClient.integrate import ApiConnectClient, close_sessions, get_session
+
+SERVICE_NAME = "Stub"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Stub of an integration service:
+     - /slow answers later than the read timeout
+     - /unavailable answers with a 503 to the first two requests
+     - any other path answers with a JSON
+    """
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.answer()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.answer()
+
+    def answer(self):
+        server = self.server
+        server.requests[self.path] += 1
+        server.client_ports.add(self.client_address[1])
+        if self.path == "/slow":
+            time.sleep(0.5)
+        if self.path == "/unavailable" and server.requests[self.path] <= 2:
+            return self.send_json(503, {"ReturnCode": 0})
+        self.send_json(200, {"ReturnCode": 1})
+
+    def send_json(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubServer(ThreadingHTTPServer):
+
+    def handle_error(self, request, client_address):
+        # The client closes the connection of the timed out requests
+        pass
+
+
+@pytest.fixture
+def stub_server(settings):
+    server = StubServer(("127.0.0.1", 0), StubHandler)
+    server.requests = Counter()
+    server.client_ports = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    url = "http://127.0.0.1:{}".format(server.server_address[1])
+    settings.AC_INTEGRATIONS = {SERVICE_NAME: [{"url": url}, {"url": url}]}
+    settings.INTEGRATIONS_READ_TIMEOUT = 0.2
+    settings.INTEGRATIONS_RETRIES = 2
+    settings.INTEGRATIONS_RETRY_BACKOFF = 0
+    close_sessions()
+    yield server
+    close_sessions()
+    server.shutdown()
+    server.server_close()
+
+
+class TestApiConnectClient:
+
+    def test_shared_session(self, stub_server):
+        assert get_session(SERVICE_NAME) is get_session(SERVICE_NAME)
+        assert get_session(SERVICE_NAME) is not get_session("Other")
+
+    def test_keep_alive(self, stub_server):
+        for _ in range(5):
+            assert ApiConnectClient(SERVICE_NAME, headers={"accept": "*/*"}).get("/data")["ReturnCode"] == 1
+        assert stub_server.requests["/data"] == 5
+        assert len(stub_server.client_ports) == 1
+
+    def test_read_timeout(self, stub_server):
+        start = time.monotonic()
+        with pytest.raises(requests.RequestException):
+            ApiConnectClient(SERVICE_NAME, headers={"accept": "*/*"}).get_ac("/slow")
+        # The read timeout is retried twice
+        assert time.monotonic() - start < 1.5
+        assert stub_server.requests["/slow"] == 3
+
+    def test_timeout_by_request(self, stub_server):
+        response = ApiConnectClient(SERVICE_NAME, headers={"accept": "*/*"}).get_ac("/slow", timeout=2)
+        assert response.status_code == 200
+
+    def test_retry_unavailable(self, stub_server):
+        response = ApiConnectClient(SERVICE_NAME, headers={"accept": "*/*"}).get_ac("/unavailable")
+        assert response.status_code == 200
+        assert stub_server.requests["/unavailable"] == 3
+
+    def test_post_not_retried(self, stub_server):
+        response = ApiConnectClient(SERVICE_NAME, headers={"accept": "*/*"}).post("/unavailable", json={"id": 1})
+        assert response.status_code == 503
+        assert stub_server.requests["/unavailable"] == 1
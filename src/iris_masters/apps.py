@@ -10,6 +10,10 @@ class IrisMastersConfig(AppConfig):
         from iris_masters.permissions import register_permissions
         register_permissions()
         self.register_tasks()
+        # Data migrations write parameters through historical models, that don't invalidate the cache
+        from iris_masters.caches import applications_cache, parameters_cache
+        post_migrate.connect(parameters_cache.invalidate, sender=self, weak=False)
+        post_migrate.connect(applications_cache.invalidate, sender=self, weak=False)
         if settings.EXECUTE_DATA_CHEKS:
             from iris_masters.data_checks.states import check_record_states
             from iris_masters.data_checks.process import check_processes
@@ -0,0 +1,48 @@
+from main.caches import VersionedCache
+
+
+class ParametersCache(VersionedCache):
+    """
+    Cache of every Parameter value by its key
+    """
+    cache_key = "iris_masters:parameters"
+
+    def load_data(self):
+        from iris_masters.models import Parameter
+        return dict(Parameter.objects.values_list("parameter", "valor"))
+
+    def get_value(self, parameter_key, default_value=None):
+        return self.get_data().get(parameter_key, default_value)
+
+
+class ApplicationsCache(VersionedCache):
+    """
+    Cache of the applications by their description hash, to detect the origin application of every request
+    """
+    cache_key = "iris_masters:applications"
+
+    def load_data(self):
+        from iris_masters.models import Application
+
+        field_names = [field.attname for field in Application._meta.concrete_fields]
+        hash_position = field_names.index("description_hash")
+        rows = {}
+        for row in Application.objects.order_by("pk").values_list(*field_names):
+            rows.setdefault(row[hash_position], row)
+        return {"field_names": field_names, "rows": rows}
+
+    def get_application(self, description_hash):
+        """
+        :return: New Application instance with the cached values, or None if there isn't any with the hash
+        """
+        from iris_masters.models import Application
+
+        data = self.get_data()
+        row = data["rows"].get(description_hash)
+        if row is None:
+            return None
+        return Application.from_db(Application.objects.db, data["field_names"], row)
+
+
+parameters_cache = ParametersCache()
+applications_cache = ApplicationsCache()
@@ -0,0 +1,12 @@
+from django.db import models
+
+from iris_masters.caches import applications_cache, parameters_cache
+from main.caches import VersionedCacheQuerySetMixin
+
+
+class ParameterQuerySet(VersionedCacheQuerySetMixin, models.QuerySet):
+    versioned_cache = parameters_cache
+
+
+class ApplicationQuerySet(VersionedCacheQuerySetMixin, models.QuerySet):
+    versioned_cache = applications_cache
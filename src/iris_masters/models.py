@@ -6,6 +6,8 @@ from django.utils.translation import gettext_lazy as _
 
 from custom_safedelete.managers import CustomSafeDeleteManager
 from custom_safedelete.models import CustomSafeDeleteModel
+from iris_masters.caches import applications_cache, parameters_cache
+from iris_masters.managers import ApplicationQuerySet, ParameterQuerySet
 from iris_masters.mixins import CleanEnabledBase, CleanSafeDeleteBase
 from main.cachalot_decorator import iris_cachalot
 
@@ -407,7 +409,7 @@ class Parameter(UserTrack):
     """
     IRS_TB_MA_PARAMETRES
     """
-    objects = iris_cachalot(models.Manager(), extra_fields=["show", "visible", "category"])
+    objects = iris_cachalot(ParameterQuerySet.as_manager(), extra_fields=["show", "visible", "category"])
 
     OTHERS = 0
     MANAGEMENT = 1
@@ -448,16 +450,23 @@ class Parameter(UserTrack):
     def __str__(self):
         return self.parameter
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        parameters_cache.invalidate_on_commit()
+
+    def delete(self, *args, **kwargs):
+        deleted = super().delete(*args, **kwargs)
+        parameters_cache.invalidate_on_commit()
+        return deleted
+
     @staticmethod
     def get_parameter_by_key(parameter_key, default_value=None):
-        try:
-            return Parameter.objects.get(parameter=parameter_key).valor
-        except Parameter.DoesNotExist:
-            return default_value
+        return parameters_cache.get_value(parameter_key, default_value)
 
     @classmethod
     def get_config_dict(cls, param_keys):
-        return {p.parameter: p.valor for p in cls.objects.filter(parameter__in=param_keys)}
+        parameters = parameters_cache.get_data()
+        return {key: parameters[key] for key in param_keys if key in parameters}
 
     @staticmethod
     def max_claims_number():
@@ -470,7 +479,7 @@ class Application(UserTrack):
 
     IRS_TB_MA_SISTEMA
     """
-    objects = iris_cachalot(models.Manager(), extra_fields=["description_hash"])
+    objects = iris_cachalot(ApplicationQuerySet.as_manager(), extra_fields=["description_hash"])
 
     IRIS_HASH = "Jnfo8uhxb1WnqJ8qOrKuyF2ZaWU"
     WEB_HASH = "pHeGrFjQ4lf0UBBXACupX0W5Wdo"
@@ -508,6 +517,12 @@ class Application(UserTrack):
             else:
                 self.description_hash = signer.signature(self.description)
         super().save(force_insert, force_update, using, update_fields)
+        applications_cache.invalidate_on_commit()
+
+    def delete(self, *args, **kwargs):
+        deleted = super().delete(*args, **kwargs)
+        applications_cache.invalidate_on_commit()
+        return deleted
 
 
 class Support(CustomSafeDeleteModel, BasicMaster):
@@ -0,0 +1,138 @@
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from model_mommy import mommy
+
+from iris_masters.caches import applications_cache, parameters_cache
+from iris_masters.models import Application, Parameter
+from main.caches import VersionedCache
+from main.middleware import ApplicationMiddelware
+from main.urls import PUBLIC_API_BASE_PATH
+
+
+@pytest.mark.django_db
+class TestParametersCache:
+
+    @staticmethod
+    def create_parameters(number):
+        return [mommy.make(Parameter, user_id="222", parameter=f"PARAM_{index}", valor=str(index))
+                for index in range(number)]
+
+    def test_no_queries_once_loaded(self):
+        parameters = self.create_parameters(10)
+        assert Parameter.get_parameter_by_key(parameters[0].parameter) == "0"
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(50):
+                for parameter in parameters:
+                    assert Parameter.get_parameter_by_key(parameter.parameter) == parameter.valor
+            assert Parameter.get_parameter_by_key("NOT_EXISTING", "default") == "default"
+            assert Parameter.get_config_dict([p.parameter for p in parameters[:3]]) == {
+                "PARAM_0": "0", "PARAM_1": "1", "PARAM_2": "2"}
+        assert len(queries) == 0
+
+    def test_save_invalidates(self):
+        parameter = self.create_parameters(1)[0]
+        assert Parameter.get_parameter_by_key(parameter.parameter) == "0"
+        parameter.valor = "new value"
+        parameter.save()
+        assert Parameter.get_parameter_by_key(parameter.parameter) == "new value"
+
+    def test_create_invalidates(self):
+        assert Parameter.get_parameter_by_key("NEW_PARAM", "default") == "default"
+        self.create_parameters(1)
+        assert Parameter.get_parameter_by_key("PARAM_0", "default") == "0"
+
+    def test_delete_invalidates(self):
+        parameter = self.create_parameters(1)[0]
+        assert Parameter.get_parameter_by_key(parameter.parameter) == "0"
+        parameter.delete()
+        assert Parameter.get_parameter_by_key(parameter.parameter, "default") == "default"
+
+    def test_queryset_update_invalidates(self):
+        parameter = self.create_parameters(1)[0]
+        assert Parameter.get_parameter_by_key(parameter.parameter) == "0"
+        Parameter.objects.filter(parameter=parameter.parameter).update(valor="updated")
+        assert Parameter.get_parameter_by_key(parameter.parameter) == "updated"
+
+    def test_queryset_delete_invalidates(self):
+        parameter = self.create_parameters(1)[0]
+        assert Parameter.get_parameter_by_key(parameter.parameter) == "0"
+        Parameter.objects.filter(parameter=parameter.parameter).delete()
+        assert Parameter.get_parameter_by_key(parameter.parameter, "default") == "default"
+
+    def test_invalidate_reloads(self):
+        parameter = self.create_parameters(1)[0]
+        assert Parameter.get_parameter_by_key(parameter.parameter) == "0"
+        with CaptureQueriesContext(connection) as queries:
+            parameters_cache.invalidate()
+            assert Parameter.get_parameter_by_key(parameter.parameter) == "0"
+        assert len(queries) == 1
+
+    def test_invalidate_all_reloads(self):
+        parameter = self.create_parameters(1)[0]
+        assert parameters_cache in VersionedCache.registry
+        assert applications_cache in VersionedCache.registry
+        assert Parameter.get_parameter_by_key(parameter.parameter) == "0"
+        with CaptureQueriesContext(connection) as queries:
+            VersionedCache.invalidate_all()
+            assert Parameter.get_parameter_by_key(parameter.parameter) == "0"
+        assert len(queries) == 1
+
+
+@pytest.mark.django_db
+class TestApplicationsCache:
+
+    @staticmethod
+    def detect_application(application_hash=None, path="/"):
+        headers = {"HTTP_APPLICATION_HASH": application_hash} if application_hash else {}
+        request = RequestFactory().get(path, **headers)
+        ApplicationMiddelware().process_request(request)
+        return getattr(request, "application", None)
+
+    def test_no_queries_once_loaded(self):
+        mommy.make(Application, user_id="222", pk=Application.WEB_PK, description_hash=Application.WEB_HASH)
+        application = mommy.make(Application, user_id="222", description="Test app")
+        assert self.detect_application(application.description_hash) == application
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(20):
+                detected = self.detect_application(application.description_hash)
+                assert detected == application
+                assert detected.description == "Test app"
+                assert self.detect_application(Application.WEB_HASH, PUBLIC_API_BASE_PATH).pk == Application.WEB_PK
+                assert self.detect_application("unknown", PUBLIC_API_BASE_PATH).pk == Application.WEB_PK
+                assert self.detect_application("unknown") is None
+                assert self.detect_application() is None
+        assert len(queries) == 0
+
+    def test_save_invalidates(self):
+        application = mommy.make(Application, user_id="222", description="Test app")
+        assert self.detect_application(application.description_hash).description == "Test app"
+        application.description = "Edited app"
+        application.save()
+        assert self.detect_application(application.description_hash).description == "Edited app"
+
+        old_hash = application.description_hash
+        application.description_hash = "new-hash"
+        application.save()
+        assert self.detect_application(old_hash) is None
+        assert self.detect_application("new-hash") == application
+
+    def test_delete_invalidates(self):
+        application = mommy.make(Application, user_id="222", description="Test app")
+        assert self.detect_application(application.description_hash) == application
+        application.delete()
+        assert self.detect_application(application.description_hash) is None
+
+    def test_queryset_update_invalidates(self):
+        application = mommy.make(Application, user_id="222", description="Test app")
+        assert self.detect_application(application.description_hash) == application
+        Application.objects.filter(pk=application.pk).update(description_hash="updated-hash")
+        assert self.detect_application("updated-hash") == application
+
+    def test_detected_instances_are_not_shared(self):
+        mommy.make(Application, user_id="222", pk=Application.ATE_PK, description_hash=Application.ATE_HASH,
+                   description="ATE")
+        detected = self.detect_application(Application.ATE_HASH)
+        detected.description = "Changed in a request"
+        assert applications_cache.get_application(Application.ATE_HASH).description == "ATE"
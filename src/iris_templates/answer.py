@@ -10,7 +10,7 @@ def get_footer(group, lang):
         get_parameter_key(lang, 'TEXTCARTASIGNATURA'),
         get_parameter_key(lang, 'PEU_CONSULTES'),
     ]
-    valors = {p.parameter: p.valor for p in Parameter.objects.filter(parameter__in=PARAMS)}
+    valors = Parameter.get_config_dict(PARAMS)
     valors = [linebreaks(valors[p]).replace('\n', '') for p in PARAMS]
     return ''.join(valors[:1] + ['<p>' + group.signature + '</p>']) + '<p></p>'.join(valors[1:])
 
@@ -20,7 +20,7 @@ def get_signature(group, lang):
         get_parameter_key(lang, 'TEXTCARTAFI'),
         get_parameter_key(lang, 'TEXTCARTASIGNATURA'),
     ]
-    valors = {p.parameter: p.valor for p in Parameter.objects.filter(parameter__in=PARAMS)}
+    valors = Parameter.get_config_dict(PARAMS)
     valors = [valors[p] for p in PARAMS]
     return ''.join(valors[:1] + ['\n\n' + group.signature + '\n\n'] + valors[1:])
 
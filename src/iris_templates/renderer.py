@@ -1,5 +1,6 @@
 import re
 from abc import abstractmethod, ABCMeta
+from functools import lru_cache
 
 from iris_templates.templates_context.context import IrisVariableFinder
 
@@ -46,6 +47,17 @@ class BaseTemplateRenderer(metaclass=ABCMeta):
         return self.var_finder.get_vars_for_templates()
 
 
+WORD_REGEXP = re.compile(r'(\w+)')
+
+
+@lru_cache(maxsize=256)
+def split_words(text):
+    """
+    :return: Tuple with the text split in words and the text between them. The words are at the odd positions.
+    """
+    return tuple(WORD_REGEXP.split(text))
+
+
 def render_iris_1(template, ctx):
     """
     Backward compatible IRIS1 template render system.
@@ -59,11 +71,52 @@ def render_iris_1(template, ctx):
                    'This is intended when running tests.'
     else:
         rendered = template
-    for key, value in ctx.items():
-        rendered = re.sub(r'\b{}\b'.format(key), str(value).replace("\\", ""), rendered)
+    if all(WORD_REGEXP.fullmatch(key) for key in ctx):
+        rendered = Iris1Substitution(ctx).render(rendered)
+    else:
+        for key, value in ctx.items():
+            rendered = re.sub(r'\b{}\b'.format(key), str(value).replace("\\", ""), rendered)
     return rendered.replace('<p><br></p>', '<p></p>')
 
 
+class Iris1Substitution:
+    """
+    Replaces the vars of an IRIS1 template in a single pass over its words.
+
+    IRIS1 templates were rendered replacing every var, in the context order, over the whole text. A var is always a
+    whole word, so replacing the words of the template that are vars gives the same result, with one exception: the
+    value of a var is also rendered with the vars that come after it. The values are rendered the same way.
+    """
+
+    def __init__(self, ctx):
+        self.keys_positions = {key: position for position, key in enumerate(ctx)}
+        self.values = [str(value).replace("\\", "") for value in ctx.values()]
+        self.rendered_values = {}
+
+    def render(self, template):
+        return self.render_tokens(split_words(template))
+
+    def render_tokens(self, tokens, from_position=0):
+        """
+        :param tokens: Text split in words, as returned by split_words
+        :param from_position: Only the vars from this context position on are replaced
+        :return: Rendered text
+        """
+        rendered = list(tokens)
+        for index in range(1, len(tokens), 2):
+            position = self.keys_positions.get(tokens[index])
+            if position is not None and position >= from_position:
+                rendered[index] = self.get_rendered_value(position)
+        return ''.join(rendered)
+
+    def get_rendered_value(self, position):
+        if position not in self.rendered_values:
+            # Values change for every record, so they are not kept in the split_words cache
+            value_tokens = WORD_REGEXP.split(self.values[position])
+            self.rendered_values[position] = self.render_tokens(value_tokens, position + 1)
+        return self.rendered_values[position]
+
+
 class Iris1TemplateRenderer(BaseTemplateRenderer):
     """
     Backward compatible with IRIS1 template renderer.
@@ -97,12 +150,7 @@ class RegexpTemplateRenderer(BaseTemplateRenderer):
 
     def render(self, template):
         ctx = self.get_context(template)
-
-        def replacement(match):
-            return '{' + match.group(1)[1:-1].lower() + '}'
-
-        python_template = self.regexp.sub(replacement, template)
-        return python_template.format(**ctx)
+        return to_python_template(self.regexp, template).format(**ctx)
 
     def get_context(self, template):
         used_vars = self.get_used_vars(template)
@@ -118,7 +166,26 @@ class RegexpTemplateRenderer(BaseTemplateRenderer):
         :return: A list of vars used in template.
         :rtype: list
         """
-        return [used_var[1:-1].lower() for used_var in self.regexp.findall(template)]
+        return list(find_template_vars(self.regexp, template))
+
+
+@lru_cache(maxsize=256)
+def to_python_template(regexp, template):
+    """
+    :return: Template with its vars replaced by python format fields.
+    """
+    def replacement(match):
+        return '{' + match.group(1)[1:-1].lower() + '}'
+
+    return regexp.sub(replacement, template)
+
+
+@lru_cache(maxsize=256)
+def find_template_vars(regexp, template):
+    """
+    :return: Tuple of vars used in template.
+    """
+    return tuple(used_var[1:-1].lower() for used_var in regexp.findall(template))
 
 
 class DelimitedVarsTemplateRenderer(RegexpTemplateRenderer):
@@ -74,8 +74,7 @@ def get_required_param_names(lang, required):
 
 def get_required_params(lang, required):
     template_vars = get_required_param_names(lang, required)
-    params = Parameter.objects.filter(parameter__in=template_vars.values())
-    params = {p.parameter: p.valor for p in params}
+    params = Parameter.get_config_dict(template_vars.values())
     return {var_name: params[param_name] for var_name, param_name in template_vars.items()}
 
 
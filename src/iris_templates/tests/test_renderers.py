@@ -1,7 +1,10 @@
+import random
+import re
+
 import pytest
 from mock import Mock
 
-from iris_templates.renderer import DelimitedVarsTemplateRenderer, render_iris_1
+from iris_templates.renderer import DelimitedVarsTemplateRenderer, RegexpTemplateRenderer, render_iris_1
 
 
 class TestDelimitedVarsTemplateRenderer:
@@ -50,3 +53,73 @@ class TestTemplateRenderer:
     ))
     def test_var_replacements(self, text, expected):
         assert render_iris_1(text, {'test': 'OK'}) == expected
+
+
+def legacy_render_iris_1(template, ctx):
+    """
+    Previous implementation of render_iris_1, replacing the vars one by one over the whole text
+    """
+    rendered = template
+    for key, value in ctx.items():
+        rendered = re.sub(r'\b{}\b'.format(key), str(value).replace("\\", ""), rendered)
+    return rendered.replace('<p><br></p>', '<p></p>')
+
+
+class TestIris1Substitution:
+
+    @pytest.mark.parametrize('template,ctx', (
+        ('', {}),
+        ('codi data', {}),
+        ('codi data codi_peticio', {'codi': 'A1', 'codi_peticio': 'B2', 'data': '01/01/2020'}),
+        ('<p>codi</p><p><br></p>-codi-', {'codi': 1}),
+        ('codi', {'codi': 'C:\\path\\to \\g<0> \\1'}),
+        ('àcodi codià codi', {'codi': 'ò'}),
+        ('first second', {'first': 'second third', 'second': 'first', 'third': '3'}),
+        ('second first', {'first': 'second third', 'second': 'first', 'third': '3'}),
+        ('first', {'first': 'first first', 'second': 'x'}),
+        ('a b c', {'a': '', 'b': None, 'c': 0}),
+        ('var.name var', {'var.name': 'dot', 'var': 'word'}),
+        ('a-b', {'a-b': 'joined', 'a': 'A'}),
+    ))
+    def test_same_as_legacy(self, template, ctx):
+        assert render_iris_1(template, ctx) == legacy_render_iris_1(template, ctx)
+
+    def test_same_as_legacy_random(self):
+        rnd = random.Random(7)
+        words = ['codi', 'data', 'nom', 'adreça', 'text', 'p', 'br', '1', 'codi_data']
+        separators = [' ', '', '\n', '<p>', '</p>', '<p><br></p>', '-', '_', '.', ', ', '\\']
+        for _ in range(200):
+            template = ''.join(rnd.choice(words) + rnd.choice(separators) for _ in range(rnd.randint(0, 30)))
+            keys = rnd.sample(words, rnd.randint(0, len(words)))
+            ctx = {key: ''.join(rnd.choice(words + separators) for _ in range(rnd.randint(0, 4))) for key in keys}
+            assert render_iris_1(template, ctx) == legacy_render_iris_1(template, ctx)
+
+
+class StubVarFinder:
+    variables = {'codi': 'A1', 'nom': 'Name {with} braces', 'data': '01/01/2020'}
+
+    def __init__(self, record_card):
+        pass
+
+    def get_vars_for_templates(self):
+        return list(self.variables)
+
+    def get_values(self, ctx, required_variables):
+        ctx.update({var: value for var, value in self.variables.items() if var in required_variables})
+        return ctx
+
+
+class TestRegexpTemplateRenderers:
+
+    @pytest.mark.parametrize('renderer_class,template,expected', (
+        (RegexpTemplateRenderer, 'Code _CODI_ for _nom_ on _data_, _missing_', 'Code A1 for Name {with} braces on '
+                                                                              '01/01/2020, '),
+        (RegexpTemplateRenderer, 'No vars', 'No vars'),
+        (DelimitedVarsTemplateRenderer, '#CAPSALERA=Header#\n#CODI# - #nom#', 'A1 - Name {with} braces'),
+        (DelimitedVarsTemplateRenderer, '', ''),
+    ))
+    def test_render(self, renderer_class, template, expected):
+        renderer = renderer_class(record_card=Mock(), var_finder_cls=StubVarFinder)
+        # Rendering twice the same template gives the same result with the cached template
+        assert renderer.render(template) == expected
+        assert renderer.render(template) == expected
@@ -13,10 +13,14 @@ class UnaccentSearchFilter(SearchFilter):
 
 
 class UnaccentLookupChoiceFilter(LookupChoiceFilter):
+    """
+    Compares the values unaccented through the immutable_unaccent transform, so the trigram indexes of the unaccented
+    columns can be used
+    """
 
     def filter(self, qs, lookup):
         if not lookup:
             return super(LookupChoiceFilter, self).filter(qs, None)
 
-        self.lookup_expr = "unaccent__{}".format(lookup.lookup_expr)
+        self.lookup_expr = "immutable_unaccent__{}".format(lookup.lookup_expr)
         return super(LookupChoiceFilter, self).filter(qs, lookup.value)
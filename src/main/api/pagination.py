@@ -1,4 +1,17 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.compat import coreapi, coreschema
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class IrisPagination(PageNumberPagination):
@@ -20,7 +33,121 @@ class IrisOnlyMaxPagination(IrisPagination):
     max_page_size = 200
 
 
-class RecordCardPagination(IrisPagination):
+class KeysetPaginationMixin:
+    """
+    Opt-in keyset pagination for the page number paginators.
+
+    When the request has the cursor parameter (empty for the first page), the queryset is ordered by
+    `keyset_ordering` and every page is read from the last item of the previous one, instead of counting the whole
+    queryset and skipping the previous pages with an OFFSET. Rows inserted while a client is paging don't shift the
+    following pages. The next link carries the cursor of the following page; there is no previous link, the clients
+    have to keep the cursors they have visited.
+
+    The total count is only computed when the count parameter is sent, and it's capped at `max_count`.
+    """
+    cursor_query_param = "cursor"
+    cursor_query_description = _("Keyset pagination cursor, empty for the first page.")
+    count_query_param = "count"
+    count_query_description = _("Include the total count on keyset pagination, up to a maximum.")
+    invalid_cursor_message = _("Invalid cursor")
+    keyset_ordering = ("-created_at", "-id")
+    max_count = 1000
+
+    keyset = False
+    count = None
+    count_capped = False
+    next_cursor = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        self.request = request
+        if self.count_query_param in request.query_params:
+            self.count, self.count_capped = self.get_capped_count(queryset)
+
+        fields = [queryset.model._meta.get_field(ordering.lstrip("-")) for ordering in self.keyset_ordering]
+        queryset = queryset.order_by(*self.keyset_ordering)
+        cursor = request.query_params[self.cursor_query_param]
+        if cursor:
+            queryset = queryset.filter(self.get_keyset_filter(self.decode_cursor(fields, cursor)))
+
+        page = list(queryset[:page_size + 1])
+        self.next_cursor = self.encode_cursor(fields, page[page_size - 1]) if len(page) > page_size else None
+        return page[:page_size]
+
+    def get_capped_count(self, queryset):
+        """
+        :return: Tuple with the number of items of the queryset, up to max_count, and if there were more items
+        """
+        count = queryset.order_by()[:self.max_count + 1].count()
+        return min(count, self.max_count), count > self.max_count
+
+    def get_keyset_filter(self, values):
+        """
+        :param values: Values of the keyset fields of the last item of the previous page
+        :return: Filter of the items that follow the given values, in the keyset ordering
+        """
+        conditions = []
+        for position, ordering in enumerate(self.keyset_ordering):
+            field_name = ordering.lstrip("-")
+            lookup = "lt" if ordering.startswith("-") else "gt"
+            previous_fields = {previous_ordering.lstrip("-"): value
+                               for previous_ordering, value in zip(self.keyset_ordering[:position], values)}
+            conditions.append(Q(**previous_fields, **{f"{field_name}__{lookup}": values[position]}))
+        return reduce(or_, conditions)
+
+    @staticmethod
+    def encode_cursor(fields, item):
+        values = [field.value_to_string(item) for field in fields]
+        return urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii")
+
+    def decode_cursor(self, fields, cursor):
+        try:
+            values = json.loads(urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+            if not isinstance(values, list) or len(values) != len(fields):
+                raise ValueError
+            values = [field.to_python(value) for field, value in zip(fields, values)]
+        except (TypeError, ValueError, UnicodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if any(value is None for value in values):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def get_next_cursor_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.count_query_param)
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ("count", self.count),
+            ("count_capped", self.count_capped),
+            ("next", self.get_next_cursor_link()),
+            ("previous", None),
+            ("results", data)
+        ]))
+
+    def get_schema_fields(self, view):
+        fields = super().get_schema_fields(view)
+        return fields + [
+            coreapi.Field(name=self.cursor_query_param, required=False, location="query",
+                          schema=coreschema.String(title="Cursor", description=str(self.cursor_query_description))),
+            coreapi.Field(name=self.count_query_param, required=False, location="query",
+                          schema=coreschema.Boolean(title="Count", description=str(self.count_query_description))),
+        ]
+
+
+class RecordCardPagination(KeysetPaginationMixin, IrisPagination):
     page_size = 30
 
 
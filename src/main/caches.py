@@ -1,5 +1,11 @@
+import threading
+import time
+import uuid
 from abc import abstractmethod, ABCMeta
 
+from django.core.cache import cache
+from django.db import transaction
+
 
 class DescriptionCache(metaclass=ABCMeta):
 
@@ -26,3 +32,120 @@ class DescriptionCache(metaclass=ABCMeta):
     def get_item_description(self, item_id):
         item = self._get_item(item_id)
         return item["description"] if item else ""
+
+
+class VersionedCache(metaclass=ABCMeta):
+    """
+    Process-wide cache for small tables that are read constantly and rarely written.
+
+    Each process keeps its own copy of the data, so reads don't touch the database nor the django cache. The copy is
+    shared between processes through the django cache and tagged with a version stamp. Every process checks the stamp
+    at most once every `check_interval` seconds and reloads its copy when it has changed. Writers must call
+    `invalidate` (or `invalidate_on_commit`) to change the stamp.
+
+    Every instance is registered, so all of them can be invalidated at once with `invalidate_all`.
+    """
+    cache_key = None
+    check_interval = 5
+    registry = []
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._data = None
+        self._version = None
+        self._checked_at = 0
+        VersionedCache.registry.append(self)
+
+    @classmethod
+    def invalidate_all(cls):
+        for versioned_cache in cls.registry:
+            versioned_cache.invalidate()
+
+    @abstractmethod
+    def load_data(self):
+        """
+        :return: Data to cache, it must be picklable
+        """
+        pass
+
+    @property
+    def version_key(self):
+        return f"{self.cache_key}:version"
+
+    @property
+    def data_key(self):
+        return f"{self.cache_key}:data"
+
+    def get_data(self):
+        now = time.monotonic()
+        if self._data is not None and now - self._checked_at < self.check_interval:
+            return self._data
+
+        with self._lock:
+            version = self._get_shared_version()
+            if self._data is None or version != self._version:
+                self._data = self._get_shared_data(version)
+                self._version = version
+            self._checked_at = now
+            return self._data
+
+    def _get_shared_version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            cache.add(self.version_key, uuid.uuid4().hex, timeout=None)
+            version = cache.get(self.version_key)
+        return version
+
+    def _get_shared_data(self, version):
+        shared = cache.get(self.data_key)
+        if version is not None and shared and shared[0] == version:
+            return shared[1]
+        data = self.load_data()
+        cache.set(self.data_key, (version, data), timeout=None)
+        return data
+
+    def invalidate(self, **kwargs):
+        """
+        Drop the local copy and change the shared version stamp, so every process reloads its data.
+        Accepts the kwargs sent by django signals to be used as a receiver.
+        """
+        with self._lock:
+            self._data = None
+            self._version = None
+        cache.set(self.version_key, uuid.uuid4().hex, timeout=None)
+        cache.delete(self.data_key)
+
+    def invalidate_on_commit(self, **kwargs):
+        """
+        Invalidate the cache now, for the current transaction, and again once it's committed, to discard any copy
+        loaded by other processes before the changes were visible to them.
+        """
+        self.invalidate()
+        transaction.on_commit(self.invalidate)
+
+
+class VersionedCacheQuerySetMixin:
+    """
+    QuerySet mixin for the models of a VersionedCache. Bulk operations don't call the save/delete methods of the
+    models, so they have to invalidate the cache by themselves.
+    """
+    versioned_cache = None
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        self.versioned_cache.invalidate_on_commit()
+        return rows
+
+    def delete(self):
+        deleted = super().delete()
+        self.versioned_cache.invalidate_on_commit()
+        return deleted
+
+    def bulk_create(self, *args, **kwargs):
+        objs = super().bulk_create(*args, **kwargs)
+        self.versioned_cache.invalidate_on_commit()
+        return objs
+
+    def bulk_update(self, *args, **kwargs):
+        super().bulk_update(*args, **kwargs)
+        self.versioned_cache.invalidate_on_commit()
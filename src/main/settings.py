@@ -94,7 +94,7 @@ class Base(mixins.CachesMixin, mixins.DatabasesMixin, mixins.CompressMixin,
         "quioscs.apps.QuioscsConfig",
         "support_info.apps.SupportInfoConfig",
         "post_migrate.apps.PostMigrateConfig",
-        "geo",
+        "geo.apps.GeoConfig",
         "geo_proxy.apps.GeoProxyConfig",
 
         # 3rd parties
@@ -324,6 +324,21 @@ class Base(mixins.CachesMixin, mixins.DatabasesMixin, mixins.CompressMixin,
         "content-type": "application/json",
     }
 
+    # Integrations HTTP client: timeouts in seconds, retries of the failed connections and idempotent requests
+    INTEGRATIONS_CONNECT_TIMEOUT = opts.get("INTEGRATIONS_CONNECT_TIMEOUT", 5.0)
+    INTEGRATIONS_READ_TIMEOUT = opts.get("INTEGRATIONS_READ_TIMEOUT", 30.0)
+    INTEGRATIONS_READ_TIMEOUTS = {
+        "PDF": opts.get("INTEGRATIONS_PDF_READ_TIMEOUT", 120.0),
+        "Letter": opts.get("INTEGRATIONS_LETTER_READ_TIMEOUT", 120.0),
+    }
+    INTEGRATIONS_RETRIES = opts.get("INTEGRATIONS_RETRIES", 2)
+    INTEGRATIONS_RETRY_BACKOFF = opts.get("INTEGRATIONS_RETRY_BACKOFF", 0.5)
+    INTEGRATIONS_POOL_SIZE = opts.get("INTEGRATIONS_POOL_SIZE", 10)
+
+    # Applicant search: threads shared by the searches over the sources and seconds to wait for every source
+    APPLICANT_SEARCH_WORKERS = opts.get("APPLICANT_SEARCH_WORKERS", 8)
+    APPLICANT_SEARCH_TIMEOUT = opts.get("APPLICANT_SEARCH_TIMEOUT", 10.0)
+
     TWITTER_ACCESS_TOKEN = opts.get("TWITTER_ACCESS_TOKEN", "")
     TWITTER_TOKEN_SECRET = opts.get("TWITTER_TOKEN_SECRET", "")
     TWITTER_CONSUMER_KEY = opts.get("TWITTER_CONSUMER_KEY", "")
@@ -550,6 +565,9 @@ class Base(mixins.CachesMixin, mixins.DatabasesMixin, mixins.CompressMixin,
     CACHALOT_ONLY_CACHABLE_TABLES += CACHALOT_PROTOCOLS_TABLES + CACHALOT_PROFILES_TABLES + CACHALOT_THEMES_TABLES
     CACHALOT_ONLY_CACHABLE_TABLES += CACHALOT_SURVEYS_TABLES + CACHALOT_SUPPORT_INFO_TABLES
 
+    # Seconds to coalesce the requests to update the themes tree cache
+    THEMES_TREE_UPDATE_DELAY = opts.get("THEMES_TREE_UPDATE_DELAY", 10)
+
     # Chuncked Files
     DRF_CHUNKED_UPLOAD_PATH = opts.get("DRF_CHUNKED_UPLOAD_PATH", "record_files/%Y/%m/%d/")
     DRF_CHUNKED_UPLOAD_MAX_BYTES = opts.get("DRF_CHUNKED_UPLOAD_MAX_BYTES", 10485760)  # 10MB
@@ -603,6 +621,10 @@ class Base(mixins.CachesMixin, mixins.DatabasesMixin, mixins.CompressMixin,
     GEO_SRID = opts.get('GEO_SRID', 25829)
     GEOCODER_SERVICES_CLASS = opts.get('GEOCODER_SERVICES_CLASS', '')
     GEOCODER_CLASS = opts.get('GEOCODER_CLASS', 'geo.geocode.GisGeocoder')
+    # Seconds to keep the geocoder services responses, 0 disables the cache
+    GEOCODE_CACHE_TIMEOUT = opts.get('GEOCODE_CACHE_TIMEOUT', 60 * 60 * 24)
+    # Ubications resolved with every request to the geocoder lots endpoint
+    GEOCODE_LOT_SIZE = opts.get('GEOCODE_LOT_SIZE', 100)
 
     # Integration tasks variables
 
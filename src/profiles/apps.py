@@ -8,11 +8,17 @@ class ProfilesConfig(AppConfig):
     name = "profiles"
 
     def ready(self):
+        from mptt.signals import node_moved
+        from profiles.caches import groups_tree_cache
         from profiles.permission_registry import PERMISSIONS
 
         def migrate_permissions(*args, **kwargs):
             PERMISSIONS.create_db_permissions()
         post_migrate.connect(migrate_permissions, sender=self, weak=False)
+        # Data migrations write groups through historical models, that don't invalidate the cache
+        post_migrate.connect(groups_tree_cache.invalidate, sender=self, weak=False)
+        # Moving a node rewrites the tree fields with raw queries
+        node_moved.connect(groups_tree_cache.invalidate_on_commit, sender=self.get_model("Group"), weak=False)
         self.register_tasks()
         try:
             set_default_admin = import_string(settings.SET_DEFAULT_ADMIN_BACKEND)
@@ -0,0 +1,158 @@
+from collections import namedtuple
+
+from main.caches import VersionedCache
+
+GroupNode = namedtuple("GroupNode", ["parent_id", "is_ambit", "is_anonymous", "deleted"])
+
+
+class GroupsTree:
+    """
+    In memory copy of the groups hierarchy. It resolves the ancestors, ambits and ambit coordinators of the groups
+    with the same semantics as the MPTT queries of the Group model, following the parent links.
+    """
+
+    def __init__(self, data) -> None:
+        self.dair_id = data["dair_id"]
+        self.nodes = data["nodes"]
+        # The nodes are loaded in tree order, so the children lists keep the order of the MPTT queries
+        self.children = {}
+        for group_id, node in self.nodes.items():
+            self.children.setdefault(node.parent_id, []).append(group_id)
+        self.coordinators = set()
+        for node in self.nodes.values():
+            parent = self.nodes.get(node.parent_id)
+            if not node.deleted and parent and parent.parent_id is not None:
+                self.coordinators.add(parent.parent_id)
+        self._ambits = {}
+
+    def ancestors(self, group_id, ascending=False, include_self=False) -> list:
+        """
+        :return: Ids of the not deleted ancestors of the group, like Group.get_ancestors
+        """
+        if group_id not in self.nodes:
+            return []
+        ancestors = []
+        node_id = group_id if include_self else self.nodes[group_id].parent_id
+        while node_id is not None:
+            node = self.nodes[node_id]
+            if not node.deleted:
+                ancestors.append(node_id)
+            node_id = node.parent_id
+        return ancestors if ascending else ancestors[::-1]
+
+    def descendants(self, group_id, include_self=False) -> list:
+        """
+        :return: Ids of the not deleted descendants of the group in tree order, like Group.get_descendants
+        """
+        if group_id not in self.nodes:
+            return []
+        descendants = []
+        pending = [group_id] if include_self else self.children.get(group_id, [])[::-1]
+        while pending:
+            node_id = pending.pop()
+            if not self.nodes[node_id].deleted:
+                descendants.append(node_id)
+            pending.extend(self.children.get(node_id, [])[::-1])
+        return descendants
+
+    def ambit_ancestor_id(self, group_id):
+        """
+        :return: Id of the first is_ambit ancestor of the group except DAIR, like Group.ambit_ancestor
+        """
+        for ancestor_id in self.ancestors(group_id, ascending=True):
+            if ancestor_id != self.dair_id and self.nodes[ancestor_id].is_ambit:
+                return ancestor_id
+
+    def ambit_ids(self, group_id) -> list:
+        """
+        :return: Ids of the groups in the ambit of the group, like Group.ambit
+        """
+        if group_id not in self._ambits:
+            self._ambits[group_id] = self._get_ambit_ids(group_id)
+        return list(self._ambits[group_id])
+
+    def _get_ambit_ids(self, group_id):
+        node = self.nodes.get(group_id)
+        if not node:
+            return []
+        ancestors = [ancestor_id for ancestor_id in self.ancestors(group_id) if ancestor_id != self.dair_id]
+        if node.is_ambit:
+            return ancestors + self.descendants(group_id)
+        ambit_ancestor_id = self.ambit_ancestor_id(group_id)
+        if ambit_ancestor_id is not None:
+            return [descendant_id for descendant_id in self.descendants(ambit_ancestor_id, include_self=True)
+                    if descendant_id != group_id or node.is_anonymous]
+        return ancestors
+
+    def ambit_coordinator_id(self, group_id):
+        """
+        :return: Id of the first group, starting from the group itself, that has descendants two levels below or that
+                 has no parent, like Group.get_ambit_coordinator
+        """
+        node_id = group_id
+        while node_id in self.nodes:
+            if node_id in self.coordinators or self.nodes[node_id].parent_id is None:
+                return node_id
+            node_id = self.nodes[node_id].parent_id
+
+
+class GroupsTreeCache(VersionedCache):
+    """
+    Cache of every group, deleted ones included, and of the groups hierarchy. The groups are shared as rows of values
+    and every process builds its own GroupsTree from them.
+    """
+    cache_key = "profiles:groups_tree"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._tree = None
+        self._tree_data = None
+
+    def load_data(self):
+        from profiles.models import Group
+
+        field_names = [field.attname for field in Group._meta.concrete_fields]
+        positions = {field_name: position for position, field_name in enumerate(field_names)}
+        rows = {}
+        nodes = {}
+        for row in Group.objects.order_by("tree_id", "lft").values_list(*field_names):
+            group_id = row[positions["id"]]
+            rows[group_id] = row
+            nodes[group_id] = GroupNode(row[positions["parent_id"]], row[positions["is_ambit"]],
+                                        row[positions["is_anonymous"]], row[positions["deleted"]] is not None)
+        dair_group = Group.query_dair_group()
+        return {
+            "field_names": field_names,
+            "rows": rows,
+            "nodes": nodes,
+            "dair_id": dair_group.pk if dair_group else None,
+        }
+
+    def get_tree(self) -> GroupsTree:
+        data = self.get_data()
+        with self._lock:
+            if self._tree is None or self._tree_data is not data:
+                self._tree = GroupsTree(data)
+                self._tree_data = data
+            return self._tree
+
+    def get_group(self, group_id):
+        """
+        :return: New Group instance with the cached values, or None if it does not exist
+        """
+        from profiles.models import Group
+
+        data = self.get_data()
+        row = data["rows"].get(group_id)
+        if row is None:
+            return None
+        return Group.from_db(Group.objects.db, data["field_names"], row)
+
+    def get_groups(self, group_ids) -> list:
+        return [group for group in map(self.get_group, group_ids) if group]
+
+    def get_dair_group(self):
+        return self.get_group(self.get_tree().dair_id)
+
+
+groups_tree_cache = GroupsTreeCache()
@@ -70,7 +70,7 @@ def create_basic_group_struct():
 
 def set_ambit_coordinators(sender, **kwargs):
     for group in Group.objects.filter(deleted__isnull=True).exclude(pk=0):
-        group.ambit_coordinator = group.get_ambit_parent()
+        group.ambit_coordinator = group.query_ambit_parent()
         group.save()
 
     if settings.DEFAULT_ADMIN:
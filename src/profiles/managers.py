@@ -1,10 +1,21 @@
 from django.db.models import Manager
 from mptt.managers import TreeManager
+from mptt.querysets import TreeQuerySet
 
 from custom_safedelete.managers import CustomSafeDeleteManager
+from main.caches import VersionedCacheQuerySetMixin
+from profiles.caches import groups_tree_cache
+
+
+class GroupQuerySet(VersionedCacheQuerySetMixin, TreeQuerySet):
+    """
+    The MPTT tree updates and rebuilds go through the bulk operations too.
+    """
+    versioned_cache = groups_tree_cache
 
 
 class GroupIRISManager(TreeManager, CustomSafeDeleteManager):
+    _queryset_class = GroupQuerySet
 
     def get_user_groups(self, groups_codes):
         """
@@ -19,6 +19,7 @@ from iris_masters.models import UserTrack, UserIdField, Application, InputChanne
 from iris_masters.mixins import CleanEnabledBase, CleanSafeDeleteBase
 from main.api.validators import EmailCommasSeparatedValidator
 from main.cachalot_decorator import iris_cachalot
+from profiles.caches import groups_tree_cache
 from profiles.managers import GroupIRISManager, GroupInputChannelManager
 import logging
 
@@ -177,14 +178,16 @@ class Group(UserTrack, CustomSafeDeleteModel, MPTTModel):
     def save(self, keep_deleted=False, **kwargs):
 
         super().save(keep_deleted, **kwargs)
+        groups_tree_cache.invalidate_on_commit()
 
-        ambit_parent = self.get_ambit_parent()
+        ambit_parent = self.query_ambit_parent()
         if ambit_parent != self.ambit_coordinator:
             self.ambit_coordinator = ambit_parent
             self.save()
 
     def delete(self, force_policy=None, **kwargs):
         super().delete(force_policy, **kwargs)
+        groups_tree_cache.invalidate_on_commit()
         for children_group in self.get_children():
             children_group.delete()
 
@@ -238,7 +241,17 @@ class Group(UserTrack, CustomSafeDeleteModel, MPTTModel):
         if self.is_ambit:
             return self
         else:
-            return self.ambit_ancestor(Group.get_dair_group())
+            return groups_tree_cache.get_group(groups_tree_cache.get_tree().ambit_ancestor_id(self.pk))
+
+    def query_ambit_parent(self):
+        """
+        Same as get_ambit_parent, but reading the groups tree from the database, for the code that is changing it.
+        :return: Return ambit parent group if its exists, otherwise None
+        """
+        if self.is_ambit:
+            return self
+        else:
+            return self.ambit_ancestor(Group.query_dair_group())
 
     def get_ambit_ancestors_groups(self, ambit_ancestor):
         """
@@ -258,20 +271,16 @@ class Group(UserTrack, CustomSafeDeleteModel, MPTTModel):
         return list(ancestors)
 
     def ambit(self):
-        dair_group = Group.get_dair_group()
-        if self.is_ambit:
-            return self.get_isambit_groups(dair_group)
-        else:
-            ambit_ancestor = self.ambit_ancestor(dair_group)
-            if ambit_ancestor:
-                return self.get_ambit_ancestors_groups(ambit_ancestor)
-
-            return self.get_noambit_groups(dair_group)
+        """
+        The ambit is resolved from the groups tree cache, with the same result as get_isambit_groups,
+        get_ambit_ancestors_groups or get_noambit_groups.
+        :return: List of groups of the ambit
+        """
+        return groups_tree_cache.get_groups(self.ambit_ids)
 
     @property
     def ambit_ids(self):
-        ambit = self.ambit()
-        return [ambit_group.pk for ambit_group in ambit] if ambit else []
+        return groups_tree_cache.get_tree().ambit_ids(self.pk)
 
     @property
     def ambits_ancestors(self):
@@ -279,7 +288,9 @@ class Group(UserTrack, CustomSafeDeleteModel, MPTTModel):
 
         :return: List of ambits of the current group
         """
-        return [ancestor for ancestor in self.get_ancestors(include_self=True) if ancestor.is_ambit]
+        tree = groups_tree_cache.get_tree()
+        return groups_tree_cache.get_groups([ancestor_id for ancestor_id in tree.ancestors(self.pk, include_self=True)
+                                             if tree.nodes[ancestor_id].is_ambit])
 
     @property
     def group_permissions_codes(self):
@@ -290,6 +301,10 @@ class Group(UserTrack, CustomSafeDeleteModel, MPTTModel):
 
     @staticmethod
     def get_dair_group():
+        return groups_tree_cache.get_dair_group()
+
+    @staticmethod
+    def query_dair_group():
         return Group.objects.filter(parent__isnull=True, is_anonymous=False, deleted__isnull=True).first()
 
     @staticmethod
@@ -309,10 +324,10 @@ class Group(UserTrack, CustomSafeDeleteModel, MPTTModel):
             return Group.get_dair_group()
 
     def get_ambit_coordinator(self):
-        is_coordinator = self.get_descendants().filter(level=self.level+2).exists()
-        if is_coordinator or not self.parent:
+        coordinator_id = groups_tree_cache.get_tree().ambit_coordinator_id(self.pk)
+        if coordinator_id is None or coordinator_id == self.pk:
             return self
-        return self.parent.get_ambit_coordinator()
+        return groups_tree_cache.get_group(coordinator_id)
 
 
 def get_anonymous_group():
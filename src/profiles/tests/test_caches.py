@@ -0,0 +1,122 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from model_mommy import mommy
+
+from profiles.caches import groups_tree_cache
+from profiles.models import Group, get_anonymous_group
+from profiles.tests.utils import add_extra_group_level, create_groups
+
+
+class LegacyGroupTree:
+    """
+    Previous implementation of the group hierarchy methods, with several queries for every call
+    """
+
+    @staticmethod
+    def dair_group():
+        return Group.objects.filter(parent__isnull=True, is_anonymous=False, deleted__isnull=True).first()
+
+    @classmethod
+    def ambit(cls, group):
+        dair_group = cls.dair_group()
+        if group.is_ambit:
+            return group.get_isambit_groups(dair_group)
+        ambit_ancestor = group.ambit_ancestor(dair_group)
+        if ambit_ancestor:
+            return group.get_ambit_ancestors_groups(ambit_ancestor)
+        return group.get_noambit_groups(dair_group)
+
+    @classmethod
+    def ambit_parent(cls, group):
+        return group if group.is_ambit else group.ambit_ancestor(cls.dair_group())
+
+    @classmethod
+    def ambit_coordinator(cls, group):
+        is_coordinator = group.get_descendants().filter(level=group.level + 2).exists()
+        if is_coordinator or not group.parent:
+            return group
+        return cls.ambit_coordinator(group.parent)
+
+    @staticmethod
+    def ambits_ancestors(group):
+        return [ancestor for ancestor in group.get_ancestors(include_self=True) if ancestor.is_ambit]
+
+
+def make_group(parent, **kwargs):
+    return mommy.make(Group, user_id="test", profile_ctrl_user_id="test", parent=parent, **kwargs)
+
+
+@pytest.mark.django_db
+class TestGroupsTreeCache:
+
+    @staticmethod
+    def given_groups():
+        _, parent, first_soon, _, noambit_parent, noambit_soon = create_groups()
+        add_extra_group_level(first_soon)
+        make_group(parent, is_anonymous=True)
+        hidden_parent = make_group(noambit_soon)
+        make_group(make_group(hidden_parent), is_ambit=True)
+        Group.objects.filter(pk=hidden_parent.pk).update(deleted=timezone.now())
+        make_group(noambit_parent).delete()
+        get_anonymous_group()
+        return list(Group.objects.all())
+
+    def test_same_hierarchy_as_legacy(self):
+        for group in self.given_groups():
+            assert group.ambit() == LegacyGroupTree.ambit(group)
+            assert group.ambit_ids == [ambit_group.pk for ambit_group in LegacyGroupTree.ambit(group)]
+            assert group.get_ambit_parent() == LegacyGroupTree.ambit_parent(group)
+            assert group.get_ambit_coordinator() == LegacyGroupTree.ambit_coordinator(group)
+            assert group.ambits_ancestors == LegacyGroupTree.ambits_ancestors(group)
+        assert Group.get_dair_group() == LegacyGroupTree.dair_group()
+
+    def test_cached_groups_values(self):
+        groups = self.given_groups()
+        dair_group = Group.get_dair_group()
+        assert dair_group.group_plate == LegacyGroupTree.dair_group().group_plate
+        for group in groups:
+            ambit_parent = group.get_ambit_parent()
+            if ambit_parent:
+                assert ambit_parent.description == Group.objects.get(pk=ambit_parent.pk).description
+
+    def test_repeated_checks_without_queries(self):
+        groups = self.given_groups()
+        for group in groups:
+            group.ambit_ids
+        # Other requests work with their own instances of the groups
+        other_groups = list(Group.objects.all())
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(3):
+                for group in groups + other_groups:
+                    group.ambit()
+                    group.ambit_ids
+                    group.ambits_ancestors
+                    group.get_ambit_parent()
+                    group.get_ambit_coordinator()
+                    Group.get_dair_group()
+        assert len(queries) == 0
+
+    def test_invalidate_on_save(self):
+        _, parent, _, second_soon, noambit_parent, noambit_soon = create_groups()
+        assert second_soon.get_ambit_parent() == parent
+        second_soon.parent = noambit_parent
+        second_soon.save()
+        assert second_soon.get_ambit_parent() is None
+        assert second_soon.ambit_ids == [noambit_parent.pk]
+
+        assert noambit_soon.get_ambit_parent() is None
+        noambit_parent.is_ambit = True
+        noambit_parent.save()
+        assert noambit_soon.get_ambit_parent() == noambit_parent
+
+    def test_invalidate_on_tree_changes(self):
+        _, parent, _, second_soon, noambit_parent, _ = create_groups()
+        assert second_soon.get_ambit_parent() == parent
+        second_soon.move_to(noambit_parent)
+        assert Group.objects.get(pk=second_soon.pk).get_ambit_parent() is None
+
+        tree = groups_tree_cache.get_tree()
+        Group.objects.rebuild()
+        assert groups_tree_cache.get_tree() is not tree
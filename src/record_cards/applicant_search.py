@@ -0,0 +1,46 @@
+"""
+Database objects that back the applicant searches by name and document.
+
+The searches compare unaccented names with ilike_contains (a case insensitive regular expression) and the documents
+with icontains, so they can't use btree indexes. Trigram GIN indexes serve both operators. The record searches by
+applicant can compare the unaccented names with icontains too, that is served by the indexes of their UPPER values.
+The unaccent function of postgres is not IMMUTABLE and can't be used in an index, so the names are indexed through an
+IMMUTABLE wrapper, that the queries use with the immutable_unaccent transform.
+"""
+
+UNACCENT_FUNCTION = "iris_unaccent"
+
+APPLICANT_SEARCH_INDEXES = (
+    ("record_cards_citizen_name_trgm", "record_cards_citizen", f"{UNACCENT_FUNCTION}(name)"),
+    ("record_cards_citizen_first_surname_trgm", "record_cards_citizen", f"{UNACCENT_FUNCTION}(first_surname)"),
+    ("record_cards_citizen_second_surname_trgm", "record_cards_citizen", f"{UNACCENT_FUNCTION}(second_surname)"),
+    ("record_cards_citizen_full_normalized_name_trgm", "record_cards_citizen",
+     f"{UNACCENT_FUNCTION}(full_normalized_name)"),
+    ("record_cards_citizen_upper_name_trgm", "record_cards_citizen", f"UPPER({UNACCENT_FUNCTION}(name))"),
+    ("record_cards_citizen_upper_first_surname_trgm", "record_cards_citizen",
+     f"UPPER({UNACCENT_FUNCTION}(first_surname))"),
+    ("record_cards_citizen_dni_trgm", "record_cards_citizen", "UPPER(dni::text)"),
+    ("record_cards_socialentity_social_reason_trgm", "record_cards_socialentity",
+     f"{UNACCENT_FUNCTION}(social_reason)"),
+    ("record_cards_socialentity_upper_unaccent_social_reason_trgm", "record_cards_socialentity",
+     f"UPPER({UNACCENT_FUNCTION}(social_reason))"),
+    ("record_cards_socialentity_upper_social_reason_trgm", "record_cards_socialentity", "UPPER(social_reason::text)"),
+    ("record_cards_socialentity_cif_trgm", "record_cards_socialentity", "UPPER(cif::text)"),
+)
+
+CREATE_APPLICANT_SEARCH_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE OR REPLACE FUNCTION {UNACCENT_FUNCTION}(text) RETURNS text AS "
+    f"$func$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $func$ "
+    f"LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT",
+] + [
+    f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} USING gin (({expression}) gin_trgm_ops)"
+    for index_name, table, expression in APPLICANT_SEARCH_INDEXES
+]
+
+DROP_APPLICANT_SEARCH_SQL = [
+    f"DROP INDEX IF EXISTS {index_name}" for index_name, _, _ in APPLICANT_SEARCH_INDEXES
+] + [
+    f"DROP FUNCTION IF EXISTS {UNACCENT_FUNCTION}(text)",
+]
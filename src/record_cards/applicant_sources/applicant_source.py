@@ -1,7 +1,9 @@
 import logging
-from threading import Thread
+from concurrent.futures import ThreadPoolExecutor, wait
+from threading import Lock
 
 from django.conf import settings
+from django.db import close_old_connections
 from django.db.models import Q
 from django.utils.functional import cached_property
 
@@ -28,6 +30,21 @@ from record_cards.models import Applicant, Citizen, SocialEntity
 
 logger = logging.getLogger(__name__)
 
+_search_executor = None
+_search_executor_lock = Lock()
+
+
+def get_search_executor():
+    """
+    :return: Executor shared by the applicant searches, created on the first search
+    """
+    global _search_executor
+    with _search_executor_lock:
+        if _search_executor is None:
+            _search_executor = ThreadPoolExecutor(max_workers=settings.APPLICANT_SEARCH_WORKERS,
+                                                  thread_name_prefix="applicant-search")
+        return _search_executor
+
 
 class ApplicantSource:
     """
@@ -194,10 +211,8 @@ class IrisDBSource(ApplicantSource):
         )
 
     def find_by_name(self, **kwargs):
-        lookups = {f"citizen__{attr}__unaccent__ilike_contains": kwargs.get(attr)
-                   for attr in self.CITIZEN_NAME if kwargs.get(attr)}
         return self.set_origin(
-            self.get_citizen_qs().filter(**lookups)[:self.LIMIT]
+            self.get_citizen_name_qs(**kwargs)[:self.LIMIT]
         )
 
     def find_by_cif(self, id_number):
@@ -219,6 +234,14 @@ class IrisDBSource(ApplicantSource):
     def get_citizen_qs(self):
         return Applicant.objects.select_related("citizen")
 
+    def get_citizen_name_qs(self, **kwargs):
+        """
+        The names are compared unaccented through the immutable_unaccent transform, that uses their trigram indexes.
+        """
+        lookups = {f"citizen__{attr}__immutable_unaccent__ilike_contains": kwargs.get(attr)
+                   for attr in self.CITIZEN_NAME if kwargs.get(attr)}
+        return self.get_citizen_qs().filter(**lookups)
+
     def get_social_entity_qs(self):
         return Applicant.objects.select_related("social_entity")
 
@@ -237,8 +260,10 @@ class IrisSource(ApplicantSource):
     DEFAULT_SOURCES = [IrisDBSource()] + ([MibSource()] if use_mib else [])
     AVOID_SYNC = [IrisDBSource]
 
-    def __init__(self, sources=None):
+    def __init__(self, sources=None, timeout=None):
         self.sources = sources if sources else self.DEFAULT_SOURCES
+        self.timeout = timeout if timeout is not None else settings.APPLICANT_SEARCH_TIMEOUT
+        self.timed_out_sources = []
 
     def find(self, filters):
         if "dni" in filters:
@@ -274,30 +299,41 @@ class IrisSource(ApplicantSource):
 
     def concurrent_search(self, method, **kwargs):
         """
-        Performs the search over the sources in a concurrent way.
+        Performs the search over the sources in a concurrent way, on the shared executor. The sources that don't
+        answer before the timeout are skipped and kept in timed_out_sources, so the results can be partial.
         :param method:
         :param kwargs:
         :return: Applicant lists.
         """
+        futures = {get_search_executor().submit(self.find_results, source, method, **kwargs): source
+                   for source in self.sources}
+        done, not_done = wait(futures, timeout=self.timeout)
+        self.timed_out_sources = [futures[future].__class__.__name__ for future in not_done]
+        for future in not_done:
+            future.cancel()
+            logger.warning("APPLICANT SEARCH|{}|{}|TIMEOUT".format(futures[future].__class__.__name__, method))
         results = []
-        calls = []
-
-        def find_results(source, method, kwargs, results):
-            try:
-                results += getattr(source, method)(**kwargs)
-            except EmptyResults:
-                results.append([])
-            except Exception as e:
-                logger.exception(e)
-                raise e
-
-        for source in self.sources:
-            process = Thread(target=find_results, args=[source, method, kwargs, results])
-            process.start()
-            calls.append(process)
-        [process.join() for process in calls]
+        for future in done:
+            results += future.result()
         return results
 
+    @staticmethod
+    def find_results(source, method, **kwargs):
+        """
+        Runs the search of a source on a thread of the executor, that keeps its own database connection.
+        :return: Applicant list, empty if the source has failed
+        """
+        close_old_connections()
+        try:
+            return list(getattr(source, method)(**kwargs))
+        except EmptyResults:
+            return []
+        except Exception as e:
+            logger.exception(e)
+            return []
+        finally:
+            close_old_connections()
+
     def merge_applicants(self, applicants, merged=None):
         """
         :param merged: Current applicant dict
@@ -1,7 +1,7 @@
 from django.apps import AppConfig
 from django.db.models import CharField
 
-from record_cards.lookups import ILike
+from record_cards.lookups import ILike, ImmutableUnaccent
 
 
 class RecordCardsConfig(AppConfig):
@@ -12,6 +12,7 @@ class RecordCardsConfig(AppConfig):
         register_permissions()
         self.register_tasks()
         CharField.register_lookup(ILike)
+        CharField.register_lookup(ImmutableUnaccent)
 
     @staticmethod
     def register_tasks():
@@ -415,19 +415,21 @@ class ApplicantFilter(filters.FilterSet):
                                     method="filter_applicant_type")
     dni = filters.CharFilter(field_name="citizen__dni", label=_("DNI"), method="filter_upper_startwith")
     dni__exact = filters.Filter(field_name="citizen__dni", label=_("DNI"), lookup_expr="exact")
-    name = filters.Filter(field_name="citizen__name", label=_("Name"), lookup_expr="unaccent__ilike_contains")
+    name = filters.Filter(field_name="citizen__name", label=_("Name"),
+                          lookup_expr="immutable_unaccent__ilike_contains")
     first_surname = filters.Filter(field_name="citizen__first_surname", label=_("First Surname"),
-                                   lookup_expr="unaccent__ilike_contains")
+                                   lookup_expr="immutable_unaccent__ilike_contains")
     second_surname = filters.Filter(field_name="citizen__second_surname", label=_("Second Surname"),
-                                    lookup_expr="unaccent__ilike_contains")
+                                    lookup_expr="immutable_unaccent__ilike_contains")
     full_normalized_name = filters.Filter(
-        field_name="citizen__full_normalized_name", label=_("Full name"), lookup_expr="unaccent__ilike_contains"
+        field_name="citizen__full_normalized_name", label=_("Full name"),
+        lookup_expr="immutable_unaccent__ilike_contains"
     )
 
     cif = filters.CharFilter(field_name="social_entity__cif", label=_("CIF"), method="filter_upper_startwith")
     cif__exact = filters.Filter(field_name="social_entity__cif", label=_("CIF"), lookup_expr="exact")
     social_reason = filters.Filter(field_name="social_entity__social_reason", label=_("Raó social"),
-                                   lookup_expr="unaccent__ilike_contains")
+                                   lookup_expr="immutable_unaccent__ilike_contains")
     pend_anonymize = filters.BooleanFilter(field_name="pend_anonymize")
 
     class Meta:
@@ -1,6 +1,8 @@
 import re
 
-from django.db.models import Lookup
+from django.db.models import Lookup, Transform
+
+from record_cards.applicant_search import UNACCENT_FUNCTION
 
 
 class ILike(Lookup):
@@ -14,3 +16,12 @@ class ILike(Lookup):
 
     def filter_params(self, params):
         return [re.escape(p) for p in params]
+
+
+class ImmutableUnaccent(Transform):
+    """
+    Same as the unaccent transform, through an IMMUTABLE wrapper of the function that can be used in indexes
+    """
+    bilateral = True
+    lookup_name = "immutable_unaccent"
+    function = UNACCENT_FUNCTION
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from record_cards.record_actions.geocode import BatchUbicationGeocoder
+
+
+class Command(BaseCommand):
+    """
+    Command to geocode in lots the ubications without geocoder data, for instance the ones created or imported while
+    the geocoder services were down
+    """
+
+    help = "Geocode in lots the ubications without geocoder data"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lot-size", type=int, default=None, help="Ubications resolved with every request")
+
+    def handle(self, *args, **options):
+        geocoded = BatchUbicationGeocoder(lot_size=options["lot_size"]).geocode()
+        self.stdout.write(self.style.SUCCESS(f"{geocoded} ubications geocoded"))
@@ -0,0 +1,14 @@
+from django.db import migrations
+
+from record_cards.applicant_search import CREATE_APPLICANT_SEARCH_SQL, DROP_APPLICANT_SEARCH_SQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('record_cards', '0139_auto_20230911_1512'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_APPLICANT_SEARCH_SQL, DROP_APPLICANT_SEARCH_SQL),
+    ]
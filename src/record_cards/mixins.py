@@ -70,7 +70,7 @@ class RecordCardRestrictedConversationPermissionsMixin:
         """
         if user_group:
             if instance.mayorship:
-                return MAYORSHIP in user_group.group_permissions_codes or \
+                return MAYORSHIP in self.get_group_permissions_codes(user_group) or \
                        self.can_response_messages(instance, user_group)
             else:
                 can_tramit = instance.group_can_tramit_record(user_group)
@@ -78,6 +78,9 @@ class RecordCardRestrictedConversationPermissionsMixin:
         else:
             return False
 
+    def get_group_permissions_codes(self, user_group):
+        return user_group.group_permissions_codes
+
     def can_response_messages(self, instance, user_group):
         return GroupCanResponseMessages(instance, user_group).can_response_messages()
 
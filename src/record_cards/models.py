@@ -3,10 +3,12 @@ import logging
 import os
 from copy import deepcopy
 from datetime import timedelta
+from tempfile import TemporaryFile
 
 from django.contrib.auth.models import User
+from django.core.files import File
 from django.core.files.storage import default_storage
-from django.db.models import Q
+from django.db.models import Case, Q, Value, When
 from drf_chunked_upload.models import ChunkedUpload
 from drf_chunked_upload.settings import COMPLETE_EXT, INCOMPLETE_EXT
 from geopy.distance import distance
@@ -97,6 +99,8 @@ class Ubication(UserTrack):
     temp_error = models.TextField(_(u"Temp error"), blank=True)
     polygon_code = models.CharField(_("Polygon Code"), max_length=100, blank=True)
 
+    UTM_DISTANCE_MARGIN = 1.01
+
     def __str__(self):
         return self.short_address
 
@@ -125,6 +129,20 @@ class Ubication(UserTrack):
             return None
         return to_latlon(self.xetrs89a, self.yetrs89a, settings.GEO_UTM_ZONE, "T")
 
+    def etrs_bounding_box(self, meters):
+        """
+        The ETRS89 coordinates are UTM coordinates in meters, so every ubication within the distance is inside the
+        square centered on the ubication. The margin covers the scale factor of the projection, that makes the UTM
+        distances slightly differ from the geodesic ones.
+
+        :param meters: Distance from the ubication
+        :return: Ranges of xetrs89a and yetrs89a that contain the ubications within the distance
+        """
+        if not self.etrs_to_latlon:
+            return None
+        margin = meters * self.UTM_DISTANCE_MARGIN
+        return (self.xetrs89a - margin, self.xetrs89a + margin), (self.yetrs89a - margin, self.yetrs89a + margin)
+
     def distance(self, distance_ubication):
         """
         :param distance_ubication: Ubication to calculate distance
@@ -744,16 +762,24 @@ class RecordCard(UserTrack):
             return True
         return timezone.now() < self.validate_date_limit
 
-    def has_expired(self, group):
+    def has_expired(self, group, group_permissions_codes=None, days_in_ambit=None):
         """
         :param group: group to check the max reasign days outside ambit
+        :param group_permissions_codes: permissions codes of the group, if they have already been retrieved
+        :param days_in_ambit: days of the record in its ambit, if they have already been calculated
         :return: True if it is not validated and has overcome the period of reassign else False
         """
-        if RECARD_COORDINATOR_VALIDATION_DAYS in group.group_permissions_codes:
+        if self.is_validated:
+            return False
+        if group_permissions_codes is None:
+            group_permissions_codes = group.group_permissions_codes
+        if RECARD_COORDINATOR_VALIDATION_DAYS in group_permissions_codes:
             max_reasign_days_outsite_ambit = int(Parameter.get_parameter_by_key("TERMINI_VALIDACIO_COORD", 10))
         else:
             max_reasign_days_outsite_ambit = int(Parameter.get_parameter_by_key("DIES_REASSIGNACIO_FORA_AMBIT", 5))
-        return not self.is_validated and self.days_in_ambit >= max_reasign_days_outsite_ambit
+        if days_in_ambit is None:
+            days_in_ambit = self.days_in_ambit
+        return days_in_ambit >= max_reasign_days_outsite_ambit
 
     def group_can_tramit_record(self, user_group) -> bool:
         """
@@ -792,7 +818,7 @@ class RecordCard(UserTrack):
             return {"only_coordinators": True, "reason": _("The record has overcome the limit of days to response")}
         return {"only_coordinators": False}
 
-    def group_can_answer(self, user_group):
+    def group_can_answer(self, user_group, dair_group=None):
         """
         Define if a group can answer the record or not.
         - If record is not only for group ambit manage, group can answer it
@@ -801,12 +827,13 @@ class RecordCard(UserTrack):
         -  else, grop can NOT answer it
 
         :param user_group:
+        :param dair_group: DAIR group, if it has already been retrieved
         :return: True if a group can answer the record else False
         """
         if not user_group:
             return {"can_answer": False, "reason": _("User's group not detected")}
 
-        if Group.get_dair_group() == user_group:
+        if (dair_group or Group.get_dair_group()) == user_group:
             return {"can_answer": True}
         only_is_ambit = self.only_answer_ambit_coordinators()
         if not only_is_ambit["only_coordinators"] or user_group.is_ambit:
@@ -1143,6 +1170,16 @@ class RecordCard(UserTrack):
             to_date = self.created_at + timedelta(hours=self.element_detail.similarity_hours)
             records = records.filter(created_at__gte=from_date, created_at__lte=to_date)
 
+        if self.element_detail.similarity_meters:
+            # Only the records inside the bounding box can be near enough, the exact distance is checked below
+            bounding_box = self.ubication.etrs_bounding_box(self.element_detail.similarity_meters) \
+                if self.ubication else None
+            if not bounding_box:
+                return possible_similar_records
+            x_range, y_range = bounding_box
+            records = records.filter(ubication__xetrs89a__range=x_range,
+                                     ubication__yetrs89a__range=y_range).select_related("ubication")
+
         for possible_similar in records:
             if self.element_detail.similarity_meters and self.exceed_meters_proximity(possible_similar):
                 continue
@@ -1190,32 +1227,34 @@ class RecordCard(UserTrack):
 
     def set_similar_records(self):
         """
-        Register similar records from current record card
+        Register similar records from current record card.
+        The relations are written with a single bulk insert and the flags with a single update.
         :return:
         """
+        possible_similar_records = self.get_possible_similar_records()
+        # Set possible similar records alarm to True if the there's a possible similar validated
+        records_similar_pks = []
+        if self.record_state_id in RecordState.PEND_VALIDATE_STATES:
+            records_similar_pks = [possible_similar.pk for possible_similar in possible_similar_records
+                                   if possible_similar.record_state_id not in RecordState.PEND_VALIDATE_STATES]
+
+        self.possible_similar_records = bool(records_similar_pks)
+        alarm = self.possible_similar_records or RecordCardAlarms(self, self.responsible_profile).check_alarms(
+            ["possible_similar_records"])
+
         with transaction.atomic():
-            # Set possible similar records alarm to False by default and clear possible similar relations
-            self.possible_similar_records = False
-            if not RecordCardAlarms(self, self.responsible_profile).check_alarms(["possible_similar_records"]):
-                alarm = False
-            else:
-                alarm = True
-            RecordCard.objects.filter(pk=self.pk).update(possible_similar_records=False, alarm=alarm)
             self.possible_similar.clear()
-
-            possible_similar_records = self.get_possible_similar_records()
-            if possible_similar_records:
-                records_similar_pks = []
-                for possible_similar in possible_similar_records:
-                    if self.record_state_id in RecordState.PEND_VALIDATE_STATES \
-                        and possible_similar.record_state_id not in RecordState.PEND_VALIDATE_STATES:
-                        # Set possible similar records alarm to True if the there's a possible similar validated
-                        records_similar_pks.append(possible_similar.pk)
-                    self.possible_similar.add(possible_similar)
-                if records_similar_pks:
-                    records_similar_pks.append(self.pk)
-                    RecordCard.objects.filter(pk__in=records_similar_pks).update(possible_similar_records=True,
-                                                                                 alarm=True)
+            # The relation is symmetrical, so both directions have to be inserted
+            through_model = RecordCard.possible_similar.through
+            through_model.objects.bulk_create(
+                [relation for possible_similar in possible_similar_records for relation in (
+                    through_model(from_recordcard_id=self.pk, to_recordcard_id=possible_similar.pk),
+                    through_model(from_recordcard_id=possible_similar.pk, to_recordcard_id=self.pk))])
+            RecordCard.objects.filter(pk__in=[self.pk] + records_similar_pks).update(
+                possible_similar_records=Case(When(pk=self.pk, then=Value(self.possible_similar_records)),
+                                              default=Value(True), output_field=models.BooleanField()),
+                alarm=Case(When(pk=self.pk, then=Value(alarm)),
+                           default=Value(True), output_field=models.BooleanField()))
 
     def create_record_claim(self, user_id, claim_description, is_web_claim=False, set_to_internal_claim=False,
                             set_alarms=True, creation_department=None):
@@ -1682,65 +1721,101 @@ class RecordFile(UserTrack):
 
 
 class ChunkedUploadMixin:
+    """
+    The storage can not append data to an existing file, so the first chunk is saved on the upload file and every
+    following chunk is saved as a part named with its offset. The parts are joined in a single pass once the upload is
+    completed, calculating the md5 of the file at the same time.
+    """
 
     @property
     def md5(self, rehash=False):
         if getattr(self, '_md5', None) is None or rehash is True:
             md5 = hashlib.md5()
-            self.file.open(mode='rb')
-            for chunk in self.file.chunks():
-                md5.update(chunk)
-                self._md5 = md5.hexdigest()
-            self.close_file()
+            for name in self.upload_names(self.file.name):
+                with default_storage.open(name, mode='rb') as file:
+                    for chunk in file.chunks():
+                        md5.update(chunk)
+            self._md5 = md5.hexdigest()
         return self._md5
 
+    @staticmethod
+    def part_name(upload_name, offset):
+        return "{}.{}".format(upload_name, offset)
+
+    def upload_names(self, upload_name):
+        """
+        :param upload_name: Name of the file with the first chunk of the upload
+        :return: Generator of the names of the first chunk file and of the parts of the upload, in order
+        """
+        name, offset = upload_name, 0
+        while default_storage.exists(name):
+            yield name
+            offset += default_storage.size(name)
+            if offset >= self.offset:
+                return
+            name = self.part_name(upload_name, offset)
+
     @transaction.atomic
     def completed(self, completed_at=timezone.now(), ext=COMPLETE_EXT):
-        if ext != INCOMPLETE_EXT:
-            original_filename = self.file.name
-            self.file.name = os.path.splitext(self.file.name)[0] + ext
-
-            file = default_storage.open(original_filename)
-            logger.info('Saving file on real path ' + self.file.name)
-            default_storage.save(self.file.name, file)
-            logger.info('Deleting original file' + original_filename)
-            default_storage.delete(original_filename)
-        logger.info('DELETED FILE')
+        upload_name = self.file.name
+        file_name = os.path.splitext(upload_name)[0] + ext if ext != INCOMPLETE_EXT else upload_name
+        upload_names = list(self.upload_names(upload_name))
+        if file_name != upload_name or len(upload_names) > 1:
+            self.join_upload(upload_names, file_name)
         self.status = self.COMPLETE
         self.completed_at = completed_at
         self.save()
 
+    def join_upload(self, upload_names, file_name):
+        """
+        Join the upload files on the final file, reading each of them once
+
+        :param upload_names: Names of the first chunk file and of the parts of the upload
+        :param file_name: Name of the final file
+        :return:
+        """
+        md5 = hashlib.md5()
+        with TemporaryFile() as joined_file:
+            for name in upload_names:
+                with default_storage.open(name, mode='rb') as file:
+                    for chunk in file.chunks():
+                        md5.update(chunk)
+                        joined_file.write(chunk)
+            joined_file.seek(0)
+
+            if file_name in upload_names:
+                default_storage.delete(file_name)
+            logger.info('Saving file on real path ' + file_name)
+            self.file.name = default_storage.save(file_name, File(joined_file, name=file_name))
+
+        logger.info('Deleting upload parts')
+        for name in upload_names:
+            if name != self.file.name:
+                default_storage.delete(name)
+        self._md5 = md5.hexdigest()
+
     def delete_file(self):
         if self.file:
-            default_storage.delete(self.file.name)
+            for name in list(self.upload_names(self.file.name)):
+                default_storage.delete(name)
         self.file = None
 
     def append_chunk(self, chunk, chunk_size=None, save=True):
-        logger.info('READ FILE CONTENT')
-        file = default_storage.open(self.file.name, mode="rb+")
-        file_content = file.read()
-        logger.info('APPEND CHUNK')
-        for subchunk in chunk.chunks():
-            file_content += subchunk
-
-        file.seek(0)
-        file.write(file_content)
-        logger.info('DELETE OLD CHUNK')
-        default_storage.delete(self.file.name)
-        logger.info('SAVE CHUNK')
-        default_storage.save(self.file.name, file)
+        part_name = self.part_name(self.file.name, self.offset)
+        # Remove the part saved by a previous failed try of the same chunk
+        default_storage.delete(part_name)
+        logger.info('SAVE CHUNK ' + part_name)
+        part_name = default_storage.save(part_name, chunk)
 
         if chunk_size is not None:
             self.offset += chunk_size
         elif hasattr(chunk, 'size'):
             self.offset += chunk.size
         else:
-            self.offset = file.size
+            self.offset += default_storage.size(part_name)
         self._md5 = None  # Clear cached md5
         if save:
             self.save()
-        logger.info('CLOSE')
-        self.close_file()  # Flush
 
 
 class RecordChunkedFile(ChunkedUploadMixin, ChunkedUpload):
@@ -39,9 +39,16 @@ class RecordActions:
                                     UPLOAD_FILE_ACTION, ADD_MESSAGE_ACTION, ADD_CONVERSATION_ACTION, ADD_COMMENT_ACTION,
                                     CHANGE_THEME_ACTION]
 
-    def __init__(self, record_card, user, detail_mode=True) -> None:
+    def __init__(self, record_card, user, detail_mode=True, list_actions=None) -> None:
+        """
+        :param record_card: RecordCard to get the actions
+        :param user: User of the request
+        :param detail_mode: If False, only the actions shown on record lists are calculated
+        :param list_actions: Optional RecordCardListActions with the data already retrieved for the page of records
+        """
         self.record_card = record_card
         self.user = user
+        self.list_actions = list_actions
         self.require_theme_change = False
         self.detail_mode = detail_mode
         self.user_group = self.user.usergroup.group if hasattr(self.user, "usergroup") else None
@@ -339,8 +346,9 @@ class RecordActions:
         """
         # We don't pass RECARD_REASSIGN_OUTSIDE permission since it must be transparent for the user
         # So it will be applied by not offering the options, but it won't show any reason message
+        expiration_data = self.list_actions.expiration_data(self.record_card) if self.list_actions else None
         actions.update({self.REASIGN_ACTION: PossibleReassignations(
-            record_card=self.record_card).reasign_action(self.user_group)})
+            record_card=self.record_card, expiration_data=expiration_data).reasign_action(self.user_group)})
 
     def set_toogle_urgency_action(self, actions):
         """
@@ -454,7 +462,8 @@ class RecordActions:
         :param actions: dict with record actions
         :return:
         """
-        group_can_answer = self.record_card.group_can_answer(self.user_group)
+        dair_group = self.list_actions.dair_group if self.list_actions else None
+        group_can_answer = self.record_card.group_can_answer(self.user_group, dair_group=dair_group)
         if RecordCardStateMachine.answer_action in actions and not group_can_answer["can_answer"]:
             actions[RecordCardStateMachine.answer_action]["action_url"] = None
             actions[RecordCardStateMachine.answer_action]["can_perform"] = False
@@ -3,6 +3,7 @@ from abc import ABCMeta, abstractmethod
 
 from django.conf import settings
 from django.db import transaction
+from django.utils import timezone
 from django.utils.module_loading import import_string
 
 logger = logging.getLogger(__name__)
@@ -29,6 +30,47 @@ class AddressNotFoundException(Exception):
     pass
 
 
+GEOCODED_UBICATION_FIELDS = ["official_street_name", "street", "street2", "geocode_validation", "numbering_type",
+                             "neighborhood", "neighborhood_id", "coordinate_x", "coordinate_y", "statistical_sector",
+                             "letter", "district_id", "xetrs89a", "yetrs89a"]
+
+
+def get_address_number(ubication):
+    number = ubication.street2
+    if '-' in number:
+        number = number.split('-')[0]
+    return number
+
+
+def set_address_result(ubication, result):
+    """
+    Set the GEOCODED_UBICATION_FIELDS of the ubication from a validated address of the geocoder services
+    """
+    ubication.official_street_name = result.get("NOM27")
+    ubication.street = result.get("NOM_COMPLET")
+    ubication.street2 = result.get("NUMPOST_I")
+    ubication.geocode_validation = result.get("CODI_CARR")
+    ubication.numbering_type = result.get("TIPUSNUM")
+    ubication.neighborhood = result.get("BARRI_NOM")
+    ubication.neighborhood_id = result.get("BARRI")
+    ubication.coordinate_x = result.get("XNUM_POST")
+    ubication.coordinate_y = result.get("YNUM_POST")
+    ubication.statistical_sector = result.get("SECC_EST")
+    ubication.letter = result.get("LLEPOST_I")
+    ubication.district_id = result.get("DISTRICTE")
+    ubication.xetrs89a = (int(result.get("XNUM_POST")) / 1000) + 400000
+    ubication.yetrs89a = (int(result.get("YNUM_POST")) / 1000) + 4500000
+
+
+def set_extended_address_result(geo_ubication, result):
+    geo_ubication.llepost_f = result.get("LLEPOST_F")
+    geo_ubication.numpost_f = result.get("NUMPOST_F")
+    geo_ubication.dist_post = result.get("DIST_POST")
+    geo_ubication.codi_illa = result.get("CODI_ILLA")
+    geo_ubication.solar = result.get("SOLAR")
+    geo_ubication.codi_parc = result.get("CODI_PARC") if result.get("CODI_PARC") else ''
+
+
 class BaseGeocoder(metaclass=ABCMeta):
 
     def __init__(self, record_card=None, ubication=None):
@@ -120,55 +162,24 @@ class RecordCardUbicationGeocoder(BaseGeocoder):
 
         if not settings.POLYGON_GEO_BCN:
             raise AddressNotFoundException({})
-        number = self.ubication.street2
-        if '-' in number:
-            number = number.split('-')[0]
         result = self.client.adress_validation_variable(
             self.ubication.street,
-            number,
+            get_address_number(self.ubication),
             lletraIni=self.ubication.letter
         )
         if result.get("ReturnCode", 1) and result.get("Count") > 0:
             result = result.get("Data")[0]
-            coord_x = result.get("XNUM_POST")
-            coord_y = result.get("YNUM_POST")
-            xetrs89 = (int(coord_x)/1000) + 400000
-            yetrs89 = (int(coord_y)/1000) + 4500000
             with transaction.atomic():
-                self.ubication.official_street_name = result.get("NOM27")
-                self.ubication.street = result.get("NOM_COMPLET")
-                self.ubication.street2 = result.get("NUMPOST_I")
-                self.ubication.geocode_validation = result.get("CODI_CARR")
-                self.ubication.numbering_type = result.get("TIPUSNUM")
-                self.ubication.neighborhood = result.get("BARRI_NOM")
-                self.ubication.neighborhood_id = result.get("BARRI")
-                self.ubication.coordinate_x = result.get("XNUM_POST")
-                self.ubication.coordinate_y = result.get("YNUM_POST")
-                self.ubication.statistical_sector = result.get("SECC_EST")
-                self.ubication.letter = result.get("LLEPOST_I")
-                self.ubication.district_id = result.get("DISTRICTE")
-                self.ubication.xetrs89a = xetrs89
-                self.ubication.yetrs89a = yetrs89
+                set_address_result(self.ubication, result)
                 if commit:
-                    self.ubication.save(update_fields=[
-                        "updated_at", "official_street_name", "street", "street2",
-                        "geocode_validation", "numbering_type", "neighborhood",
-                        "neighborhood_id", "coordinate_x", "coordinate_y",
-                        "statistical_sector",
-                        "letter", "district_id", "xetrs89a", "yetrs89a"
-                    ])
+                    self.ubication.save(update_fields=["updated_at"] + GEOCODED_UBICATION_FIELDS)
                 try:
                     geo_ubication = self.ubication.extendedgeocodeubication
                 except Exception:
                     from record_cards.models import ExtendedGeocodeUbication
                     geo_ubication = ExtendedGeocodeUbication(ubication=self.ubication)
 
-                geo_ubication.llepost_f = result.get("LLEPOST_F")
-                geo_ubication.numpost_f = result.get("NUMPOST_F")
-                geo_ubication.dist_post = result.get("DIST_POST")
-                geo_ubication.codi_illa = result.get("CODI_ILLA")
-                geo_ubication.solar = result.get("SOLAR")
-                geo_ubication.codi_parc = result.get("CODI_PARC") if result.get("CODI_PARC") else ''
+                set_extended_address_result(geo_ubication, result)
                 if commit:
                     geo_ubication.save()
             return
@@ -307,3 +318,142 @@ class UbicationGeocoder:
 
             return
         raise AddressNotFoundException(result)
+
+
+class BatchUbicationGeocoder:
+    """
+    Geocodes the pending ubications (the ones created while the geocoder services were unavailable) in lots.
+    Every distinct address of a lot is validated once, the polygon codes of every zone are resolved with one request to
+    the lots endpoint and the results are written back with bulk operations.
+    """
+
+    def __init__(self, lot_size=None, user_id="GEOCODE"):
+        self.lot_size = lot_size or settings.GEOCODE_LOT_SIZE
+        self.user_id = user_id
+        self.client = get_geocoder_services_class()() if settings.POLYGON_GEO_BCN else None
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def pending_ubications():
+        from record_cards.models import Ubication
+        return Ubication.objects.filter(enabled=True, extendedgeocodeubication__isnull=True).exclude(
+            street="").order_by("pk")
+
+    def geocode(self, ubications=None) -> int:
+        """
+        :param ubications: Ubications to geocode, all the pending ubications by default
+        :return: Number of ubications geocoded
+        """
+        if not settings.POLYGON_GEO_BCN:
+            return 0
+        lots = self.pending_lots() if ubications is None else self.split_lots(list(ubications))
+        return sum(self.geocode_lot(lot) for lot in lots)
+
+    def pending_lots(self):
+        """
+        Read the pending ubications by lots, paginated by primary key, so only one lot is kept in memory. The
+        ubications that can't be geocoded are still pending, so every lot starts after the last ubication of the
+        previous one.
+        """
+        last_pk = 0
+        while True:
+            lot = list(self.pending_ubications().filter(pk__gt=last_pk)[:self.lot_size])
+            if not lot:
+                return
+            yield lot
+            last_pk = lot[-1].pk
+
+    def split_lots(self, ubications):
+        for start in range(0, len(ubications), self.lot_size):
+            yield ubications[start:start + self.lot_size]
+
+    def geocode_lot(self, ubications) -> int:
+        from record_cards.models import ExtendedGeocodeUbication, Ubication
+
+        addresses = {}
+        geocoded = []
+        extended_geocodes = []
+        for ubication in ubications:
+            address = (ubication.street, get_address_number(ubication), ubication.letter)
+            if address not in addresses:
+                addresses[address] = self.validate_address(*address)
+            result = addresses[address]
+            if not result:
+                continue
+            set_address_result(ubication, result)
+            ubication.updated_at = timezone.now()
+            geocoded.append(ubication)
+            geo_ubication = ExtendedGeocodeUbication(ubication=ubication, user_id=self.user_id)
+            set_extended_address_result(geo_ubication, result)
+            extended_geocodes.append(geo_ubication)
+
+        update_fields = ["updated_at"] + GEOCODED_UBICATION_FIELDS
+        if self.set_polygon_codes(geocoded):
+            update_fields.append("polygon_code")
+        with transaction.atomic():
+            Ubication.objects.bulk_update(geocoded, update_fields)
+            ExtendedGeocodeUbication.objects.bulk_create(extended_geocodes)
+        self.logger.info(f"GEOCODE | LOT | {len(geocoded)} of {len(ubications)} ubications geocoded")
+        return len(geocoded)
+
+    def validate_address(self, street, number, letter):
+        try:
+            result = self.client.adress_validation_variable(street, number, lletraIni=letter)
+        except Exception as err:
+            self.logger.info(f"GEOCODE | {street} {number} | {err}, {type(err)}")
+            return None
+        if result.get("ReturnCode", 1) and result.get("Count"):
+            return result.get("Data")[0]
+        return None
+
+    def set_polygon_codes(self, ubications) -> bool:
+        """
+        Set the polygon code of the ubications without one with a request to the lots endpoint for every zone.
+        :return: True if any polygon code has been set
+        """
+        zone_ubications = {}
+        for ubication, derivation in self.get_polygon_derivations(ubications).items():
+            zone_ubications.setdefault(derivation.zone.description, []).append((ubication, derivation))
+
+        updated = False
+        for zone, derivations in zone_ubications.items():
+            results = self.client.get_dades_xy_lots(
+                zone, [(ubication.coordinate_x, ubication.coordinate_y) for ubication, _ in derivations])
+            for (ubication, derivation), result in zip(derivations, results):
+                if not (result.get("ReturnCode", 1) and result.get("Count")):
+                    continue
+                code = result.get("Data")[0].get("CODIGO")
+                if code and derivation.district_mode:
+                    code = str(int(ubication.district_id)) if ubication.district_id else None
+                if code:
+                    ubication.polygon_code = code
+                    updated = True
+        return updated
+
+    @staticmethod
+    def get_polygon_derivations(ubications) -> dict:
+        """
+        :return: Dict with the polygon derivation of the element detail of the records of every ubication, when its
+                 polygon code is not set. Element details whose polygon derivations use more than one zone are skipped,
+                 because their code depends on the state of the record.
+        """
+        from record_cards.models import RecordCard
+        from themes.models import DerivationPolygon
+
+        pending = {ubication.pk: ubication for ubication in ubications if not ubication.polygon_code}
+        if not pending:
+            return {}
+        element_details = dict(RecordCard.objects.filter(ubication_id__in=pending).values_list(
+            "ubication_id", "element_detail_id"))
+        derivations = {}
+        zones = {}
+        for derivation in DerivationPolygon.objects.filter(
+                enabled=True, element_detail_id__in=set(element_details.values()),
+                zone__deleted__isnull=True).select_related("zone").order_by("pk"):
+            derivations.setdefault(derivation.element_detail_id, derivation)
+            zones.setdefault(derivation.element_detail_id, set()).add(derivation.zone_id)
+        return {
+            pending[ubication_id]: derivations[element_detail_id]
+            for ubication_id, element_detail_id in element_details.items()
+            if element_detail_id in derivations and len(zones[element_detail_id]) == 1
+        }
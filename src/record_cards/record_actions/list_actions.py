@@ -0,0 +1,120 @@
+from django.db.models import prefetch_related_objects
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from communications.models import Conversation, Message
+from profiles.models import Group
+from record_cards.models import RecordCardReasignation
+from record_cards.record_actions.actions import RecordActions
+from record_cards.record_actions.alarms import RecordCardAlarms
+
+
+class RecordCardListActions:
+    """
+    Class to get the actions and the alarms of a page of record cards with a fixed number of queries.
+
+    RecordActions and RecordCardAlarms retrieve the related objects, the DAIR group, the group permissions and the
+    days in ambit for every record. Here they are retrieved once for the whole page and passed to them.
+    """
+
+    related_objects = ("responsible_profile", "element_detail__element__area", "record_state", "record_type")
+
+    def __init__(self, record_cards, user, group) -> None:
+        """
+        :param record_cards: Page of record cards
+        :param user: User of the request
+        :param group: Group of the user
+        """
+        self.record_cards = list(record_cards)
+        self.user = user
+        self.group = group
+        prefetch_related_objects(self.record_cards, *self.related_objects)
+        self.dair_group = Group.get_dair_group()
+        self.group_permissions_codes = set(group.group_permissions_codes) if group else set()
+        self.days_in_ambit = self.get_days_in_ambit()
+        super().__init__()
+
+    def record_actions(self, record_card) -> dict:
+        return RecordActions(record_card, self.user, detail_mode=False, list_actions=self).actions()
+
+    def record_alarms(self, record_card) -> dict:
+        return RecordCardAlarms(record_card, self.group).alarms
+
+    def expiration_data(self, record_card) -> dict:
+        """
+        :param record_card: Record card of the page
+        :return: kwargs for RecordCard.has_expired
+        """
+        return {"group_permissions_codes": self.group_permissions_codes,
+                "days_in_ambit": self.days_in_ambit.get(record_card.pk)}
+
+    @cached_property
+    def response_messages_records(self) -> set:
+        """
+        Equivalent to GroupCanResponseMessages.can_response_messages for the page of records
+
+        :return: Set with the pks of the records with an open conversation where the group can respond a message
+        """
+        if not self.group:
+            return set()
+        conversations = Conversation.objects.filter(
+            record_card_id__in=[record_card.pk for record_card in self.record_cards], is_opened=True,
+            groups_involved=self.group)
+        # Messages are ordered by -created_at, so the first message of each conversation is the last one
+        last_messages = Message.objects.filter(conversation__in=conversations).order_by(
+            "conversation_id", "-created_at").distinct("conversation_id").values_list(
+            "conversation__record_card_id", "group_id")
+        return {record_card_id for record_card_id, group_id in last_messages if group_id != self.group.pk}
+
+    def get_days_in_ambit(self) -> dict:
+        """
+        Calculate RecordCard.days_in_ambit for the not validated records of the page, the only ones that need it.
+
+        :return: dict with the days in ambit by record card pk
+        """
+        record_cards = [record_card for record_card in self.record_cards
+                        if not record_card.is_validated and record_card.responsible_profile_id]
+        if not record_cards:
+            return {}
+
+        coordinators = self.get_ambit_coordinators({record_card.responsible_profile for record_card in record_cards})
+        ambit_entries = {}
+        reasignations = RecordCardReasignation.objects.filter(
+            record_card_id__in=[record_card.pk for record_card in record_cards]
+        ).order_by("created_at", "pk").values_list(
+            "record_card_id", "created_at", "previous_responsible_profile__group_plate",
+            "next_responsible_profile__group_plate")
+        ambit_plates = {record_card.pk: coordinators[record_card.responsible_profile_id].group_plate
+                        for record_card in record_cards}
+        for record_card_id, created_at, previous_plate, next_plate in reasignations:
+            ambit_plate = ambit_plates[record_card_id]
+            if not previous_plate.startswith(ambit_plate) and next_plate.startswith(ambit_plate):
+                ambit_entries[record_card_id] = created_at
+
+        now = timezone.now()
+        return {record_card.pk: (now - ambit_entries.get(record_card.pk, record_card.created_at)).days
+                for record_card in record_cards}
+
+    @staticmethod
+    def get_ambit_coordinators(groups) -> dict:
+        """
+        Equivalent to Group.get_ambit_coordinator for a set of groups, loading all their ancestors at once.
+        The ancestors are taken from the group plates, that hold the pks of the group branch.
+
+        :param groups: Set of groups
+        :return: dict with the ambit coordinator by group pk
+        """
+        ancestors_pks = {int(pk) for group in groups for pk in group.group_plate.split("-") if pk.isdigit()}
+        ancestors = {ancestor.pk: ancestor
+                     for ancestor in Group.objects.all_with_deleted().filter(pk__in=ancestors_pks)}
+        # A group is a coordinator if it has descendants two levels below
+        grandparents = set(Group.objects.filter(parent__parent_id__in=ancestors_pks, deleted__isnull=True).values_list(
+            "parent__parent_id", flat=True).distinct())
+
+        coordinators = {}
+        for group in groups:
+            ancestor = ancestors.get(group.pk)
+            while ancestor and ancestor.pk not in grandparents and ancestor.parent_id:
+                ancestor = ancestors.get(ancestor.parent_id)
+            coordinators[group.pk] = ancestor or group.get_ambit_coordinator()
+        return coordinators
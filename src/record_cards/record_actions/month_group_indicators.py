@@ -2,7 +2,7 @@ from calendar import monthrange
 from datetime import datetime, timedelta
 
 
-from django.db.models import OuterRef, Subquery, Avg, F, Q
+from django.db.models import OuterRef, Subquery, Avg, Count, F, Q
 from django.db.models.functions import Coalesce
 
 from iris_masters.models import RecordState
@@ -26,15 +26,21 @@ class MonthGroupIndicators:
         last_month_day = monthrange(self.year, self.month)[1]
         self.month_limit = datetime(self.year, self.month, last_month_day) + timedelta(days=1)
 
+    indicators_fields = ["entries", "pending_validation", "processing", "closed", "cancelled", "external_processing",
+                         "pending_records", "average_close_days", "average_age_days"]
+
     def register_month_indicators(self):
         """
-        Get all the no anonymous groups and calculate its indicators for the (year,month) of the class
+        Get all the no anonymous groups and calculate its indicators for the (year,month) of the class.
+        The indicators of all the groups are calculated with a single grouped query and saved in bulk.
 
         :return:
         """
-        groups = Group.objects.filter(is_anonymous=False, deleted__isnull=True)
-        for group in groups:
-            self.register_group_indicators(group)
+        groups_indicators = self.get_groups_indicators()
+        groups_pks = Group.objects.filter(is_anonymous=False, deleted__isnull=True).values_list("pk", flat=True)
+        self.save_groups_indicators({
+            group_pk: groups_indicators.get(group_pk, self.set_initial_indicators(0, 0, 0)) for group_pk in groups_pks
+        })
 
     def register_group_indicators(self, group):
         """
@@ -50,28 +56,70 @@ class MonthGroupIndicators:
         indicators_dict = self.set_indicators(records, average_close_days, average_age_days, num_entries_records)
         self.save_group_indicators(indicators_dict, group)
 
-    def get_group_records(self, group) -> list:
+    def get_records(self):
         """
-        Get the record that the group owns on the indicated (month,year)
+        Get the records that are not closed before the indicated (month,year), with the state and the group that they
+        had at the end of the month
 
-        :param group: group to get the records
-        :return: Records that the group owns on the indicated (month,year)
+        :return: Queryset of records annotated with its month state and group
         """
         month_state_histories = self.get_states_histories()
         record_reasignations = self.get_record_reasignations()
         entries_reasignations = self.get_entries_reasignations()
 
-        records = RecordCard.objects.filter(
+        return RecordCard.objects.filter(
             Q(closing_date__isnull=True) | Q(closing_date__gte=self.date_limit)).annotate(
             temp_state=Coalesce(Subquery(month_state_histories.values("next_state_id")), "record_state_id"),
             last_state_created_at=Subquery(month_state_histories.values("created_at")),
             temp_group=Coalesce(Subquery(record_reasignations.values("next_responsible_profile_id")),
                                 "responsible_profile_id"),
             entry_group=Subquery(entries_reasignations.values("next_responsible_profile_id")),
-        ).values("temp_state", "last_state_created_at", "created_at", "temp_group", "entry_group")
+        )
 
+    def get_group_records(self, group) -> list:
+        """
+        Get the record that the group owns on the indicated (month,year)
+
+        :param group: group to get the records
+        :return: Records that the group owns on the indicated (month,year)
+        """
+        records = self.get_records().values("temp_state", "last_state_created_at", "created_at", "temp_group",
+                                            "entry_group")
         return records.filter(temp_group=group.pk)
 
+    def get_groups_indicators(self) -> dict:
+        """
+        Calculate the indicators of every group that owns records on the indicated (month,year), grouping the records
+        by its month group. The results are the same as the ones of register_group_indicators for each group.
+
+        :return: dict with the indicators dict by group pk
+        """
+        processing_states = RecordState.STATES_IN_PROCESSING + RecordState.PEND_VALIDATE_STATES
+        groups_records = self.get_records().order_by().values("temp_group").annotate(
+            entries=Count("pk", filter=Q(entry_group=F("temp_group"))),
+            pending_validation=Count("pk", filter=Q(temp_state__in=RecordState.PEND_VALIDATE_STATES)),
+            processing=Count("pk", filter=Q(temp_state__in=RecordState.STATES_IN_PROCESSING)),
+            closed=Count("pk", filter=Q(temp_state=RecordState.CLOSED)),
+            cancelled=Count("pk", filter=Q(temp_state=RecordState.CANCELLED)),
+            external_processing=Count("pk", filter=Q(temp_state=RecordState.EXTERNAL_PROCESSING)),
+            close_days=Avg(F("last_state_created_at") - F("created_at"), filter=Q(temp_state=RecordState.CLOSED)),
+            age_days=Avg(self.month_limit - F("created_at"),
+                         filter=Q(temp_state__in=processing_states, last_state_created_at__isnull=False)),
+        )
+
+        groups_indicators = {}
+        for group_records in groups_records:
+            indicators_dict = self.set_initial_indicators(
+                group_records["close_days"].days if group_records["close_days"] else 0,
+                group_records["age_days"].days if group_records["age_days"] else 0,
+                group_records["entries"])
+            for indicator in ["pending_validation", "processing", "closed", "cancelled", "external_processing"]:
+                indicators_dict[indicator] = group_records[indicator]
+            indicators_dict["pending_records"] = group_records["pending_validation"] + group_records["processing"] + \
+                group_records["external_processing"]
+            groups_indicators[group_records["temp_group"]] = indicators_dict
+        return groups_indicators
+
     def get_states_histories(self):
         """
         Get the last state change of each record card
@@ -203,3 +251,26 @@ class MonthGroupIndicators:
         except MonthIndicator.DoesNotExist:
             indicators_dict.update(month_base_indicators)
             MonthIndicator.objects.create(**indicators_dict)
+
+    def save_groups_indicators(self, groups_indicators):
+        """
+        Save the indicators of the groups on the database for the indicated (month,year) pair, updating the existing
+        ones and creating the rest in bulk
+
+        :param groups_indicators: dict with the indicators dict by group pk
+        :return:
+        """
+        month_indicators = MonthIndicator.objects.filter(year=self.year, month=self.month,
+                                                         group_id__in=groups_indicators.keys())
+        update_indicators = []
+        for month_indicator in month_indicators:
+            for attribute, value in groups_indicators[month_indicator.group_id].items():
+                setattr(month_indicator, attribute, value)
+            update_indicators.append(month_indicator)
+        MonthIndicator.objects.bulk_update(update_indicators, self.indicators_fields)
+
+        updated_groups = {month_indicator.group_id for month_indicator in update_indicators}
+        MonthIndicator.objects.bulk_create([
+            MonthIndicator(group_id=group_pk, year=self.year, month=self.month, **indicators_dict)
+            for group_pk, indicators_dict in groups_indicators.items() if group_pk not in updated_groups
+        ])
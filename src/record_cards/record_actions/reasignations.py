@@ -15,13 +15,15 @@ class PossibleReassignations:
     REASIGN_COORDINATOR_ONLY = 2
     REASIGN_CONFIG_GROUPS = 3
 
-    def __init__(self, record_card, outside_ambit_permission=True) -> None:
+    def __init__(self, record_card, outside_ambit_permission=True, expiration_data=None) -> None:
         """
         :param record_card:
         :param outside_ambit_permission: Indicates if the user has permission for assigning outside its ambit
+        :param expiration_data: Optional kwargs for RecordCard.has_expired that have already been retrieved
         """
         self.record_card = record_card
         self.outside_ambit_permission = outside_ambit_permission
+        self.expiration_data = expiration_data or {}
         super().__init__()
 
     def get_reassignation_coordinator(self, reasigner_group):
@@ -128,7 +130,7 @@ class PossibleReassignations:
                     "reason": _("RecordCard {} can not be reasigned outside group's ambit after validation because "
                                 "it's theme does not allow it.").format(self.record_card.normalized_record_id)}
 
-        if self.record_card.has_expired(reasigner_group):
+        if self.record_card.has_expired(reasigner_group, **self.expiration_data):
             return {"only_ambit": True,
                     "reason": _("RecordCard {} can not be reasigned outside group's ambit because the period to do "
                                 "it has overcome. To be reasigned, the record must be cancelled by expiration"
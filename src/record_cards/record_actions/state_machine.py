@@ -1,4 +1,6 @@
-from django.urls import reverse
+from copy import deepcopy
+
+from django.urls import reverse, get_script_prefix
 from django.utils.translation import ugettext_lazy as _
 
 from iris_masters.models import RecordState, Process
@@ -33,14 +35,20 @@ class RecordCardStateMachine:
     pend_answered = "pending_answer"
     answer_action = "answer"
 
+    placeholder_pk = 918273645
+
+    # Built state machines by script prefix, with "{pk}" placeholders in its urls
+    _compiled_state_machines = {}
+
     def __init__(self, record_card=None) -> None:
         self.record_card = record_card or DummyStateMachineRecord()
         super().__init__()
 
     def reverse(self, name, pk):
-        pk = 0 if isinstance(self.record_card, DummyStateMachineRecord) else pk
-        url = reverse(name, kwargs={"pk": pk})
-        return url.replace("0", "{pk}") if pk == 0 else url
+        if isinstance(self.record_card, DummyStateMachineRecord):
+            url = reverse(name, kwargs={"pk": self.placeholder_pk})
+            return url.replace(str(self.placeholder_pk), "{pk}")
+        return reverse(name, kwargs={"pk": pk})
 
     def validate(self, is_next=False) -> dict:
         return {
@@ -151,7 +159,44 @@ class RecordCardStateMachine:
             }
         }
 
+    @classmethod
+    def get_compiled_state_machine(cls) -> dict:
+        """
+        The state machine only depends on the record card for its urls, so it's built once per process with url
+        templates and the record card pk is filled in when needed. It must not be modified.
+
+        :return: State machine with "{pk}" placeholders in its urls
+        """
+        script_prefix = get_script_prefix()
+        if script_prefix not in cls._compiled_state_machines:
+            cls._compiled_state_machines[script_prefix] = cls().build_state_machine()
+        return cls._compiled_state_machines[script_prefix]
+
     def state_machine(self) -> dict:
+        state_machine = deepcopy(self.get_compiled_state_machine())
+        if isinstance(self.record_card, DummyStateMachineRecord):
+            return state_machine
+
+        for process_states in state_machine.values():
+            for state_step in process_states.values():
+                if "transitions" in state_step:
+                    state_step["transitions"] = {state_code: self.record_transition(transition)
+                                                 for state_code, transition in state_step["transitions"].items()}
+        return state_machine
+
+    def record_transition(self, transition) -> dict:
+        """
+        :param transition: Transition from the compiled state machine
+        :return: Copy of the transition with the urls of the record card
+        """
+        transition = dict(transition)
+        url_pk = self.record_card.workflow_id if transition.get("workflow") else self.record_card.pk
+        for url_key in ("action_url", "check_url"):
+            if url_key in transition:
+                transition[url_key] = transition[url_key].replace("{pk}", str(url_pk)) if url_pk is not None else ""
+        return transition
+
+    def build_state_machine(self) -> dict:
         return {
             Process.CLOSED_DIRECTLY: {
                 RecordState.NO_PROCESSED: self.get_not_tramit_state(),
@@ -487,11 +532,13 @@ class RecordCardStateMachine:
         transitions = {}
         if not self.record_card.process_id:
             return transitions
-        current_state = self.state_machine()[self.record_card.process_id][self.record_card.record_state_id]
+        current_state = self.get_compiled_state_machine()[self.record_card.process_id][
+            self.record_card.record_state_id]
         if "transitions" not in current_state:
             return transitions
 
         for state, transition in current_state["transitions"].items():
+            transition = self.record_transition(transition)
             transitions[transition["action"]] = {
                 "action_url": transition.get("action_url"),
                 "check_url": transition.get("check_url"),
@@ -510,7 +557,7 @@ class RecordCardStateMachine:
         }
 
     def get_ideal_path(self) -> list:
-        states_steps = self.state_machine()[self.record_card.process_id]
+        states_steps = self.get_compiled_state_machine()[self.record_card.process_id]
 
         state = None
         ideal_path = []
@@ -537,10 +584,11 @@ class RecordCardStateMachine:
         return ideal_path
 
     def get_current_step(self) -> str:
-        return self.state_machine()[self.record_card.process_id][self.record_card.record_state_id]["state"]
+        return self.get_compiled_state_machine()[self.record_card.process_id][self.record_card.record_state_id][
+            "state"]
 
     def get_next_step_code(self) -> int or None:
-        states = self.state_machine()[self.record_card.process_id][self.record_card.record_state_id]
+        states = self.get_compiled_state_machine()[self.record_card.process_id][self.record_card.record_state_id]
         if "transitions" in states:
             for state_code, action in states["transitions"].items():
                 if action["is_next"]:
@@ -553,7 +601,8 @@ class RecordCardStateMachine:
         :param next_state_id: Next state of record card id
         :return:
         """
-        return self.state_machine()[self.record_card.process_id][next_state_id]["get_state_change_method"]
+        return self.get_compiled_state_machine()[self.record_card.process_id][next_state_id][
+            "get_state_change_method"]
 
     @staticmethod
     def get_plan_process_states() -> list:
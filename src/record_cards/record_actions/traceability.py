@@ -0,0 +1,104 @@
+from django.db.models import BooleanField, CharField, F, IntegerField, TextField, Value
+from django.db.models.functions import Cast
+
+from record_cards.models import Comment, RecordCardReasignation, RecordCardStateHistory, WorkflowComment
+from record_cards.serializers import RecordCardTraceabilitySerializer
+
+
+class RecordCardTraceability:
+    """
+    Traceability of a RecordCard: its state history, its comments, the comments of its workflow and its
+    reasignations, sorted from the newest to the oldest.
+
+    Every kind of trace is read as a set of the same columns, with nulls for the ones it doesn't have, and the sets are
+    joined with a single UNION query, sorted by the database. The group names are read with joins.
+    """
+
+    # Kinds of trace in the order they are sorted when they have been created at the same time, with their columns
+    TRACE_FIELDS = (
+        (RecordCardTraceabilitySerializer.TYPE_STATE, ("previous_state", "next_state", "automatic")),
+        (RecordCardTraceabilitySerializer.TYPE_REC_COMMENT, ("reason", "comment")),
+        (RecordCardTraceabilitySerializer.TYPE_WKF_COMMENT, ("task", "comment")),
+        (RecordCardTraceabilitySerializer.TYPE_REASIGN, ("previous_responsible", "next_responsible", "reason",
+                                                         "comment")),
+    )
+    OUTPUT_FIELDS = {
+        "previous_state": IntegerField(),
+        "next_state": IntegerField(),
+        "automatic": BooleanField(),
+        "reason": IntegerField(),
+        "comment": TextField(),
+        "task": CharField(),
+        "previous_responsible": CharField(),
+        "next_responsible": CharField(),
+    }
+
+    def __init__(self, record_card) -> None:
+        """
+        :param record_card: RecordCard, with its workflow_id
+        """
+        self.record_card = record_card
+        super().__init__()
+
+    def traces(self) -> list:
+        """
+        :return: List of trace dicts, with the keys of RecordCardTraceabilitySerializer that apply to their kind
+        """
+        querysets = [self.get_trace_queryset(kind_position, queryset, fields)
+                     for kind_position, queryset, fields in self.get_trace_querysets()]
+        queryset = querysets[0].union(*querysets[1:], all=True).order_by(
+            "-trace_created_at", "trace_kind", "trace_id")
+        return [self.get_trace(row) for row in queryset]
+
+    def get_trace_querysets(self):
+        """
+        :return: Tuples with the position of the kind of trace, the queryset of its traces and the expressions of
+        its columns
+        """
+        record_card_id = self.record_card.pk
+        yield 0, RecordCardStateHistory.objects.filter(record_card_id=record_card_id), {
+            "previous_state": F("previous_state_id"),
+            "next_state": F("next_state_id"),
+            "automatic": F("automatic"),
+        }
+        yield 1, Comment.objects.filter(record_card_id=record_card_id), {
+            "reason": F("reason_id"),
+            "comment": F("comment"),
+        }
+        if self.record_card.workflow_id:
+            yield 2, WorkflowComment.objects.filter(workflow_id=self.record_card.workflow_id), {
+                "task": F("task"),
+                "comment": F("comment"),
+            }
+        yield 3, RecordCardReasignation.objects.filter(record_card_id=record_card_id), {
+            "previous_responsible": F("previous_responsible_profile__description"),
+            "next_responsible": F("next_responsible_profile__description"),
+            "reason": F("reason_id"),
+            "comment": F("comment"),
+        }
+
+    def get_trace_queryset(self, kind_position, queryset, fields):
+        """
+        :return: Queryset with the values of the common trace columns, in the same order for every kind of trace
+        """
+        columns = {
+            "trace_kind": Value(kind_position, output_field=IntegerField()),
+            "trace_id": F("id"),
+            "trace_created_at": F("created_at"),
+            "trace_user_id": F("user_id"),
+            "trace_group_name": F("group__description"),
+        }
+        for field_name, output_field in self.OUTPUT_FIELDS.items():
+            columns[f"trace_{field_name}"] = fields.get(field_name, Cast(Value(None), output_field))
+        return queryset.order_by().annotate(**columns).values(*columns)
+
+    def get_trace(self, row):
+        trace_type, fields = self.TRACE_FIELDS[row["trace_kind"]]
+        trace = {
+            "type": trace_type,
+            "created_at": row["trace_created_at"],
+            "user_id": row["trace_user_id"],
+            "group_name": row["trace_group_name"],
+        }
+        trace.update({field_name: row[f"trace_{field_name}"] for field_name in fields})
+        return trace
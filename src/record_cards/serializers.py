@@ -2,6 +2,7 @@ from bs4 import BeautifulSoup
 from django.conf import settings
 from django.core.validators import RegexValidator
 from django.db import transaction
+from django.db.models import Manager
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from drf_chunked_upload.serializers import ChunkedUploadSerializer
@@ -36,6 +37,7 @@ from record_cards.permissions import (MAYORSHIP, RESP_CHANNEL_UPDATE, RESP_WORKE
                                       RECARD_REASSIGN_OUTSIDE)
 from record_cards.record_actions.actions import RecordActions
 from record_cards.record_actions.alarms import RecordCardAlarms
+from record_cards.record_actions.list_actions import RecordCardListActions
 from record_cards.record_actions.normalized_reference import set_reference
 from record_cards.record_actions.record_files import GroupManageFiles
 from record_cards.record_actions.update_fields import RecordDictUpdateFields, UpdateComment
@@ -1727,6 +1729,20 @@ class UbicationRegularSerializer(serializers.Serializer):
     district = serializers.IntegerField(source="district_id")
 
 
+class RecordCardListRegularListSerializer(GetGroupFromRequestMixin, serializers.ListSerializer):
+    """
+    Compute the actions and alarms of the whole list of records at once, with a fixed number of queries
+    """
+
+    def to_representation(self, data):
+        record_cards = list(data.all() if isinstance(data, Manager) else data)
+        request = self.context.get("request")
+        if request:
+            self.context["list_actions"] = RecordCardListActions(record_cards, request.user,
+                                                                 self.get_group_from_request(request))
+        return super().to_representation(record_cards)
+
+
 class RecordCardBaseListRegularSerializer(GetGroupFromRequestMixin, serializers.Serializer):
     id = serializers.IntegerField()
     user_id = serializers.CharField()
@@ -1748,12 +1764,18 @@ class RecordCardBaseListRegularSerializer(GetGroupFromRequestMixin, serializers.
     user_displayed = serializers.CharField()
     record_type = RecordTypeRegularSerializer()
 
+    class Meta:
+        list_serializer_class = RecordCardListRegularListSerializer
+
     @swagger_serializer_method(serializer_or_field=serializers.BooleanField)
     def get_full_detail(self, obj):
         return False
 
     @swagger_serializer_method(serializer_or_field=serializers.DictField)
     def get_actions(self, obj):
+        list_actions = self.context.get("list_actions")
+        if list_actions:
+            return list_actions.record_actions(obj)
         request = self.context.get("request")
         if request:
             return RecordActions(obj, request.user, detail_mode=False).actions()
@@ -1761,6 +1783,9 @@ class RecordCardBaseListRegularSerializer(GetGroupFromRequestMixin, serializers.
 
     @swagger_serializer_method(serializer_or_field=serializers.DictField)
     def get_alarms(self, obj):
+        list_actions = self.context.get("list_actions")
+        if list_actions:
+            return list_actions.record_alarms(obj)
         request = self.context.get("request")
         group = self.get_group_from_request(request)
         return RecordCardAlarms(obj, group).alarms
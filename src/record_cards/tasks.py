@@ -21,7 +21,7 @@ from record_cards.applicant_sources.applicant_source import IrisSource
 from record_cards.record_actions.recover_close_user_audit import RecoverCloseUserAudit
 from record_cards.record_actions.recover_theme_changed_info import RecoverThemeChangedInfo
 from record_cards.record_actions.set_record_audits import SetRecordsAudits
-from record_cards.record_actions.geocode import get_geocoder_class
+from record_cards.record_actions.geocode import BatchUbicationGeocoder, get_geocoder_class
 
 from minio import __version__
 
@@ -181,6 +181,16 @@ def geocode_ubication(ubication_pk, derivate_id=None, user_id=None, reason=None)
         logger.info(f'GEOCODE | DERIVATE | RECORD | SUCCESS {record_card.normalized_record_id}')
 
 
+@celery_app.task(queue=settings.CELERY_LOW_QUEUE_NAME, max_retries=1)
+def geocode_pending_ubications(lot_size=None):
+    """
+    Geocodes in lots the ubications that couldn't be geocoded one at a time
+    """
+    logger.info('GEOCODE | PENDING UBICATIONS | START')
+    geocoded = BatchUbicationGeocoder(lot_size=lot_size).geocode()
+    logger.info(f'GEOCODE | PENDING UBICATIONS | {geocoded} GEOCODED')
+
+
 @celery_app.task(queue=settings.CELERY_HIGH_QUEUE_NAME, max_retries=5)
 def remove_applicant_zero():
     citizen_zero_id = 0
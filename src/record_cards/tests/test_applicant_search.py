@@ -0,0 +1,138 @@
+import pytest
+from django.db import connection
+from model_mommy import mommy
+
+from record_cards.applicant_sources.applicant_source import IrisDBSource
+from record_cards.filters import ApplicantFilter, RecordCardFilter
+from record_cards.models import Applicant, Citizen, RecordCard, SocialEntity
+from record_cards.tests.utils import CreateRecordCardMixin
+
+
+# Searches by name and the positions of the applicants of given_applicants that they find
+NAME_SEARCHES = (
+    ({"name": "jose"}, [0, 1, 2]),
+    ({"name": "JOSÉ"}, [0, 1, 2]),
+    ({"name": "Josep"}, [1]),
+    ({"first_surname": "garcia"}, [0, 1, 2]),
+    ({"first_surname": "GARCÍA", "second_surname": "mart"}, [0]),
+    ({"second_surname": "Martínez"}, [0, 3]),
+    ({"full_normalized_name": "ose gar"}, [0]),
+    ({"name": "nuñez"}, []),
+    ({"name": "x.y"}, [5]),
+    ({"name": "j", "first_surname": "p"}, []),
+)
+
+# Record searches by applicant and the positions of the applicants of the records that they find
+RECORD_SEARCHES = (
+    ({"applicant_name": "jose", "applicant_name_lookup": "ilike_contains"}, [0, 1, 2]),
+    ({"applicant_name": "JOSÉ", "applicant_name_lookup": "icontains"}, [0, 1, 2]),
+    ({"applicant_name": "josep", "applicant_name_lookup": "iexact"}, [1]),
+    ({"applicant_name": "xa", "applicant_name_lookup": "istartswith"}, [4]),
+    ({"applicant_surname": "nunez", "applicant_surname_lookup": "icontains"}, [3, 4]),
+    ({"applicant_surname": "GÀRCIA", "applicant_surname_lookup": "ilike_contains"}, [0, 1, 2]),
+    ({"applicant_second_surname": "martinez", "applicant_second_surname_lookup": "ilike_contains"}, [0, 3]),
+    ({"applicant_social_reason": "associacio", "applicant_social_reason_lookup": "icontains"}, [6, 7]),
+    ({"applicant_social_reason": "VEÏNS", "applicant_social_reason_lookup": "ilike_contains"}, [6]),
+)
+
+
+def explain_with_indexes(queryset):
+    """
+    The tests tables are too small for the planner to choose an index, so the sequential and plain index scans are
+    disabled for the current transaction.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        cursor.execute("SET LOCAL enable_indexscan = off")
+    return queryset.explain()
+
+
+@pytest.mark.django_db
+class TestApplicantSearch(CreateRecordCardMixin):
+
+    @staticmethod
+    def given_applicants():
+        """
+        :return: Applicants with a citizen, followed by the ones with a social entity
+        """
+        applicants = []
+        names = (("José", "García", "Martínez"), ("JOSEP", "GARCIA", "PUIG"), ("Josefa", "Gàrcia", ""),
+                 ("Maria", "Núñez", "Martinez"), ("Xavi", "Nuñez", "Jose"), ("X.Y", "Punt", ""))
+        for name, first_surname, second_surname in names:
+            citizen = mommy.make(Citizen, user_id="test", name=name, first_surname=first_surname,
+                                 second_surname=second_surname,
+                                 full_normalized_name=f"{name} {first_surname} {second_surname}")
+            applicants.append(mommy.make(Applicant, user_id="test", citizen=citizen))
+        for social_reason in ("Associació de Veïns", "ASSOCIACIO CULTURAL", "Fundació"):
+            applicants.append(mommy.make(Applicant, user_id="test", social_entity=mommy.make(
+                SocialEntity, user_id="test", social_reason=social_reason)))
+        return applicants
+
+    def given_records(self):
+        """
+        :return: A record for every applicant of given_applicants
+        """
+        return [self.create_record_card(applicant=applicant) for applicant in self.given_applicants()]
+
+    @pytest.mark.parametrize("search,positions", NAME_SEARCHES)
+    def test_source_search(self, search, positions):
+        applicants = self.given_applicants()
+        found = IrisDBSource().get_citizen_name_qs(**search).order_by("pk")
+        assert list(found) == [applicants[position] for position in positions]
+
+    @pytest.mark.parametrize("search,positions", NAME_SEARCHES + (({"social_reason": "associacio"}, [6, 7]),
+                                                                  ({"social_reason": "VEÏNS"}, [6])))
+    def test_filter_search(self, search, positions):
+        applicants = self.given_applicants()
+        found = ApplicantFilter(search, queryset=Applicant.objects.order_by("pk")).qs
+        assert list(found) == [applicants[position] for position in positions]
+
+    @pytest.mark.parametrize("search,positions", RECORD_SEARCHES)
+    def test_record_filter_search(self, search, positions):
+        record_cards = self.given_records()
+        record_filter = RecordCardFilter(search, queryset=RecordCard.objects.order_by("pk"))
+        assert record_filter.is_valid(), record_filter.errors
+        assert list(record_filter.qs) == [record_cards[position] for position in positions]
+
+    @pytest.mark.parametrize("lookup,index_name", (
+        ("name__immutable_unaccent__ilike_contains", "record_cards_citizen_name_trgm"),
+        ("first_surname__immutable_unaccent__ilike_contains", "record_cards_citizen_first_surname_trgm"),
+        ("second_surname__immutable_unaccent__ilike_contains", "record_cards_citizen_second_surname_trgm"),
+        ("full_normalized_name__immutable_unaccent__ilike_contains", "record_cards_citizen_full_normalized_name_trgm"),
+        ("dni__icontains", "record_cards_citizen_dni_trgm"),
+    ))
+    def test_citizen_search_uses_index(self, lookup, index_name):
+        self.given_applicants()
+        assert index_name in explain_with_indexes(Citizen.objects.filter(**{lookup: "garcía"}))
+
+    @pytest.mark.parametrize("lookup,index_name", (
+        ("social_reason__immutable_unaccent__ilike_contains", "record_cards_socialentity_social_reason_trgm"),
+        ("social_reason__icontains", "record_cards_socialentity_upper_social_reason_trgm"),
+        ("cif__icontains", "record_cards_socialentity_cif_trgm"),
+    ))
+    def test_social_entity_search_uses_index(self, lookup, index_name):
+        self.given_applicants()
+        assert index_name in explain_with_indexes(SocialEntity.objects.filter(**{lookup: "associació"}))
+
+    def test_source_search_uses_index(self):
+        self.given_applicants()
+        plan = explain_with_indexes(IrisDBSource().get_citizen_name_qs(name="josep", first_surname="garcia"))
+        assert "record_cards_citizen_name_trgm" in plan or "record_cards_citizen_first_surname_trgm" in plan
+
+    @pytest.mark.parametrize("search,index_name", (
+        ({"applicant_name": "josé", "applicant_name_lookup": "ilike_contains"}, "record_cards_citizen_name_trgm"),
+        ({"applicant_name": "josé", "applicant_name_lookup": "icontains"}, "record_cards_citizen_upper_name_trgm"),
+        ({"applicant_surname": "garcía", "applicant_surname_lookup": "ilike_contains"},
+         "record_cards_citizen_first_surname_trgm"),
+        ({"applicant_surname": "garcía", "applicant_surname_lookup": "icontains"},
+         "record_cards_citizen_upper_first_surname_trgm"),
+        ({"applicant_second_surname": "martínez", "applicant_second_surname_lookup": "ilike_contains"},
+         "record_cards_citizen_second_surname_trgm"),
+        ({"applicant_social_reason": "associació", "applicant_social_reason_lookup": "ilike_contains"},
+         "record_cards_socialentity_social_reason_trgm"),
+        ({"applicant_social_reason": "associació", "applicant_social_reason_lookup": "icontains"},
+         "record_cards_socialentity_upper_unaccent_social_reason_trgm"),
+    ))
+    def test_record_filter_search_uses_index(self, search, index_name):
+        self.given_records()
+        assert index_name in explain_with_indexes(RecordCardFilter(search, queryset=RecordCard.objects.all()).qs)
@@ -0,0 +1,73 @@
+import time
+
+import pytest
+from rest_framework.test import APIRequestFactory
+
+from record_cards.applicant_sources.applicant_source import ApplicantSource, EmptyResults, IrisSource
+from record_cards.models import Applicant, Citizen
+from record_cards.views import ApplicantSearch
+
+
+class LocalSource(ApplicantSource):
+    """
+    Source that answers after a delay, with its own applicant for the searched document
+    """
+
+    def __init__(self, delay=0, error=None):
+        self.delay = delay
+        self.error = error
+
+    def find_by_nif(self, id_number):
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        name = self.__class__.__name__
+        applicant = Applicant(citizen=Citizen(dni=f"{id_number}{name}", name=name))
+        setattr(applicant, "origin", 1)
+        return [applicant]
+
+
+class SlowSource(LocalSource):
+    pass
+
+
+class TestIrisSourceConcurrentSearch:
+
+    def test_sources_searched_in_parallel(self):
+        source = IrisSource(sources=[LocalSource(delay=0.3), SlowSource(delay=0.3)], timeout=2)
+        start = time.monotonic()
+        results = source.concurrent_search("find_by_nif", id_number="00000000T")
+        assert time.monotonic() - start < 0.55
+        assert sorted(applicant.citizen.name for applicant in results) == ["LocalSource", "SlowSource"]
+        assert source.timed_out_sources == []
+
+    def test_partial_results_on_timeout(self):
+        source = IrisSource(sources=[LocalSource(), SlowSource(delay=2)], timeout=0.2)
+        start = time.monotonic()
+        results = source.concurrent_search("find_by_nif", id_number="00000000T")
+        assert time.monotonic() - start < 0.5
+        assert [applicant.citizen.name for applicant in results] == ["LocalSource"]
+        assert source.timed_out_sources == ["SlowSource"]
+
+    @pytest.mark.parametrize("error", (EmptyResults(), ValueError("MIB error")))
+    def test_failed_source(self, error):
+        source = IrisSource(sources=[LocalSource(), SlowSource(error=error)], timeout=1)
+        results = source.concurrent_search("find_by_nif", id_number="00000000T")
+        assert [applicant.citizen.name for applicant in results] == ["LocalSource"]
+        assert source.timed_out_sources == []
+
+
+@pytest.mark.django_db
+class TestApplicantSearchTimeout:
+
+    @pytest.mark.parametrize("delay,applicants,timed_out_sources", ((0, 2, None), (2, 1, "SlowSource")))
+    def test_timed_out_sources_header(self, delay, applicants, timed_out_sources):
+        view = ApplicantSearch.as_view(
+            applicant_source_class=lambda: IrisSource(sources=[LocalSource(), SlowSource(delay=delay)], timeout=0.2))
+        start = time.monotonic()
+        response = view(APIRequestFactory().get("/services/iris/api/record_cards/applicants/search/",
+                                                {"dni": "00000000T"}))
+        assert time.monotonic() - start < 1
+        assert response.status_code == 200
+        assert len(response.data) == applicants
+        assert response.get("X-Timed-Out-Sources") == timed_out_sources
@@ -0,0 +1,157 @@
+from collections import Counter
+
+import pytest
+from mock import patch
+from model_mommy import mommy
+
+from integrations.services.gcod.config import Neighborhood, Validate_Adress_var, get_dades_xy
+from iris_masters.models import District, RecordState
+from profiles.tests.utils import create_groups
+from record_cards.models import ExtendedGeocodeUbication, Ubication
+from record_cards.record_actions.geocode import BatchUbicationGeocoder, RecordCardUbicationGeocoder
+from record_cards.tests.utils import CreateRecordCardMixin
+from themes.models import DerivationPolygon, Zone
+
+XY_LOTS = "dadesxy/xylots"
+STREET_COORDINATES = {"CARRER MAJOR": 30000000, "GRAN VIA": 31000000, "DIAGONAL": 32000000}
+
+
+def polygon_code(zone, x):
+    return f"{zone}-{int(x) // 1000000}"
+
+
+class StubResponse:
+
+    def __init__(self, data, status_code=200):
+        self.data = data
+        self.status_code = status_code
+
+    def json(self):
+        return self.data
+
+
+class StubGeocodClient:
+    """
+    Local stub of the geocoder services, counting the requests by extension
+    """
+    calls = Counter()
+
+    def __init__(self, service_name, logger=None):
+        pass
+
+    def get(self, extension, params=None):
+        self.calls[Neighborhood if extension.startswith(Neighborhood) else extension] += 1
+        if extension == Validate_Adress_var:
+            coordinate_x = STREET_COORDINATES.get(params["variant"])
+            if not coordinate_x:
+                return {"ReturnCode": 0, "Count": 0, "Data": []}
+            return {"ReturnCode": 1, "Count": 1, "Data": [{
+                "NOM27": params["variant"][:27], "NOM_COMPLET": params["variant"], "NUMPOST_I": params["numIni"],
+                "CODI_CARR": "123", "TIPUSNUM": "1", "BARRI": "01", "XNUM_POST": str(coordinate_x),
+                "YNUM_POST": "80000000", "SECC_EST": "3", "LLEPOST_I": "", "DISTRICTE": "01", "LLEPOST_F": "",
+                "NUMPOST_F": "", "DIST_POST": "08001", "CODI_ILLA": "5", "SOLAR": "2", "CODI_PARC": "4"}]}
+        if extension.startswith(Neighborhood):
+            return {"ReturnCode": 1, "Count": 1, "Data": [{"DESCRIPCION": "el Raval"}]}
+        if extension == get_dades_xy:
+            return self.dades_xy(params)
+
+    def post(self, extension, json=None):
+        self.calls[extension] += 1
+        return StubResponse({"data": [self.dades_xy(position) for position in json["data"]]})
+
+    @staticmethod
+    def dades_xy(params):
+        return {"ReturnCode": 1, "Count": 1, "Data": [{"CODIGO": polygon_code(params["tipus"],
+                                                                            params["coordenadaX"])}]}
+
+
+@pytest.fixture
+def stub_geocoder(settings):
+    settings.GEOCODER_SERVICES_CLASS = "integrations.services.gcod.services.GcodServices"
+    settings.POLYGON_GEO_BCN = True
+    District.objects.get_or_create(pk=1, defaults={"name": "Ciutat Vella"})
+    StubGeocodClient.calls.clear()
+    with patch("integrations.services.gcod.services.ApiConnectClient", StubGeocodClient):
+        yield StubGeocodClient.calls
+
+
+@pytest.mark.django_db
+class TestBatchUbicationGeocoder(CreateRecordCardMixin):
+
+    @staticmethod
+    def create_ubication(street, number="10"):
+        return mommy.make(Ubication, user_id="test", street=street, street2=number, letter="", district=None)
+
+    def create_polygon_records(self, streets, district_mode=False):
+        zone = mommy.make(Zone, user_id="test", codename="ZT", description="ZONA")
+        element_detail = self.create_element_detail()
+        _, parent, _, _, _, _ = create_groups()
+        DerivationPolygon.objects.create(polygon_code="ZONA-30", zone=zone, group=parent, district_mode=district_mode,
+                                         record_state_id=RecordState.PENDING_VALIDATE, element_detail=element_detail)
+        return [self.create_record_card(ubication=self.create_ubication(street), element_detail=element_detail)
+                for street in streets]
+
+    def test_geocode_pending(self, stub_geocoder):
+        ubications = [self.create_ubication(street) for street in
+                      ("CARRER MAJOR", "CARRER MAJOR", "GRAN VIA", "CARRER MAJOR", "UNKNOWN")]
+        geocoded = self.create_ubication("DIAGONAL")
+        mommy.make(ExtendedGeocodeUbication, user_id="test", ubication=geocoded)
+        self.create_ubication("")
+
+        assert BatchUbicationGeocoder(lot_size=10).geocode() == 4
+        # Every distinct address is validated once
+        assert stub_geocoder[Validate_Adress_var] == 3
+        for ubication in ubications[:4]:
+            ubication.refresh_from_db()
+            assert ubication.district_id == 1
+            assert ubication.neighborhood == "el Raval"
+            assert ubication.xetrs89a == STREET_COORDINATES[ubication.street] / 1000 + 400000
+            assert ubication.yetrs89a == 4580000
+            assert ubication.extendedgeocodeubication.dist_post == "08001"
+        assert list(BatchUbicationGeocoder.pending_ubications()) == [ubications[4]]
+
+    def test_pending_lots(self, stub_geocoder):
+        streets = ("UNKNOWN", "CARRER MAJOR", "UNKNOWN", "UNKNOWN", "GRAN VIA", "UNKNOWN", "DIAGONAL")
+        ubications = [self.create_ubication(street) for street in streets]
+        geocoder = BatchUbicationGeocoder(lot_size=2)
+        with patch.object(geocoder, "geocode_lot", wraps=geocoder.geocode_lot) as geocode_lot:
+            assert geocoder.geocode() == 3
+        assert [call[0][0] for call in geocode_lot.call_args_list] == [
+            ubications[0:2], ubications[2:4], ubications[4:6], ubications[6:]]
+        assert list(BatchUbicationGeocoder.pending_ubications()) == [
+            ubication for ubication in ubications if ubication.street == "UNKNOWN"]
+
+    def test_polygon_codes_in_lots(self, stub_geocoder):
+        streets = ["CARRER MAJOR", "GRAN VIA", "DIAGONAL", "GRAN VIA", "CARRER MAJOR"]
+        record_cards = self.create_polygon_records(streets)
+
+        assert BatchUbicationGeocoder(lot_size=2).geocode() == len(streets)
+        assert stub_geocoder[XY_LOTS] == 3
+        assert stub_geocoder[get_dades_xy] == 0
+        for record_card in record_cards:
+            record_card.ubication.refresh_from_db()
+            geocoder = RecordCardUbicationGeocoder(ubication=record_card.ubication)
+            assert record_card.ubication.polygon_code == geocoder.get_polygon_code("ZONA")
+
+    def test_polygon_district_mode(self, stub_geocoder):
+        record_card = self.create_polygon_records(["GRAN VIA"], district_mode=True)[0]
+        BatchUbicationGeocoder().geocode()
+        record_card.ubication.refresh_from_db()
+        assert record_card.ubication.polygon_code == "1"
+
+    def test_ambiguous_zone(self, stub_geocoder):
+        record_card = self.create_polygon_records(["GRAN VIA"])[0]
+        DerivationPolygon.objects.create(
+            polygon_code="ZONA-30", zone=mommy.make(Zone, user_id="test", codename="ZO", description="OTHER"),
+            group=DerivationPolygon.objects.get().group, record_state_id=RecordState.EXTERNAL_PROCESSING,
+            element_detail=record_card.element_detail)
+        assert BatchUbicationGeocoder().geocode() == 1
+        assert stub_geocoder[XY_LOTS] == 0
+        record_card.ubication.refresh_from_db()
+        assert record_card.ubication.polygon_code == ""
+
+    def test_disabled(self, stub_geocoder, settings):
+        settings.POLYGON_GEO_BCN = False
+        self.create_ubication("CARRER MAJOR")
+        assert BatchUbicationGeocoder().geocode() == 0
+        assert not stub_geocoder
@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from main.api.pagination import RecordCardPagination
+from record_cards.models import RecordCard
+from record_cards.tests.utils import CreateRecordCardMixin
+from record_cards.views import RecordCardViewSet
+
+
+@pytest.mark.django_db
+class TestRecordCardKeysetPagination(CreateRecordCardMixin):
+
+    def given_record_cards(self, number):
+        now = timezone.now() - timedelta(days=1)
+        for index in range(number):
+            # Pairs of records created at the same time, to page through ties
+            RecordCard.objects.filter(pk=self.create_record_card().pk).update(
+                created_at=now - timedelta(minutes=index // 2))
+        return list(RecordCard.objects.order_by("-created_at", "-id").values_list("pk", flat=True))
+
+    @staticmethod
+    def paginate(params, max_count=RecordCardPagination.max_count):
+        paginator = RecordCardPagination()
+        paginator.max_count = max_count
+        request = Request(APIRequestFactory().get("/services/iris/api/record_cards/record_cards/", params))
+        page = paginator.paginate_queryset(RecordCard.objects.order_by("-created_at"), request)
+        return paginator, [record_card.pk for record_card in page], paginator.get_paginated_response([]).data
+
+    def test_gapless_pages_with_inserts(self):
+        expected_ids = self.given_record_cards(7)
+        record_card_ids = []
+        cursor = ""
+        while cursor is not None:
+            paginator, page_ids, _ = self.paginate({"cursor": cursor, "page_size": 3})
+            record_card_ids += page_ids
+            # New records are created while the list is paged
+            self.create_record_card()
+            cursor = paginator.next_cursor
+        assert record_card_ids == expected_ids
+
+    def test_next_link(self):
+        self.given_record_cards(3)
+        paginator, _, data = self.paginate({"cursor": "", "page_size": 2, "count": "true", "map": ""})
+        assert "count=" not in data["next"]
+        assert "map=" in data["next"]
+        assert f"cursor={paginator.next_cursor}" in data["next"]
+        _, _, data = self.paginate({"cursor": paginator.next_cursor, "page_size": 2})
+        assert data["next"] is None
+
+    @pytest.mark.parametrize("max_count,count,count_capped", ((10, 5, False), (5, 5, False), (3, 3, True)))
+    def test_capped_count(self, max_count, count, count_capped):
+        self.given_record_cards(5)
+        _, _, data = self.paginate({"cursor": "", "page_size": 2, "count": "true"}, max_count=max_count)
+        assert (data["count"], data["count_capped"]) == (count, count_capped)
+
+    def test_no_count(self):
+        self.given_record_cards(2)
+        _, page_ids, data = self.paginate({"cursor": "", "page_size": 2})
+        assert len(page_ids) == 2
+        assert data["count"] is None
+
+    @pytest.mark.parametrize("cursor", ("invalid", "WyIyMDIwIl0=", "WyJub3QgYSBkYXRlIiwgIjEiXQ=="))
+    def test_invalid_cursor(self, cursor):
+        self.given_record_cards(2)
+        with pytest.raises(NotFound):
+            self.paginate({"cursor": cursor})
+
+    def test_page_number_pagination(self):
+        expected_ids = self.given_record_cards(5)
+        _, page_ids, data = self.paginate({"page": 2, "page_size": 2})
+        assert sorted(page_ids) == sorted(expected_ids[2:4])
+        assert data["count"] == 5
+        assert "count_capped" not in data
+
+    def test_pagination_params_are_not_filters(self):
+        request = APIRequestFactory().get("/", {"cursor": "", "count": "true", "page_size": 3})
+        assert not RecordCardViewSet().get_filter_params(request)
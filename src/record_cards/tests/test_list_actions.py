@@ -0,0 +1,73 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from model_mommy import mommy
+
+from communications.tests.utils import load_missing_data
+from iris_masters.models import Process, RecordState
+from profiles.models import Permission, Profile, ProfilePermissions, GroupProfiles
+from profiles.tests.utils import create_groups
+from record_cards.models import RecordCard
+from record_cards.permissions import VALIDATE, CANCEL, RECARD_REASIGN
+from record_cards.record_actions.actions import RecordActions
+from record_cards.record_actions.alarms import RecordCardAlarms
+from record_cards.record_actions.list_actions import RecordCardListActions
+from record_cards.serializers import RecordCardBaseListRegularSerializer
+from record_cards.tests.utils import CreateRecordCardMixin, SetGroupRequestMixin
+
+
+@pytest.mark.django_db
+class TestRecordCardListActions(SetGroupRequestMixin, CreateRecordCardMixin):
+
+    @staticmethod
+    def set_permissions(group, permissions_codes):
+        profile = mommy.make(Profile, user_id="2222")
+        for permission in Permission.objects.filter(codename__in=permissions_codes):
+            ProfilePermissions.objects.create(permission=permission, profile=profile)
+        GroupProfiles.objects.create(group=group, profile=profile)
+
+    def given_records_page(self, records_number):
+        load_missing_data()
+        _, parent, first_soon, second_soon, _, _ = create_groups()
+        self.set_permissions(parent, [VALIDATE, CANCEL, RECARD_REASIGN])
+        group, request = self.set_group_request(group=parent)
+        responsible_profiles = [parent, first_soon, second_soon]
+        record_states = [RecordState.PENDING_VALIDATE, RecordState.IN_RESOLUTION, RecordState.CLOSED]
+        for index in range(records_number):
+            self.create_record_card(
+                responsible_profile=responsible_profiles[index % len(responsible_profiles)],
+                record_state_id=record_states[index % len(record_states)],
+                process_pk=Process.PLANING_RESOLUTION_RESPONSE, urgent=bool(index % 2))
+        return group, request
+
+    @staticmethod
+    def get_page():
+        return list(RecordCard.objects.filter(responsible_profile__isnull=False).order_by("-created_at").only(
+            "id", "user_id", "created_at", "updated_at", "process", "mayorship", "normalized_record_id", "alarm",
+            "ans_limit_date", "urgent", "user_displayed", "reassignment_not_allowed", "claims_number",
+            "pend_applicant_response", "response_time_expired", "applicant_response", "reasigned", "citizen_alarm",
+            "citizen_web_alarm", "similar_process", "cancel_request", "possible_similar_records",
+            "response_to_responsible", "pend_response_responsible", "ubication", "record_state", "record_type",
+            "element_detail", "responsible_profile", "request", "workflow"))
+
+    def test_same_actions_and_alarms(self):
+        group, request = self.given_records_page(6)
+        list_actions = RecordCardListActions(self.get_page(), request.user, group)
+        for record_card in self.get_page():
+            assert list_actions.record_actions(record_card) == RecordActions(
+                record_card, request.user, detail_mode=False).actions()
+            assert list_actions.record_alarms(record_card) == RecordCardAlarms(record_card, group).alarms
+
+    def serialize_page(self, request):
+        page = self.get_page()
+        with CaptureQueriesContext(connection) as queries:
+            RecordCardBaseListRegularSerializer(page, many=True, context={"request": request}).data
+        return len(queries)
+
+    def test_queries_do_not_grow_with_page_size(self):
+        group, request = self.given_records_page(3)
+        small_page_queries = self.serialize_page(request)
+        for _ in range(12):
+            self.create_record_card(responsible_profile=group, record_state_id=RecordState.IN_RESOLUTION,
+                                    process_pk=Process.PLANING_RESOLUTION_RESPONSE)
+        assert self.serialize_page(request) == small_page_queries
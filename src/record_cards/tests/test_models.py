@@ -1,8 +1,14 @@
+import hashlib
+import os
 from datetime import timedelta
 
 import pytest
 from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
 from django.dispatch import Signal
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from django.utils.functional import cached_property
 from mock import patch, Mock
@@ -18,7 +24,7 @@ from profiles.tests.utils import create_groups, add_extra_group_level
 from record_cards.models import (RecordCard, RecordCardFeatures, RecordCardSpecialFeatures, RecordCardBlock, Ubication,
                                  Citizen, Applicant, RecordCardStateHistory, Comment, RecordCardAudit,
                                  RecordCardReasignation, RecordCardTextResponse, RecordCardTextResponseFiles,
-                                 SocialEntity)
+                                 SocialEntity, RecordChunkedFile)
 from record_cards.permissions import RECARD_COORDINATOR_VALIDATION_DAYS, RECARD_VALIDATE_OUTAMBIT
 from record_cards.record_actions.external_validators import DummyExternalValidator, DummyExternalValidatorNotValidate
 from record_cards.tests.utils import (CreateRecordCardMixin, CreateDerivationsMixin, SetUserGroupMixin,
@@ -385,6 +391,32 @@ class TestRecordCardModel(CreateRecordCardMixin, CreateDerivationsMixin, CreateT
 
         assert len(record_card.get_possible_similar_records()) == similar_records
 
+    @pytest.mark.parametrize("similarity_meters", (50, 1000, 2500))
+    def test_get_possible_similar_records_distance(self, similarity_meters):
+        _, _, _, second_soon, _, _ = create_groups()
+        element_detail = self.create_element_detail(similarity_hours=5, similarity_meters=similarity_meters)
+        x, y = 427236.69, 4582247.42
+        ubication = Ubication.objects.create(via_type="carrer", street="test", xetrs89a=x, yetrs89a=y)
+        record_card = self.create_record_card(responsible_profile=second_soon, element_detail=element_detail,
+                                              ubication=ubication)
+        offsets = (0, 30, 49.9, 50.1, 700, 999, 1001, 1500, 2499, 2501, 4000)
+        for offset_x in offsets:
+            for offset_y in (0, offset_x / 2, offset_x):
+                near_ubication = Ubication.objects.create(via_type="carrer", street="test", xetrs89a=x + offset_x,
+                                                          yetrs89a=y - offset_y)
+                self.create_record_card(element_detail=element_detail, record_state_id=RecordState.IN_PLANING,
+                                        responsible_profile=second_soon, ubication=near_ubication)
+        self.create_record_card(element_detail=element_detail, record_state_id=RecordState.IN_PLANING,
+                                responsible_profile=second_soon)
+
+        python_similar_records = [
+            possible_similar for possible_similar in RecordCard.objects.filter(
+                responsible_profile__isnull=False, element_detail_id=element_detail.pk,
+                record_state_id__in=RecordState.OPEN_STATES).exclude(pk=record_card.pk)
+            if not record_card.exceed_meters_proximity(possible_similar)]
+        assert python_similar_records
+        assert set(record_card.get_possible_similar_records()) == set(python_similar_records)
+
     @pytest.mark.parametrize("similar_records,other_records", ((0, 0), (0, 1), (1, 0), (1, 1), (3, 3), (5, 3), (2, 10)))
     def test_set_similar_records(self, similar_records, other_records):
         _, _, _, second_soon, _, _ = create_groups()
@@ -413,6 +445,28 @@ class TestRecordCardModel(CreateRecordCardMixin, CreateDerivationsMixin, CreateT
             for similar in RecordCard.objects.filter(pk__in=similars_ids):
                 assert similar.possible_similar_records is possible_similar_records
 
+    def test_set_similar_records_queries(self):
+        _, _, _, second_soon, _, _ = create_groups()
+        element_detail = self.create_element_detail(similarity_hours=5, similarity_meters=5000)
+        ubication = Ubication.objects.create(via_type="carrer", street="test", xetrs89a=427236.69, yetrs89a=4582247.42)
+
+        def set_similar_records_queries(similar_records):
+            record_card = self.create_record_card(responsible_profile=second_soon, element_detail=element_detail,
+                                                  ubication=ubication)
+            for _ in range(similar_records):
+                self.create_record_card(element_detail=element_detail, record_state_id=RecordState.IN_PLANING,
+                                        responsible_profile=second_soon, ubication=ubication)
+            record_card = RecordCard.objects.get(pk=record_card.pk)
+            with CaptureQueriesContext(connection) as queries:
+                record_card.set_similar_records()
+            assert record_card.possible_similar.count() == RecordCard.objects.filter(
+                element_detail=element_detail).count() - 1
+            for similar in record_card.possible_similar.all():
+                assert similar.possible_similar.filter(pk=record_card.pk).exists()
+            return len(queries)
+
+        assert set_similar_records_queries(1) == set_similar_records_queries(10)
+
     @pytest.mark.parametrize("only_ambit,group_is_ambit,group_can_answer", (
             (True, True, True),
             (True, False, False),
@@ -845,3 +899,69 @@ class TestRecordCardTextResponse(CreateRecordCardMixin, CreateRecordFileMixin):
         for file in files:
             RecordCardTextResponseFiles.objects.create(text_response=record_card_text_response, record_file=file)
         assert len(record_card_text_response.enabled_record_files) == num_files
+
+
+@pytest.mark.django_db
+class TestRecordChunkedFile(CreateRecordCardMixin):
+    CHUNK_SIZE = 256 * 2 ** 10
+
+    def create_chunked_file(self, record_card, first_chunk):
+        user = User.objects.create(username="chunked")
+        return RecordChunkedFile.objects.create(record_card=record_card, user=user, filename="file.bin",
+                                                offset=len(first_chunk), file=ContentFile(first_chunk, name="file.bin"))
+
+    def upload_file(self, record_card, chunks):
+        chunked_file = self.create_chunked_file(record_card, chunks[0])
+        self.append_chunks(chunked_file, chunks[1:])
+        return chunked_file
+
+    @staticmethod
+    def append_chunks(chunked_file, chunks):
+        for chunk in chunks:
+            chunked_file.append_chunk(ContentFile(chunk), chunk_size=len(chunk))
+
+    def test_upload_chunks(self):
+        record_card = self.create_record_card()
+        chunks = [os.urandom(self.CHUNK_SIZE) for _ in range(5)] + [os.urandom(100)]
+        chunked_file = self.upload_file(record_card, chunks)
+        content = b"".join(chunks)
+        assert chunked_file.offset == len(content)
+        assert chunked_file.md5 == hashlib.md5(content).hexdigest()
+
+        upload_name = chunked_file.file.name
+        chunked_file.completed()
+        chunked_file = RecordChunkedFile.objects.get(pk=chunked_file.pk)
+        assert chunked_file.status == RecordChunkedFile.COMPLETE
+        assert chunked_file.file.name.endswith(".done")
+        with default_storage.open(chunked_file.file.name, mode="rb") as file:
+            assert file.read() == content
+        assert chunked_file.md5 == hashlib.md5(content).hexdigest()
+        assert not default_storage.exists(upload_name)
+        assert not default_storage.exists(RecordChunkedFile.part_name(upload_name, self.CHUNK_SIZE))
+
+    def test_delete_file(self):
+        record_card = self.create_record_card()
+        chunked_file = self.upload_file(record_card, [os.urandom(self.CHUNK_SIZE) for _ in range(3)])
+        upload_name = chunked_file.file.name
+        chunked_file.delete_file()
+        assert not default_storage.exists(upload_name)
+        assert not default_storage.exists(RecordChunkedFile.part_name(upload_name, self.CHUNK_SIZE))
+
+    @pytest.mark.parametrize("chunks_number", (10, 40))
+    def test_chunks_saved_once(self, chunks_number):
+        record_card = self.create_record_card()
+        chunks = [os.urandom(self.CHUNK_SIZE) for _ in range(chunks_number)]
+        saved_sizes = []
+        storage_save = default_storage.save
+
+        def save(name, content, *args, **kwargs):
+            saved_sizes.append(content.size)
+            return storage_save(name, content, *args, **kwargs)
+
+        chunked_file = self.create_chunked_file(record_card, chunks[0])
+        with patch.object(default_storage, "save", save):
+            self.append_chunks(chunked_file, chunks[1:])
+            chunked_file.completed()
+
+        # Every appended chunk is saved once and the whole file once when it is completed
+        assert sum(saved_sizes) == (2 * chunks_number - 1) * self.CHUNK_SIZE
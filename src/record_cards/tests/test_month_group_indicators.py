@@ -1,14 +1,20 @@
+from datetime import timedelta
+
 import pytest
+from django.utils import timezone
 from mock import Mock, patch
+from model_mommy import mommy
 
+from communications.tests.utils import load_missing_data
 from iris_masters.models import RecordState
 from profiles.tests.utils import create_groups, dict_groups
-from record_cards.models import MonthIndicator
+from record_cards.models import MonthIndicator, RecordCard, RecordCardStateHistory, RecordCardReasignation
 from record_cards.record_actions.month_group_indicators import MonthGroupIndicators
+from record_cards.tests.utils import CreateRecordCardMixin
 
 
 @pytest.mark.django_db
-class TestMonthGroupIndicators:
+class TestMonthGroupIndicators(CreateRecordCardMixin):
 
     def test_set_initial_indicators(self):
         average_close_days = 23
@@ -75,7 +81,8 @@ class TestMonthGroupIndicators:
                     entries = "record_cards.record_actions.month_group_indicators." \
                               "MonthGroupIndicators.calculate_entries_records"
                     with patch(entries, calculate_entries_records):
-                        MonthGroupIndicators(year, month).register_month_indicators()
+                        for _, group in groups.items():
+                            MonthGroupIndicators(year, month).register_group_indicators(group)
                         for _, group in groups.items():
                             indicator = MonthIndicator.objects.get(group=group, year=year, month=month)
                             assert indicator
@@ -112,7 +119,8 @@ class TestMonthGroupIndicators:
                     entries = "record_cards.record_actions.month_group_indicators." \
                               "MonthGroupIndicators.calculate_entries_records"
                     with patch(entries, calculate_entries_records):
-                        MonthGroupIndicators(year, month).register_month_indicators()
+                        for _, group in groups.items():
+                            MonthGroupIndicators(year, month).register_group_indicators(group)
                         for _, group in groups.items():
                             indicator = MonthIndicator.objects.get(group=group, year=year, month=month)
                             assert indicator
@@ -126,6 +134,52 @@ class TestMonthGroupIndicators:
                             assert indicator.average_age_days == average_age_days
                             assert indicator.entries == entries_records
 
+    def test_register_month_indicators_no_records(self):
+        groups = dict_groups()
+        now = timezone.now()
+        MonthGroupIndicators(now.year, now.month).register_month_indicators()
+        for _, group in groups.items():
+            indicator = MonthIndicator.objects.get(group=group, year=now.year, month=now.month)
+            for field in MonthGroupIndicators.indicators_fields:
+                assert getattr(indicator, field) == 0
+
+    def test_register_month_indicators_same_as_groups(self):
+        load_missing_data()
+        grand_parent, parent, first_soon, second_soon, noambit_parent, noambit_soon = create_groups()
+        groups = [grand_parent, parent, first_soon, second_soon, noambit_parent, noambit_soon]
+        now = timezone.now()
+        record_states = [RecordState.PENDING_VALIDATE, RecordState.IN_RESOLUTION, RecordState.CLOSED,
+                         RecordState.EXTERNAL_RETURNED, RecordState.IN_PLANING, RecordState.CANCELLED,
+                         RecordState.EXTERNAL_PROCESSING]
+        for index, record_state_id in enumerate(record_states * 3):
+            group = groups[index % len(groups)]
+            record_card = self.create_record_card(record_state_id=record_state_id, responsible_profile=group)
+            RecordCard.objects.filter(pk=record_card.pk).update(created_at=now - timedelta(days=index * 3))
+            if index % 2:
+                mommy.make(RecordCardStateHistory, user_id="test", record_card=record_card, group=group,
+                           previous_state_id=RecordState.PENDING_VALIDATE, next_state_id=record_state_id)
+            if index % 3:
+                mommy.make(RecordCardReasignation, user_id="test", record_card=record_card, group=group,
+                           previous_responsible_profile=group,
+                           next_responsible_profile=groups[(index + 1) % len(groups)])
+
+        month_indicators = MonthGroupIndicators(now.year, now.month)
+        expected_indicators = {}
+        for group in groups:
+            records = month_indicators.get_group_records(group)
+            expected_indicators[group.pk] = month_indicators.set_indicators(
+                records, month_indicators.calculate_average_close_days(records),
+                month_indicators.calculate_average_age_days(records),
+                month_indicators.calculate_entries_records(records, group))
+
+        # The second time the existing indicators are updated
+        for _ in range(2):
+            month_indicators.register_month_indicators()
+            for group in groups:
+                indicator = MonthIndicator.objects.get(group=group, year=now.year, month=now.month)
+                for field, value in expected_indicators[group.pk].items():
+                    assert getattr(indicator, field) == value
+
     @staticmethod
     def mock_records():
         record_states = [RecordState.PENDING_VALIDATE, RecordState.IN_RESOLUTION, RecordState.CLOSED,
@@ -1,4 +1,6 @@
 import pytest
+from django.urls import get_script_prefix, reverse, set_script_prefix
+from mock import patch
 
 from iris_masters.models import RecordState, Process
 from record_cards.record_actions.state_machine import RecordCardStateMachine as StateMachine
@@ -338,3 +340,55 @@ class TestStateMachine(CreateRecordCardMixin):
     def test_get_state_change_method(self, process_pk, next_state_pk, state_change_method):
         record_card = self.create_record_card(process_pk=process_pk)
         assert StateMachine(record_card).get_state_change_method(next_state_pk) == state_change_method
+
+    @pytest.mark.parametrize("process_pk,create_worflow", (
+            (Process.CLOSED_DIRECTLY, False),
+            (Process.PLANING_RESOLUTION_RESPONSE, False),
+            (Process.PLANING_RESOLUTION_RESPONSE, True),
+            (Process.RESOLUTION_EXTERNAL_PROCESSING_EMAIL, True),
+    ))
+    def test_compiled_state_machine_urls(self, process_pk, create_worflow):
+        record_card = self.create_record_card(process_pk=process_pk, create_worflow=create_worflow)
+        assert StateMachine(record_card).state_machine() == StateMachine(record_card).build_state_machine()
+
+    def test_transitions_do_not_reverse_urls(self):
+        record_card = self.create_record_card(process_pk=Process.PLANING_RESOLUTION_RESPONSE,
+                                              record_state_id=RecordState.PENDING_VALIDATE)
+        StateMachine(record_card).get_transitions()
+        with patch("record_cards.record_actions.state_machine.reverse", side_effect=reverse) as reverse_mock:
+            transitions = StateMachine(record_card).get_transitions()
+            StateMachine(record_card).get_ideal_path()
+            StateMachine(record_card).get_current_step()
+            StateMachine(record_card).get_state_change_method(RecordState.IN_PLANING)
+        assert reverse_mock.call_count == 0
+        assert transitions[StateMachine.validated]["action_url"] == reverse(
+            "private_api:record_cards:record_card_validate", kwargs={"pk": record_card.pk})
+
+    def test_state_machine_map(self):
+        state_machine = StateMachine().state_machine()
+        transition = state_machine[Process.CLOSED_DIRECTLY][RecordState.PENDING_VALIDATE]["transitions"][
+            RecordState.CLOSED]
+        assert "{pk}" in transition["action_url"]
+        state_machine[Process.CLOSED_DIRECTLY][RecordState.PENDING_VALIDATE]["description"] = "changed"
+        assert "description" not in StateMachine.get_compiled_state_machine()[Process.CLOSED_DIRECTLY][
+            RecordState.PENDING_VALIDATE]
+
+    def test_built_once_per_script_prefix(self):
+        record_card = self.create_record_card(process_pk=Process.PLANING_RESOLUTION_RESPONSE,
+                                              record_state_id=RecordState.IN_PLANING, create_worflow=True)
+        script_prefix = get_script_prefix()
+        with patch.dict(StateMachine._compiled_state_machines, clear=True), patch.object(
+                StateMachine, "build_state_machine", autospec=True,
+                side_effect=StateMachine.build_state_machine) as build_mock:
+            try:
+                for _ in range(30):
+                    StateMachine(record_card).get_transitions()
+                    StateMachine(record_card).get_current_step()
+                assert build_mock.call_count == 1
+
+                set_script_prefix("/other/")
+                for _ in range(30):
+                    StateMachine(record_card).get_transitions()
+                assert build_mock.call_count == 2
+            finally:
+                set_script_prefix(script_prefix)
@@ -0,0 +1,125 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from model_mommy import mommy
+
+from iris_masters.models import Reason, RecordState
+from profiles.models import Group
+from record_cards.models import Comment, RecordCardReasignation, RecordCardStateHistory, Workflow, WorkflowComment
+from record_cards.record_actions.traceability import RecordCardTraceability
+from record_cards.serializers import RecordCardTraceabilitySerializer
+from record_cards.tests.utils import CreateRecordCardMixin
+
+
+class LegacyRecordCardTraceability:
+    """
+    Previous implementation of the traceability, with a query for every kind of trace and its groups
+    """
+
+    def __init__(self, record_card):
+        self.record_card = record_card
+
+    def traces(self):
+        traces = []
+        for state_history in self.record_card.recordcardstatehistory_set.all():
+            trace = self.basic_trace(state_history, RecordCardTraceabilitySerializer.TYPE_STATE)
+            trace.update({"previous_state": state_history.previous_state_id,
+                          "next_state": state_history.next_state_id, "automatic": state_history.automatic})
+            traces.append(trace)
+        for comment in self.record_card.comments.all():
+            trace = self.basic_trace(comment, RecordCardTraceabilitySerializer.TYPE_REC_COMMENT)
+            trace.update({"reason": comment.reason_id if comment.reason else None, "comment": comment.comment})
+            traces.append(trace)
+        if self.record_card.workflow:
+            for workflow_comment in self.record_card.workflow.workflowcomment_set.all():
+                trace = self.basic_trace(workflow_comment, RecordCardTraceabilitySerializer.TYPE_WKF_COMMENT)
+                trace.update({"task": workflow_comment.task, "comment": workflow_comment.comment})
+                traces.append(trace)
+        for reasignation in self.record_card.recordcardreasignation_set.all():
+            trace = self.basic_trace(reasignation, RecordCardTraceabilitySerializer.TYPE_REASIGN)
+            trace.update({"previous_responsible": reasignation.previous_responsible_profile.description,
+                          "next_responsible": reasignation.next_responsible_profile.description,
+                          "reason": reasignation.reason_id, "comment": reasignation.comment})
+            traces.append(trace)
+        traces.sort(key=lambda trace_item: trace_item["created_at"], reverse=True)
+        return traces
+
+    @staticmethod
+    def basic_trace(instance, trace_type):
+        return {
+            "type": trace_type,
+            "created_at": instance.created_at,
+            "user_id": instance.user_id,
+            "group_name": instance.group.description if hasattr(instance, "group") and instance.group else None
+        }
+
+
+@pytest.mark.django_db
+class TestRecordCardTraceability(CreateRecordCardMixin):
+
+    def given_record_card(self, events_number, workflow=True):
+        """
+        :return: Record card with events_number traces of every kind. The traces of each kind are created at
+        different times, that are shared with the other kinds.
+        """
+        record_card = self.create_record_card()
+        if workflow:
+            record_card.workflow = Workflow.objects.create(main_record_card=record_card,
+                                                           state_id=RecordState.IN_PLANING)
+            record_card.save()
+        groups = [mommy.make(Group, user_id="2222", profile_ctrl_user_id=f"TRC{index}", description=f"Group {index}")
+                  for index in range(3)]
+        RecordCardStateHistory.objects.bulk_create([
+            RecordCardStateHistory(record_card=record_card, user_id=f"user{index}", group=groups[index % 3],
+                                   previous_state_id=RecordState.PENDING_VALIDATE,
+                                   next_state_id=RecordState.IN_PLANING, automatic=bool(index % 2))
+            for index in range(events_number)])
+        Comment.objects.bulk_create([
+            Comment(record_card=record_card, user_id=f"user{index}", group=groups[index % 3] if index % 2 else None,
+                    reason_id=Reason.RECORDCARD_BLOCK_CHANGE if index % 3 else None, comment=f"Comment {index}")
+            for index in range(events_number)])
+        if workflow:
+            WorkflowComment.objects.bulk_create([
+                WorkflowComment(workflow=record_card.workflow, user_id=f"user{index}", group=groups[index % 3],
+                                task=WorkflowComment.PLAN, comment=f"Workflow comment {index}")
+                for index in range(events_number)])
+        RecordCardReasignation.objects.bulk_create([
+            RecordCardReasignation(record_card=record_card, user_id=f"user{index}", group=groups[index % 3],
+                                   previous_responsible_profile=groups[index % 2],
+                                   next_responsible_profile=groups[2], reason_id=Reason.CITIZEN_RESPONSE,
+                                   comment=f"Reasignation {index}")
+            for index in range(events_number)])
+        now = timezone.now()
+        for model in (RecordCardStateHistory, Comment, WorkflowComment, RecordCardReasignation):
+            for position, pk in enumerate(model.objects.order_by("pk").values_list("pk", flat=True)):
+                model.objects.filter(pk=pk).update(created_at=now - timedelta(minutes=position * 7 % 1009))
+        return record_card
+
+    @staticmethod
+    def serialize(traces):
+        return RecordCardTraceabilitySerializer(traces, many=True).data
+
+    @pytest.mark.parametrize("workflow", (True, False))
+    def test_same_traces_as_legacy(self, workflow):
+        record_card = self.given_record_card(60, workflow=workflow)
+        traces = RecordCardTraceability(record_card).traces()
+        legacy_traces = LegacyRecordCardTraceability(record_card).traces()
+        assert len(traces) == len(legacy_traces)
+        assert self.serialize(traces) == self.serialize(legacy_traces)
+
+    def test_no_traces(self):
+        record_card = self.create_record_card()
+        RecordCardStateHistory.objects.filter(record_card=record_card).delete()
+        assert RecordCardTraceability(record_card).traces() == []
+
+    @pytest.mark.parametrize("events_number", (1, 100, 250))
+    def test_single_query(self, events_number):
+        record_card = self.given_record_card(events_number)
+        with CaptureQueriesContext(connection) as queries:
+            traces = RecordCardTraceability(record_card).traces()
+            self.serialize(traces)
+        assert len(queries) == 1
+        assert len(traces) >= events_number * 4
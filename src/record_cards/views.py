@@ -64,11 +64,12 @@ from record_cards.permissions import RECARD_ANSWER_NO_LETTER, RECARD_ANSWER_NOSE
 from record_cards.record_actions.claim_validate import ClaimValidation
 from record_cards.record_actions.exceptions import RecordClaimException
 from record_cards.record_actions.external_validators import get_external_validator
-
+from record_cards.record_actions.list_actions import RecordCardListActions
 from record_cards.record_actions.reasignations import PossibleReassignations
 from record_cards.record_actions.record_files import GroupManageFiles
 from record_cards.record_actions.record_set_possible_similar import RecordCardSetPossibleSimilar
 from record_cards.record_actions.state_machine import RecordCardStateMachine
+from record_cards.record_actions.traceability import RecordCardTraceability
 from record_cards.schemas import post_record_card_schema_factory
 from record_cards.serializers import (
     ApplicantResponseSerializer, ApplicantSerializer, CitizenSerializer, CommentSerializer, RecordCardCancelSerializer,
@@ -183,6 +184,8 @@ class SocialEntityViewSet(ApplicantPermissionsMixin, BasicMasterViewSet):
 class ApplicantSearch(APIView):
     """
     Finds applicants in different sources. Currently, they are found in IRIS2 and MIB database.
+    When a source doesn't answer in time, the results of the other sources are returned and the late sources are
+    listed in the X-Timed-Out-Sources header.
     """
     serializer_class = ApplicantRegularSerializer
     applicant_source_class = IrisSource
@@ -212,7 +215,11 @@ class ApplicantSearch(APIView):
         return self.serializer_class(instance=applicants, many=True)
 
     def get_response(self, ser):
-        return Response(ser.data, status=status.HTTP_200_OK)
+        headers = {}
+        timed_out_sources = getattr(self.applicant_source, "timed_out_sources", None)
+        if timed_out_sources:
+            headers["X-Timed-Out-Sources"] = ",".join(timed_out_sources)
+        return Response(ser.data, status=status.HTTP_200_OK, headers=headers)
 
     @cached_property
     def applicant_source(self):
@@ -467,6 +474,8 @@ class RecordCardViewSet(RecordCardExcelExportListMixin, RecordCardListOrderingMi
      - can be ordered by urgent, normalized_record_id, record type, record state, created_at, ANS limit date,
      area description, element description, theme description, ubication street or district and responsible profile
      - can be filtered by multiple parameters, for example: urgent, input_channel, support, applicant fields, etc
+     - can be paginated by keyset sending the cursor parameter (empty for the first page), always ordered by creation.
+     The total count is only included when the count parameter is sent, and it's capped.
 
     When a RecordCard is retrieved, the user that has request it is updated as the user displayed.
     The lookup used on the detail retrieve is the normalized_record_id field.
@@ -501,6 +510,7 @@ class RecordCardViewSet(RecordCardExcelExportListMixin, RecordCardListOrderingMi
     lookup_url_kwarg = "reference"
     pagination_class = RecordCardPagination
     filename = "records.xlsx"
+    list_actions = None
 
     def list(self, request, *args, **kwargs):
         filter_params = self.get_filter_params(request)
@@ -521,6 +531,8 @@ class RecordCardViewSet(RecordCardExcelExportListMixin, RecordCardListOrderingMi
         filter_params = request.GET.copy()
         filter_params.pop("page", None)
         filter_params.pop("page_size", None)
+        filter_params.pop(RecordCardPagination.cursor_query_param, None)
+        filter_params.pop(RecordCardPagination.count_query_param, None)
         return filter_params
 
     def get_queryset(self):
@@ -550,9 +562,27 @@ class RecordCardViewSet(RecordCardExcelExportListMixin, RecordCardListOrderingMi
                 Prefetch("recordfile_set", queryset=RecordFile.objects.all()))
         return queryset
 
+    def get_list_serialized_data(self, user_group, items):
+        if not issubclass(self.get_serializer_class(), RecordCardBaseListRegularSerializer):
+            return super().get_list_serialized_data(user_group, items)
+        self.list_actions = RecordCardListActions(items, self.request.user, user_group)
+        return super().get_list_serialized_data(user_group, self.list_actions.record_cards)
+
+    def get_group_permissions_codes(self, user_group):
+        if self.list_actions:
+            return self.list_actions.group_permissions_codes
+        return super().get_group_permissions_codes(user_group)
+
+    def can_response_messages(self, instance, user_group):
+        if self.list_actions:
+            return instance.pk in self.list_actions.response_messages_records
+        return super().can_response_messages(instance, user_group)
+
     def get_serializer_context(self):
         context = super().get_serializer_context()
         self.set_element_detail_context(context)
+        if self.list_actions:
+            context["list_actions"] = self.list_actions
         return context
 
     def set_element_detail_context(self, context):
@@ -1180,7 +1210,8 @@ class CalculateMonthIndicatorsView(APIView):
 class RecordCardTraceabilityView(RecordCardGetBaseView):
     """
     Endpoint to retrieve the traceability of a RecordCard, retrieving the record card state history, the record
-    comments, the workflow comments and the reasignations.
+    comments, the workflow comments and the reasignations. They are read with a single query, see
+    RecordCardTraceability.
     """
 
     serializer_class = RecordCardTraceabilitySerializer
@@ -1188,95 +1219,8 @@ class RecordCardTraceabilityView(RecordCardGetBaseView):
     record_card = None
 
     def get_response_objects(self):
-
-        self.record_card = get_object_or_404(RecordCard.objects.select_related("workflow").only("id", "workflow__id"),
-                                             pk=self.kwargs["pk"])
-        traces = []
-
-        self.set_recordcard_state_history(traces)
-        self.set_recordcard_comments(traces)
-        if self.record_card.workflow:
-            self.set_recordcard_workflow_comments(traces)
-        self.set_recordcard_reasignations(traces)
-
-        traces.sort(key=lambda trace_item: trace_item["created_at"], reverse=True)
-        return traces
-
-    def set_recordcard_state_history(self, traces):
-        """
-        Set RecordCard state changes to traces list
-        :param traces: trace list to set the records
-        :return:
-        """
-        for state_history in self.record_card.recordcardstatehistory_set.all():
-            trace = self.set_basic_trace_info(state_history, RecordCardTraceabilitySerializer.TYPE_STATE)
-            trace.update({
-                "previous_state": state_history.previous_state_id,
-                "next_state": state_history.next_state_id,
-                "automatic": state_history.automatic
-            })
-            traces.append(trace)
-
-    def set_recordcard_comments(self, traces):
-        """
-        Set RecordCard comments to traces list
-        :param traces: trace list to set the records
-        :return:
-        """
-        for comment in self.record_card.comments.all():
-            trace = self.set_basic_trace_info(comment, RecordCardTraceabilitySerializer.TYPE_REC_COMMENT)
-            trace.update({
-                "reason": comment.reason_id if comment.reason else None,
-                "comment": comment.comment
-            })
-
-            traces.append(trace)
-
-    def set_recordcard_workflow_comments(self, traces):
-        """
-        Set RecordCard comments to traces list
-        :param traces: trace list to set the records
-        :return:
-        """
-        for workflow_comment in self.record_card.workflow.workflowcomment_set.all():
-            trace = self.set_basic_trace_info(workflow_comment, RecordCardTraceabilitySerializer.TYPE_WKF_COMMENT)
-            trace.update({
-                "task": workflow_comment.task,
-                "comment": workflow_comment.comment
-
-            })
-            traces.append(trace)
-
-    def set_recordcard_reasignations(self, traces):
-        """
-        Set RecordCard reasignations to traces list
-        :param traces: trace list to set the records
-        :return:
-        """
-        for reasignation in self.record_card.recordcardreasignation_set.all():
-            trace = self.set_basic_trace_info(reasignation, RecordCardTraceabilitySerializer.TYPE_REASIGN)
-            trace.update({
-                "previous_responsible": reasignation.previous_responsible_profile.description,
-                "next_responsible": reasignation.next_responsible_profile.description,
-                "reason": reasignation.reason_id,
-                "comment": reasignation.comment
-            })
-            traces.append(trace)
-
-    @staticmethod
-    def set_basic_trace_info(instance, trace_type):
-        """
-        Methond to set the basic info of a trace
-        :param instance: Instance trace
-        :param trace_type: Type of trace
-        :return:
-        """
-        return {
-            "type": trace_type,
-            "created_at": instance.created_at,
-            "user_id": instance.user_id,
-            "group_name": instance.group.description if hasattr(instance, "group") and instance.group else None
-        }
+        self.record_card = get_object_or_404(RecordCard.objects.only("id", "workflow"), pk=self.kwargs["pk"])
+        return RecordCardTraceability(self.record_card).traces()
 
 
 @method_decorator(name="get", decorator=swagger_auto_schema(
@@ -1,15 +1,19 @@
 import uuid
 from collections import OrderedDict
+from datetime import timedelta
 
 from django.conf import settings
 from django.core.cache import cache
 from django.db.models import Prefetch
+from django.utils import timezone
 
 from themes.models import ElementDetail, Keyword, ApplicationElementDetail, Area, Element
 
 
 class ThemeTreeBuilder:
     DEFAULT_CACHE_VERSION = 5
+    # Seconds subtracted from the last build time when looking for changes, to cover concurrent transactions
+    UPDATE_MARGIN = 60
 
     def __init__(self, cache_version=None):
         self.cache_version = cache_version or self.DEFAULT_CACHE_VERSION
@@ -21,6 +25,7 @@ class ThemeTreeBuilder:
     def build(self, force=False):
         self.response = cache.get("themes_tree", None, version=self.cache_version)
         if not self.response or force:
+            built_at = timezone.now()
             self.response = OrderedDict()
             element_details = self.get_active_element_details()
             element_areas = {}
@@ -36,35 +41,57 @@ class ThemeTreeBuilder:
 
             for detail in element_details:
                 area_pk = element_areas[detail.element_id]
-                element_pk = detail.element_id
-
-                if detail.pk not in self.response[area_pk]["elements"][element_pk]["details"]:
-                    self.response[area_pk]["elements"][element_pk]["details"][detail.pk] = {
-                        'description': detail.description,
-                        ** {'description_' + language: getattr(detail, 'description_' + language)
-                            for language, name in settings.LANGUAGES},
-                        'record_type_id': detail.record_type_id,
-                        'active': detail.active,
-                        'order': detail.order,
-                        'activation_date': detail.activation_date,
-                        'visible': detail.visible,
-                        'visible_date': detail.visible_date,
-                        'detail_code': detail.detail_code,
-                    }
-
-                detail_pk = detail.pk
-                self.set_detail_keywords(area_pk, element_pk, detail_pk, detail)
-                self.set_detail_applications(area_pk, element_pk, detail_pk, detail)
-            cache.set("themes_tree", self.response, version=self.cache_version, timeout=None)
-            cache.set("themes_tree_mark", str(uuid.uuid4()), version=self.cache_version, timeout=None)
+                if detail.pk not in self.response[area_pk]["elements"][detail.element_id]["details"]:
+                    self.set_detail(area_pk, detail.element_id, detail)
+            self.save_cache(built_at)
         return self.response
 
+    def update(self):
+        """
+        Patch the cached tree with the element details changed since it was built. The whole tree is rebuilt if it's
+        not cached or any area or element has changed.
+        """
+        self.response = cache.get("themes_tree", None, version=self.cache_version)
+        last_built_at = cache.get("themes_tree_built_at", None, version=self.cache_version)
+        if not self.response or not last_built_at:
+            return self.build(force=True)
+
+        built_at = timezone.now()
+        changed_since = last_built_at - timedelta(seconds=self.UPDATE_MARGIN)
+        if Area.objects.all_with_deleted().filter(updated_at__gte=changed_since).exists() or \
+                Element.objects.all_with_deleted().filter(updated_at__gte=changed_since).exists():
+            return self.build(force=True)
+
+        changed_pks = set(ElementDetail.objects.all_with_deleted().filter(
+            updated_at__gte=changed_since).values_list("pk", flat=True))
+        element_areas = {}
+        for area_pk, area in self.response.items():
+            for element_pk, element in area["elements"].items():
+                element_areas[element_pk] = area_pk
+                for detail_pk in changed_pks.intersection(element["details"]):
+                    del element["details"][detail_pk]
+
+        for detail in self.get_active_element_details().filter(pk__in=changed_pks):
+            if detail.element_id not in element_areas:
+                return self.build(force=True)
+            element = self.response[element_areas[detail.element_id]]["elements"][detail.element_id]
+            self.set_detail(element_areas[detail.element_id], detail.element_id, detail)
+            element["details"] = OrderedDict(sorted(element["details"].items(), key=lambda item: item[1]["order"]))
+        self.save_cache(built_at)
+        return self.response
+
+    def save_cache(self, built_at):
+        cache.set("themes_tree", self.response, version=self.cache_version, timeout=None)
+        cache.set("themes_tree_built_at", built_at, version=self.cache_version, timeout=None)
+        cache.set("themes_tree_mark", str(uuid.uuid4()), version=self.cache_version, timeout=None)
+
     def get_cache_mark(self):
         return cache.get("themes_tree_mark", None, version=self.cache_version)
 
     def clear_cache(self):
         cache.set("themes_tree", "", timeout=0, version=self.cache_version)
         cache.set("themes_tree_mark", "", timeout=0, version=self.cache_version)
+        cache.set("themes_tree_built_at", "", timeout=0, version=self.cache_version)
 
     @staticmethod
     def get_active_element_details():
@@ -73,7 +100,7 @@ class ThemeTreeBuilder:
         ).prefetch_related(
             Prefetch("keyword_set", queryset=Keyword.objects.filter(enabled=True)),
             Prefetch("applicationelementdetail_set", queryset=ApplicationElementDetail.objects.filter(enabled=True))
-        ).only("id", "order", "description", "record_type_id", "active", "activation_date",
+        ).only("id", "element_id", "order", "description", "record_type_id", "active", "activation_date",
                "visible", "visible_date", "detail_code")
 
     def set_default_area(self, area_pk, area_description, area_order):
@@ -90,6 +117,22 @@ class ThemeTreeBuilder:
             "details": OrderedDict()
         }
 
+    def set_detail(self, area_pk, element_pk, detail):
+        self.response[area_pk]["elements"][element_pk]["details"][detail.pk] = {
+            'description': detail.description,
+            ** {'description_' + language: getattr(detail, 'description_' + language)
+                for language, name in settings.LANGUAGES},
+            'record_type_id': detail.record_type_id,
+            'active': detail.active,
+            'order': detail.order,
+            'activation_date': detail.activation_date,
+            'visible': detail.visible,
+            'visible_date': detail.visible_date,
+            'detail_code': detail.detail_code,
+        }
+        self.set_detail_keywords(area_pk, element_pk, detail.pk, detail)
+        self.set_detail_applications(area_pk, element_pk, detail.pk, detail)
+
     def set_detail_attribute(self, area_pk, element_pk, detail_pk, detail, attribute_key, has_translations=False):
         self.response[area_pk]["elements"][element_pk]["details"][detail_pk][attribute_key] = getattr(
             detail, attribute_key)
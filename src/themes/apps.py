@@ -8,6 +8,9 @@ class ThemesConfig(AppConfig):
 
     def ready(self):
         self.register_tasks()
+        # Data migrations write themes through historical models, that don't invalidate the cache
+        from themes.caches import keywords_index_cache
+        post_migrate.connect(keywords_index_cache.invalidate, sender=self, weak=False)
         if settings.EXECUTE_DATA_CHEKS:
             from themes.data_checks.zones import check_zones
             from themes.data_checks.survey import check_survey
@@ -0,0 +1,64 @@
+import unicodedata
+
+from modeltranslation.utils import get_language
+
+from main.caches import VersionedCache
+
+
+def normalize_search_text(text):
+    """
+    :return: Upper case text without diacritics, the form in which the theme search compares words
+    """
+    return "".join(char for char in unicodedata.normalize("NFD", text) if not unicodedata.combining(char)).upper()
+
+
+class KeywordsIndexCache(VersionedCache):
+    """
+    Normalized index of the enabled keywords and the element descriptions by language of the enabled element details,
+    used by the theme search so citizen searches don't scan the themes tables.
+    """
+    cache_key = "themes:keywords_index"
+
+    def load_data(self):
+        from django.conf import settings
+        from themes.models import Element, ElementDetail, Keyword
+
+        keywords = {}
+        for description, detail_id in Keyword.objects.filter(enabled=True).order_by("pk").values_list(
+                "description", "detail_id"):
+            keywords.setdefault(normalize_search_text(description), []).append(detail_id)
+
+        languages = [language for language, _ in settings.LANGUAGES]
+        elements = {language: {} for language in languages}
+        for element in Element.objects.filter(**Element.ENABLED_ELEMENT_FILTERS).values_list(
+                "pk", *[f"description_{language}" for language in languages]):
+            for language, description in zip(languages, element[1:]):
+                if description:
+                    elements[language][element[0]] = normalize_search_text(description)
+        return {
+            "keywords": keywords,
+            "elements": elements,
+            "details": list(ElementDetail.objects.filter(**ElementDetail.ENABLED_ELEMENTDETAIL_FILTERS).values_list(
+                "element_id", "id")),
+        }
+
+    def get_keyword_details(self, keyword_text):
+        """
+        :return: Ids of the details with a keyword equal to the given text, ignoring case and accents
+        """
+        return self.get_data()["keywords"].get(normalize_search_text(keyword_text), [])
+
+    def get_element_description_details(self, text):
+        """
+        :return: Ids of the enabled details of the elements whose description in the active language contains the
+                 given text, ignoring case and accents. As in the queries translated by modeltranslation, the
+                 default language is used when the active one is not available.
+        """
+        data = self.get_data()
+        text = normalize_search_text(text)
+        elements = {element_id for element_id, description in data["elements"][get_language()].items()
+                    if text in description}
+        return [detail_id for element_id, detail_id in data["details"] if element_id in elements]
+
+
+keywords_index_cache = KeywordsIndexCache()
@@ -1,5 +1,8 @@
 from django.db import models
 
+from main.caches import VersionedCacheQuerySetMixin
+from themes.caches import keywords_index_cache
+
 
 class ElementDetailFeatureManager(models.Manager):
 
@@ -55,3 +58,7 @@ class ApplicationElementDetailManager(models.Manager):
     def get_areapks_byapp(self, application):
         return self.filter(**self.set_params(application)).select_related("detail", "detail__element").values_list(
             "detail__element__area_id", flat=True).distinct()
+
+
+class KeywordQuerySet(VersionedCacheQuerySetMixin, models.QuerySet):
+    versioned_cache = keywords_index_cache
@@ -18,8 +18,9 @@ from ordered_model.models import OrderedModelBase
 
 from custom_safedelete.models import CustomSafeDeleteModel
 from profiles.models import Group
-from themes.managers import ElementDetailFeatureManager, ApplicationElementDetailManager
-from themes.tasks import rebuild_theme_tree
+from themes.caches import keywords_index_cache
+from themes.managers import ElementDetailFeatureManager, ApplicationElementDetailManager, KeywordQuerySet
+from themes.tasks import delay_theme_tree_update
 
 DESCRIPTIONS_MAX_LENGTH = 80
 
@@ -73,7 +74,8 @@ class Area(CaseInsensitiveUniqueMixin, CustomSafeDeleteModel, OrderedModelBase,
             self.set_code()
         super().save(force_insert=force_insert, force_update=force_update, using=using, update_fields=update_fields,
                      keep_deleted=keep_deleted)
-        rebuild_theme_tree.delay()
+        delay_theme_tree_update()
+        keywords_index_cache.invalidate_on_commit()
 
     def __str__(self):
         return self.description
@@ -127,7 +129,8 @@ class Element(CaseInsensitiveUniqueMixin, CustomSafeDeleteModel, OrderedModelBas
         if not self.element_code:
             self.set_code()
         super().save(keep_deleted, **kwargs)
-        rebuild_theme_tree.delay()
+        delay_theme_tree_update()
+        keywords_index_cache.invalidate_on_commit()
 
     def set_code(self):
         """
@@ -350,7 +353,8 @@ class ElementDetail(OrderedModelBase, CustomSafeDeleteModel, UserTrack):
         if not self.detail_code:
             self.set_code()
         super().save(*args, **kwargs)
-        rebuild_theme_tree.delay()
+        delay_theme_tree_update()
+        keywords_index_cache.invalidate_on_commit()
 
     def set_code(self):
         """
@@ -493,7 +497,7 @@ class Keyword(CleanEnabledBase, UserTrack):
 
     IRS_TB_MA_PARAULES_CLAU
     """
-    objects = iris_cachalot(models.Manager(), extra_fields=["detail_id"])
+    objects = iris_cachalot(KeywordQuerySet.as_manager(), extra_fields=["detail_id"])
 
     field_error_name = "description"
 
@@ -510,6 +514,12 @@ class Keyword(CleanEnabledBase, UserTrack):
     def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
         self.description = self.description.upper()
         super().save(force_insert, force_update, using, update_fields)
+        keywords_index_cache.invalidate_on_commit()
+
+    def delete(self, using=None, keep_parents=False):
+        deleted = super().delete(using=using, keep_parents=keep_parents)
+        keywords_index_cache.invalidate_on_commit()
+        return deleted
 
     def get_extra_filter_fields(self):
         """
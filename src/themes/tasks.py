@@ -1,4 +1,6 @@
 from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from django.db.models import Q
 from django.utils import translation
 
@@ -23,6 +25,37 @@ def rebuild_theme_tree(*args, **kwargs):
     translation.activate(old_lang)
 
 
+THEME_TREE_UPDATE_SCHEDULED_KEY = "themes_tree_update_scheduled"
+
+
+def delay_theme_tree_update():
+    """
+    Schedule an update of the themes tree once the current transaction is committed. All the requests received until
+    the update starts are coalesced into it, so at most one update runs every THEMES_TREE_UPDATE_DELAY seconds.
+    """
+    transaction.on_commit(schedule_theme_tree_update)
+
+
+def schedule_theme_tree_update():
+    delay = settings.THEMES_TREE_UPDATE_DELAY
+    if cache.add(THEME_TREE_UPDATE_SCHEDULED_KEY, True, timeout=delay * 2):
+        update_theme_tree.apply_async(countdown=delay)
+
+
+@celery_app.task(queue=settings.CELERY_HIGH_QUEUE_NAME, max_retries=5)
+def update_theme_tree():
+    """
+    Patch the themes tree with the changes since it was built
+    """
+    # Requests received from now on need a new update, because their changes could be missed by this one
+    cache.delete(THEME_TREE_UPDATE_SCHEDULED_KEY)
+    old_lang = translation.get_language()
+    translation.activate(settings.LANGUAGE_CODE)
+    from themes.actions.theme_tree import ThemeTreeBuilder
+    ThemeTreeBuilder().update()
+    translation.activate(old_lang)
+
+
 @celery_app.task(queue=settings.CELERY_LOW_QUEUE_NAME, max_retries=5)
 def register_theme_ambits(element_detail_pk):
     """
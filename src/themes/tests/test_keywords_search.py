@@ -0,0 +1,180 @@
+import unicodedata
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import translation
+from model_mommy import mommy
+
+from iris_masters.models import Parameter
+from public_api.views import MarioView
+from themes.actions.theme_keywords_search import KeywordSearch
+from themes.models import Element, ElementDetail, Keyword
+from themes.tests.utils import CreateThemesMixin
+
+
+class LegacyKeywordSearch(KeywordSearch):
+    """
+    Previous implementation of the search, with a query for every keyword and an unaccent scan of the element
+    descriptions of the active language
+    """
+
+    def details_search(self):
+        details_ids = []
+        keyword_details_ids = []
+        min_length_keyword = int(Parameter.get_parameter_by_key("CERCA_MINIM_PARAULA", 4))
+        for keyword_text in self.keywords:
+            keyword = self.strip_accents(keyword_text.upper())
+            keyword_details = list(Keyword.objects.filter(description__exact=keyword,
+                                                          enabled=True).values_list("detail_id", flat=True))
+            keyword_details_ids += keyword_details
+            details_ids += keyword_details
+
+            if len(keyword_text) >= min_length_keyword or keyword_details:
+                details_ids += list(ElementDetail.objects.filter(
+                    element__description__unaccent__icontains=keyword_text,
+                    **ElementDetail.ENABLED_ELEMENTDETAIL_FILTERS).values_list("id", flat=True))
+        return details_ids, keyword_details_ids
+
+    @staticmethod
+    def strip_accents(string, accents=('COMBINING ACUTE ACCENT', 'COMBINING GRAVE ACCENT')):
+        accents = set(map(unicodedata.lookup, accents))
+        chars = [c for c in unicodedata.normalize('NFD', string) if c not in accents]
+        return unicodedata.normalize('NFC', ''.join(chars))
+
+
+# Searches, with the positions of the details of given_themes found and the ones found by a keyword. The details of
+# the elements whose description contains a term are only found when the term has at least 4 letters or is a keyword.
+SEARCHES = (
+    (["farola"], [0, 1], [0, 1]),
+    (["Farola", "fanal"], [0, 0, 1], [0, 0, 1]),
+    (["ARBRE", "poda"], [3, 3, 9], [3, 3, 9]),
+    (["camió"], [6], [6]),
+    (["enllum"], [0, 1, 2], []),
+    (["PUBLIC"], [0, 1, 2], []),
+    (["públic"], [0, 1, 2], []),
+    (["tub"], [7], [7]),
+    (["sot"], [4], [4]),
+    (["xyz"], [], []),
+    (["contenidor", "brut", "carrer"], [5, 5, 8], [5, 5]),
+    (["Enllumenat públic"], [0, 1, 2], []),
+    (["pod"], [], []),
+    ([], [], []),
+)
+
+TRANSLATED_SEARCHES = (["lighting"], ["Street"], ["enllumenat"], ["lighting", "farola"])
+
+
+@pytest.mark.django_db
+class TestKeywordSearch(CreateThemesMixin):
+
+    def create_theme_element(self, description, details_keywords, **translations):
+        element = self.create_element()
+        Element.objects.filter(pk=element.pk).update(**{
+            "description_es": description, "description_gl": description, "description_en": description,
+            **translations})
+        details = []
+        for keywords in details_keywords:
+            detail = self.create_element_detail(element=element)
+            for keyword in keywords:
+                mommy.make(Keyword, detail=detail, description=keyword, user_id="222")
+            details.append(detail)
+        return details
+
+    def given_themes(self):
+        """
+        :return: Details of the themes, the last one deleted and the one before with its keyword disabled
+        """
+        return (self.create_theme_element("Enllumenat públic", [["FAROLA", "FANAL"], ["FAROLA"], []]) +
+                self.create_theme_element("Arbrat", [["ARBRE", "PODA"], ["SOT"]]) +
+                self.create_theme_element("Neteja", [["CONTENIDOR", "BRUT"], ["CAMIO"]]) +
+                self.create_theme_element("Clavegueram", [["TUB"]]) +
+                self.given_disabled_keyword_detail() + self.given_deleted_detail())
+
+    def given_disabled_keyword_detail(self):
+        details = self.create_theme_element("Carrer", [["CARRER"]])
+        Keyword.objects.filter(detail=details[0]).update(enabled=False)
+        return details
+
+    def given_deleted_detail(self):
+        details = self.create_theme_element("Poda de carrer", [["PODA"]])
+        details[0].delete()
+        return details
+
+    @pytest.mark.parametrize("search_terms,details_positions,keyword_details_positions", SEARCHES)
+    def test_details_search(self, search_terms, details_positions, keyword_details_positions):
+        details = self.given_themes()
+        details_ids, keyword_details_ids = KeywordSearch(search_terms).details_search()
+        assert sorted(details_ids) == [details[position].pk for position in details_positions]
+        assert sorted(keyword_details_ids) == [details[position].pk for position in keyword_details_positions]
+
+    @pytest.mark.parametrize("search_terms,expected_ranking", (
+        (["Farola", "fanal"], [(1, [0, 1])]),
+        (["ARBRE", "poda"], [(1, [3])]),
+        (["enllum"], [(0.7, [0, 1, 2])]),
+        (["contenidor", "brut", "carrer"], [(1, [5]), (0.7, [8])]),
+        (["xyz"], []),
+    ))
+    def test_ranking(self, search_terms, expected_ranking):
+        """
+        The elements found by a keyword are the most probable ones, and the deleted details are not ranked
+        """
+        details = self.given_themes()
+        view = MarioView()
+        details_ids, keyword_details_ids = KeywordSearch(search_terms).details_search()
+        ranking = view.prepare_details_info(" ".join(search_terms).lower(), view.get_details_information(details_ids),
+                                            keyword_details_ids)
+        assert [(element["probability"], sorted(detail["description_id"] for detail in element["details"]))
+                for element in ranking] == [(probability, [details[position].pk for position in positions])
+                                            for probability, positions in expected_ranking]
+
+    def test_search_without_queries(self):
+        self.given_themes()
+        KeywordSearch(["farola"]).details_search()
+        with CaptureQueriesContext(connection) as queries:
+            for search_terms, _, _ in SEARCHES:
+                KeywordSearch(search_terms).details_search()
+        assert len(queries) == 0
+
+    @pytest.mark.parametrize("language,found", (("en", True), ("es", False), ("gl", False), ("ca", False)))
+    def test_translated_descriptions(self, language, found):
+        """
+        The descriptions are searched in the active language, or in the default one if it is not available
+        """
+        detail = self.create_theme_element("Enllumenat", [[]], description_en="Street lighting")[0]
+        with translation.override(language):
+            assert KeywordSearch(["lighting"]).details_search() == ([detail.pk] if found else [], [])
+
+    @pytest.mark.parametrize("language", ("es", "en", "ca"))
+    def test_same_details_as_legacy(self, language):
+        self.given_themes()
+        self.create_theme_element("Enllumenat", [[]], description_en="Street lighting")
+        with translation.override(language):
+            for search_terms in [search[0] for search in SEARCHES] + list(TRANSLATED_SEARCHES):
+                details_ids, keyword_details_ids = KeywordSearch(search_terms).details_search()
+                legacy_details_ids, legacy_keyword_details_ids = LegacyKeywordSearch(search_terms).details_search()
+                assert sorted(details_ids) == sorted(legacy_details_ids), search_terms
+                assert sorted(keyword_details_ids) == sorted(legacy_keyword_details_ids), search_terms
+
+    @pytest.mark.parametrize("language", ("es", "en", "ca"))
+    def test_same_ranking_as_legacy(self, language):
+        self.given_themes()
+        self.create_theme_element("Enllumenat", [[]], description_en="Street lighting")
+        view = MarioView()
+
+        def ranking(search_class, search_terms):
+            details_ids, keyword_details_ids = search_class(search_terms).details_search()
+            return view.prepare_details_info(" ".join(search_terms).lower(), view.get_details_information(details_ids),
+                                             keyword_details_ids)
+
+        with translation.override(language):
+            for search_terms in [search[0] for search in SEARCHES] + list(TRANSLATED_SEARCHES):
+                assert ranking(KeywordSearch, search_terms) == ranking(LegacyKeywordSearch, search_terms), search_terms
+
+    def test_keyword_changes(self):
+        self.given_themes()
+        assert KeywordSearch(["fanal"]).details_search()[1]
+        Keyword.objects.filter(description="FANAL").update(enabled=False)
+        assert not KeywordSearch(["fanal"]).details_search()[1]
+        detail = self.create_theme_element("Mobiliari", [["BANC"]])[0]
+        assert KeywordSearch(["banc"]).details_search() == ([detail.pk], [detail.pk])
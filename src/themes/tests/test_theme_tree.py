@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+from mock import patch
+from model_mommy import mommy
+
+from themes.actions.theme_tree import ThemeTreeBuilder
+from themes.models import Area, Element, ElementDetail, Keyword
+from themes.tasks import THEME_TREE_UPDATE_SCHEDULED_KEY, update_theme_tree
+from themes.tests.utils import CreateThemesMixin
+
+
+@pytest.fixture
+def locmem_cache(settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def tree_update_task(locmem_cache):
+    with patch("themes.tasks.transaction.on_commit", side_effect=lambda func: func()), \
+            patch("themes.tasks.update_theme_tree.apply_async") as apply_async:
+        yield apply_async
+
+
+@pytest.mark.django_db
+class TestThemeTreeUpdate(CreateThemesMixin):
+
+    def given_themes(self):
+        element = self.create_element()
+        details = [self.create_element_detail(element=element) for _ in range(4)]
+        for order, detail in enumerate(details):
+            ElementDetail.objects.filter(pk=detail.pk).update(order=order)
+        other_element = self.create_element(area=element.area)
+        yesterday = timezone.now() - timedelta(days=1)
+        for model in (Area, Element, ElementDetail):
+            model.objects.all_with_deleted().update(updated_at=yesterday)
+        return [ElementDetail.objects.get(pk=detail.pk) for detail in details], other_element
+
+    def test_saves_coalesced(self, tree_update_task):
+        details, _ = self.given_themes()
+        cache.delete(THEME_TREE_UPDATE_SCHEDULED_KEY)
+        tree_update_task.reset_mock()
+
+        for index in range(20):
+            details[index % len(details)].save()
+        tree_update_task.assert_called_once()
+
+        with patch.object(ThemeTreeBuilder, "update"):
+            update_theme_tree()
+        details[0].save()
+        assert tree_update_task.call_count == 2
+
+    def test_update_same_as_rebuild(self, locmem_cache):
+        details, other_element = self.given_themes()
+        ThemeTreeBuilder().rebuild()
+
+        details[0].description = "changed"
+        details[0].order = 10
+        details[0].save()
+        mommy.make(Keyword, detail=details[1], user_id="222", description="keyword")
+        details[1].save()
+        details[2].delete()
+        details[3].element = other_element
+        details[3].save()
+        self.create_element_detail(element=other_element)
+
+        builder = ThemeTreeBuilder()
+        with patch.object(ThemeTreeBuilder, "build") as build:
+            tree = builder.update()
+        build.assert_not_called()
+        assert tree == ThemeTreeBuilder().build(force=True)
+        area = tree[other_element.area_id]
+        assert list(area["elements"][details[0].element_id]["details"]) == [details[1].pk, details[0].pk]
+        assert area["elements"][details[1].element_id]["details"][details[1].pk]["keywords"] == ["keyword"]
+
+    def test_area_change_rebuilds(self, locmem_cache):
+        details, _ = self.given_themes()
+        ThemeTreeBuilder().rebuild()
+        area = details[0].element.area
+        area.description_es = "changed"
+        area.save()
+        tree = ThemeTreeBuilder().update()
+        assert tree[area.pk]["description"] == "changed"
+
+    def test_update_without_tree(self, locmem_cache):
+        details, _ = self.given_themes()
+        tree = ThemeTreeBuilder().update()
+        assert details[0].pk in tree[details[0].element.area_id]["elements"][details[0].element_id]["details"]